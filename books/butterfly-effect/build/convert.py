@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 """Convert book .draft.md files to .html chapters + table of contents."""
 
+import argparse
+import concurrent.futures
+import hashlib
+import json
 import re
 import os
 import html
+import subprocess
+import sys
+import threading
+import time
 import yaml
+from dataclasses import dataclass
 
 # Arc metadata
 ARCS = {
@@ -21,6 +30,12 @@ ARCS = {
 CHAPTERS = []
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Draft parsing is shared with the translation/QC/lint tools.
+sys.path.insert(0, os.path.join(BASE, "tools"))
+from draft_parser import is_scene_break, load_chapter, split_blocks  # noqa: E402
+from search_text import tokenize  # noqa: E402
+
 MANUSCRIPT = os.path.join(BASE, "manuscript")
 BUILD = os.path.join(BASE, "build")
 STYLE_REL = "../../style/novel.css"
@@ -28,19 +43,49 @@ INDEX_REL = "../../index.html"
 SIGIL_REL = "../../assets/sigils"
 ILLUST_REL = "../../assets/illustrations"
 DIAGRAM_REL = "../../assets/diagrams"
-
-# Illustration marker regex: <!-- @illust full|thumb|link: id | alt -->
-ILLUST_RE = re.compile(
-    r"<!--\s*@illust\s+(full|thumb|link):\s*([a-z0-9_-]+)\s*\|\s*(.+?)\s*-->"
+# Written by tools/optimize_illustrations.py: per-variant pixel sizes for <img width/height>.
+ILLUST_MANIFEST_REL = os.path.join("assets", "illustrations", "manifest.json")
+
+# Incremental build manifest (not published; `.cache/` is git-ignored)
+CACHE_DIR = os.path.join(BASE, ".cache")
+MANIFEST_PATH = os.path.join(CACHE_DIR, "convert-manifest.json")
+MANIFEST_VERSION = 2
+
+# Reader search index: search/<lang>/meta.json + one shard per folded term prefix
+SEARCH_DIR = os.path.join(BASE, "search")
+SEARCH_LANG = "en"  # chapters built from drafts; translated editions get their own dir
+SEARCH_PREFIX_LEN = 2
+SEARCH_VERSION = 1
+# Per-chapter term -> paragraph postings, one file per chapter search key
+SEARCH_CACHE_DIR = os.path.join(CACHE_DIR, "search-postings")
+
+# --watch: sources a rebuild depends on (chapter .html outputs live in manuscript/ too)
+WATCH_DIRS = ("manuscript", os.path.join("assets", "sigils"), "style")
+WATCH_FILES = ("book.yaml", ILLUST_MANIFEST_REL)
+WATCH_POLL_INTERVAL = 0.25  # seconds, when watchdog is not installed
+WATCH_DEBOUNCE = 0.05  # coalesce editor save bursts (write + rename + chmod)
+
+# Full-width visual marker alone in its block: <!-- @illust|@diagram full: id | caption -->
+FULL_VISUAL_RE = re.compile(
+    r"<!--\s*@(illust|diagram)\s+full:\s*([a-z0-9_-]+)\s*\|\s*(.+?)\s*-->$"
 )
 
-# Diagram marker regex: <!-- @diagram full|thumb|link: id | alt -->
-DIAGRAM_RE = re.compile(
-    r"<!--\s*@diagram\s+(full|thumb|link):\s*([a-z0-9_-]+)\s*\|\s*(.+?)\s*-->"
+# One scan per block: visual markers, raw HTML tags, emphasis stars, line breaks.
+# The leading lookahead lets the regex engine skip plain text between tokens.
+INLINE_RE = re.compile(
+    r"(?=[<*\n])(?:"
+    r"(?P<visual><!--\s*@(?P<vkind>illust|diagram)\s+(?P<vmode>full|thumb|link):"
+    r"\s*(?P<vid>[a-z0-9_-]+)\s*\|\s*(?P<vtext>.+?)\s*-->)"
+    r"|(?P<html><[^<>]+>)"
+    r"|(?P<star>\*)"
+    r"|(?P<nl>\n))"
 )
 
 ILLUST_WIDTHS = [480, 768, 1200]
 
+# libyaml's loader is ~10x faster on chapter-svg-themes.yaml; fall back to pure Python.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 def render_inline_markdown(text: str) -> str:
     """Escape HTML but allow simple markdown emphasis in link text."""
     s = html.escape(text)
@@ -56,6 +101,32 @@ def strip_inline_markdown(text: str) -> str:
     return s
 
 
+def load_illust_sizes():
+    """{illust id: {width: (px width, px height)}} from the illustrations manifest."""
+    try:
+        with open(os.path.join(BASE, ILLUST_MANIFEST_REL), "r", encoding="utf-8") as f:
+            images = json.load(f).get("images", {})
+    except (OSError, ValueError):
+        return {}
+    out = {}
+    for illust_id, entry in sorted(images.items()):
+        for key, variant in sorted(entry.get("variants", {}).items()):
+            if variant.get("unsupported"):
+                continue
+            w = int(key.split("w.", 1)[0])
+            out.setdefault(illust_id, {})[w] = (variant["width"], variant["height"])
+    return out
+
+
+ILLUST_SIZES = load_illust_sizes()
+
+
+def illust_size_attrs(illust_id, width):
+    """` width=".." height=".."` of one variant (reserves layout space), or "" if unknown."""
+    size = ILLUST_SIZES.get(illust_id, {}).get(width)
+    return f' width="{size[0]}" height="{size[1]}"' if size else ""
+
+
 def picture_element(illust_id, alt, rel_base, cls="", sizes="100vw"):
     """Generate a <picture> element with AVIF/WebP sources at multiple widths."""
     avif_srcset = ", ".join(
@@ -71,7 +142,8 @@ def picture_element(illust_id, alt, rel_base, cls="", sizes="100vw"):
         f'<picture>'
         f'<source type="image/avif" srcset="{avif_srcset}" sizes="{sizes}">'
         f'<source type="image/webp" srcset="{webp_srcset}" sizes="{sizes}">'
-        f'<img{cls_attr} src="{fallback_src}" alt="{alt_esc}" loading="lazy" decoding="async">'
+        f'<img{cls_attr} src="{fallback_src}" alt="{alt_esc}"{illust_size_attrs(illust_id, ILLUST_WIDTHS[-1])} '
+        f'loading="lazy" decoding="async">'
         f'</picture>'
     )
 
@@ -96,7 +168,8 @@ def illust_thumb_html(illust_id, alt, rel_base):
     return (
         f'<a class="illust-thumb" data-illust="{html.escape(illust_id)}" '
         f'data-full="{full_src}" href="{full_src}" aria-label="View: {alt_esc}">'
-        f'<img src="{thumb_src}" alt="{alt_esc}" loading="lazy" decoding="async">'
+        f'<img src="{thumb_src}" alt="{alt_esc}"{illust_size_attrs(illust_id, ILLUST_WIDTHS[0])} '
+        f'loading="lazy" decoding="async">'
         f'</a>'
     )
 
@@ -184,7 +257,7 @@ def load_book_config():
         return defaults
     try:
         with open(p, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f) or {}
+            cfg = yaml.load(f, Loader=YAML_LOADER) or {}
         if not isinstance(cfg, dict):
             return defaults
         out = defaults.copy()
@@ -194,20 +267,26 @@ def load_book_config():
         return defaults
 
 
-BOOK = load_book_config()
-BOOK_TITLE = str(BOOK.get("title") or "")
-BOOK_SUBTITLE = str(BOOK.get("subtitle") or "")
-ARCADE_HREF = str(BOOK.get("arcade_href") or "/")
-ARCADE_LABEL = str(BOOK.get("arcade_label") or "All books")
-HOME_HREF = str(BOOK.get("home_href") or "https://too.foo/")
-HOME_LABEL = str(BOOK.get("home_label") or "too.foo")
+def apply_book_config(book):
+    """Bind book.yaml fields to the globals the page templates read."""
+    global BOOK, BOOK_TITLE, BOOK_SUBTITLE, ARCADE_HREF, ARCADE_LABEL, HOME_HREF, HOME_LABEL
+    BOOK = book
+    BOOK_TITLE = str(BOOK.get("title") or "")
+    BOOK_SUBTITLE = str(BOOK.get("subtitle") or "")
+    ARCADE_HREF = str(BOOK.get("arcade_href") or "/")
+    ARCADE_LABEL = str(BOOK.get("arcade_label") or "All books")
+    HOME_HREF = str(BOOK.get("home_href") or "https://too.foo/")
+    HOME_LABEL = str(BOOK.get("home_label") or "too.foo")
+
+
+apply_book_config(load_book_config())
 
 
 def load_sigil_map():
     try:
         p = os.path.join(BASE, "style", "chapter-svg-themes.yaml")
         with open(p, "r", encoding="utf-8") as f:
-            cfg = yaml.safe_load(f)
+            cfg = yaml.load(f, Loader=YAML_LOADER)
         out = {}
         for ch in cfg.get("chapters", []) or []:
             if not isinstance(ch, dict):
@@ -250,218 +329,412 @@ def sigil_img(chapter_num, rel_base, inline=False, world="continental"):
 
 def parse_draft(filepath):
     """Parse a .draft.md file and extract metadata + prose."""
-    with open(filepath, "r") as f:
-        content = f.read()
-
-    # Extract title from first line: # Chapter N: Title
-    title_match = re.match(r"^# Chapter (\d+):\s*(.+)$", content, re.MULTILINE)
-    if not title_match:
+    chapter = load_chapter(filepath)
+    meta = chapter.meta
+    if meta is None:
         return None
-    chapter_num = int(title_match.group(1))
-    chapter_title = title_match.group(2).strip()
+    return {
+        "chapter_num": meta.num,
+        "chapter_title": meta.title,
+        "arc_num": meta.arc,
+        "pov": meta.pov,
+        "location": meta.location,
+        "timeline": meta.timeline,
+        "prose": chapter.prose,
+    }
 
-    # Extract metadata from HTML comment
-    meta_match = re.search(
-        r"<!--\s*Arc:\s*(\d+)\s*\|\s*POV:\s*(.+?)\s*\|\s*Location:\s*(.+?)\s*\|\s*Timeline:\s*(.+?)\s*-->",
-        content,
-    )
-    if meta_match:
-        arc_num = int(meta_match.group(1))
-        pov = meta_match.group(2).strip()
-        location = meta_match.group(3).strip()
-        timeline = meta_match.group(4).strip()
-    else:
-        arc_num = 1
-        pov = "Unknown"
-        location = "Unknown"
-        timeline = "Unknown"
-
-    # Strip everything before first non-comment, non-header prose
-    # Remove title line, metadata comments, beat comments, continuity notes
-    lines = content.split("\n")
-    prose_lines = []
-    in_continuity = False
-    for line in lines:
-        # Skip title
-        if re.match(r"^# Chapter \d+:", line):
-            continue
-        # Preserve visual markers (they look like comments but carry data)
-        if re.match(r"^\s*<!--\s*@(illust|diagram)\s", line):
-            prose_lines.append(line)
-            continue
-        # Skip HTML comments (single-line)
-        if re.match(r"^\s*<!--.*-->\s*$", line):
+
+# ── Document tree ─────────────────────────────────────────────────
+#
+# Prose is tokenized once into blocks (split on blank lines) whose inline
+# content is a flat token scan plus emphasis pairing. Renderers walk the tree.
+
+
+@dataclass
+class Emphasis:
+    strong: bool
+    children: list
+
+
+@dataclass
+class RawHtml:
+    html: str
+
+
+@dataclass
+class Visual:
+    kind: str  # "illust" | "diagram"
+    mode: str  # "full" | "thumb" | "link"
+    id: str
+    text: str
+    source: str
+
+
+@dataclass
+class Paragraph:
+    children: list
+
+
+@dataclass
+class Blockquote:
+    lines: list  # one inline list per quoted line
+
+
+@dataclass
+class SceneBreak:
+    pass
+
+
+@dataclass
+class Figure:
+    kind: str  # "illust" | "diagram"
+    id: str
+    caption: str
+
+
+_STAR = object()  # unpaired `*` until emphasis is resolved
+
+
+def _pair_emphasis(items, strong):
+    """Pair `*` tokens into Emphasis nodes, leftmost-first (like re.sub on `\\*\\*(.+?)\\*\\*`)."""
+    out = []
+    i = 0
+    n = len(items)
+    width = 2 if strong else 1
+    while i < n:
+        if items[i] is _STAR and (not strong or (i + 1 < n and items[i + 1] is _STAR)):
+            j = i + width + 1  # at least one item of content
+            while j + width <= n:
+                if items[j] is _STAR and (not strong or items[j + 1] is _STAR):
+                    out.append(Emphasis(strong, items[i + width : j]))
+                    i = j + width
+                    break
+                j += 1
+            else:
+                out.append(items[i])
+                i += 1
             continue
-        # Skip multi-line HTML comment start
-        if re.match(r"^\s*<!--", line) and "-->" not in line:
-            in_continuity = True
+        out.append(items[i])
+        i += 1
+    return out
+
+
+def _resolve_emphasis(items):
+    """Bold first, then italics at each nesting level; unpaired stars stay literal."""
+    items = _pair_emphasis(items, strong=True)
+    items = _pair_emphasis(items, strong=False)
+    return _finish_emphasis(items)
+
+
+def _finish_emphasis(items):
+    out = []
+    for node in items:
+        if node is _STAR:
+            out.append("*")
             continue
-        # Inside multi-line comment
-        if in_continuity:
-            if "-->" in line:
-                in_continuity = False
+        if isinstance(node, Emphasis):
+            if node.strong:
+                node.children = _pair_emphasis(node.children, strong=False)
+            node.children = _finish_emphasis(node.children)
+        out.append(node)
+    return out
+
+
+def parse_inline(text):
+    """Tokenize one block of inline text into str / RawHtml / Visual / Emphasis nodes."""
+    if "*" not in text and "<" not in text:
+        return [text]
+    lines = [[]]
+    pos = 0
+    for m in INLINE_RE.finditer(text):
+        start = m.start()
+        if start > pos:
+            lines[-1].append(text[pos:start])
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == "star":
+            lines[-1].append(_STAR)
+        elif kind == "nl":
+            lines.append([])
+        elif kind == "visual":
+            lines[-1].append(
+                Visual(m.group("vkind"), m.group("vmode"), m.group("vid"), m.group("vtext").strip(), m.group(0))
+            )
+        else:
+            lines[-1].append(RawHtml(m.group(0)))
+    if pos < len(text):
+        lines[-1].append(text[pos:])
+
+    # Emphasis never spans a line break.
+    out = []
+    for i, line in enumerate(lines):
+        if i:
+            out.append("\n")
+        out.extend(_resolve_emphasis(line))
+    return out
+
+
+def parse_blocks(prose):
+    """Type the shared draft blocks as Paragraph / Blockquote / SceneBreak / Figure."""
+    blocks = []
+    for source in split_blocks(prose):
+        if is_scene_break(source):
+            blocks.append(SceneBreak())
             continue
-        # Skip word count target lines
-        if re.match(r"^\s*<!--\s*Word count", line, re.IGNORECASE):
+        lines = source.split("\n")
+        if any(line.startswith("> ") for line in lines):
+            quoted = []
+            for line in lines:
+                line = (line[2:] if line.startswith("> ") else line).strip()
+                if line:
+                    quoted.append(parse_inline(line))
+            blocks.append(Blockquote(quoted))
             continue
-        prose_lines.append(line)
+        text = source.strip()
+        m = FULL_VISUAL_RE.match(text)
+        if m:
+            blocks.append(Figure(m.group(1), m.group(2), m.group(3).strip()))
+        else:
+            blocks.append(Paragraph(parse_inline(text)))
+    return blocks
 
-    prose = "\n".join(prose_lines).strip()
 
-    # Remove trailing --- and anything after (continuity notes)
-    prose = re.sub(r"\n---\s*$", "", prose)
+# ── HTML renderer ─────────────────────────────────────────────────
 
-    return {
-        "chapter_num": chapter_num,
-        "chapter_title": chapter_title,
-        "arc_num": arc_num,
-        "pov": pov,
-        "location": location,
-        "timeline": timeline,
-        "prose": prose,
-    }
 
-
-def prose_to_html(prose):
-    """Convert markdown prose to HTML paragraphs."""
-    # Split on scene breaks (--- or ***)
-    # First, handle scene breaks
-    prose = re.sub(r"\n\s*\*\s*\*\s*\*\s*\n", "\n<SCENE_BREAK>\n", prose)
-    prose = re.sub(r"\n---\n", "\n<SCENE_BREAK>\n", prose)
-
-    # Handle blockquotes (> lines) - often used for pidgin/translation
-    lines = prose.split("\n")
-    result_lines = []
-    in_blockquote = False
-    for line in lines:
-        if line.startswith("> "):
-            if not in_blockquote:
-                result_lines.append("<BLOCKQUOTE_START>")
-                in_blockquote = True
-            result_lines.append(line[2:])
+def render_inline_html(nodes):
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            parts.append(html.escape(node, quote=False))
+        elif isinstance(node, Emphasis):
+            tag = "strong" if node.strong else "em"
+            parts.append(f"<{tag}>{render_inline_html(node.children)}</{tag}>")
+        elif isinstance(node, Visual):
+            parts.append(visual_inline_html(node))
         else:
-            if in_blockquote:
-                result_lines.append("<BLOCKQUOTE_END>")
-                in_blockquote = False
-            result_lines.append(line)
-    if in_blockquote:
-        result_lines.append("<BLOCKQUOTE_END>")
-    prose = "\n".join(result_lines)
+            parts.append(node.html)
+    return "".join(parts)
+
+
+def visual_inline_html(node):
+    """Inline @illust/@diagram thumb/link markup."""
+    if node.kind == "diagram":
+        if node.mode == "thumb":
+            return diagram_thumb_html(node.id, node.text, DIAGRAM_REL)
+        if node.mode == "link":
+            return diagram_link_html(node.id, node.text, DIAGRAM_REL)
+    else:
+        if node.mode == "thumb":
+            return illust_thumb_html(node.id, node.text, ILLUST_REL)
+        if node.mode == "link":
+            return illust_link_html(node.id, node.text, ILLUST_REL)
+    # full markers are block-level; pass through if misplaced inline
+    return node.source
 
-    # Split into paragraphs (double newline)
-    paragraphs = re.split(r"\n\s*\n", prose)
 
+def render_blocks_html(blocks):
     html_parts = []
-    for para in paragraphs:
-        para = para.strip()
-        if not para:
-            continue
-        if para == "<SCENE_BREAK>":
+    anchor = 0  # paragraphs and blockquotes get #p1, #p2, ... (search results link here)
+    for block in blocks:
+        if isinstance(block, Paragraph):
+            anchor += 1
+            html_parts.append(f'    <p id="p{anchor}">{render_inline_html(block.children)}</p>')
+        elif isinstance(block, SceneBreak):
             html_parts.append('    <hr class="scene-break">')
-            continue
+        elif isinstance(block, Blockquote):
+            anchor += 1
+            bq_html = "\n".join(f"      <p>{render_inline_html(line)}</p>" for line in block.lines)
+            html_parts.append(f'    <blockquote id="p{anchor}">\n{bq_html}\n    </blockquote>')
+        elif block.kind == "diagram":
+            html_parts.append(diagram_full_html(block.id, block.caption, DIAGRAM_REL))
+        else:
+            html_parts.append(illust_full_html(block.id, block.caption, ILLUST_REL))
+    return "\n".join(html_parts)
 
-        # Block-level full illustration (standalone paragraph)
-        full_match = re.match(
-            r"^\s*<!--\s*@illust\s+full:\s*([a-z0-9_-]+)\s*\|\s*(.+?)\s*-->\s*$",
-            para,
-        )
-        if full_match:
-            html_parts.append(illust_full_html(full_match.group(1), full_match.group(2).strip(), ILLUST_REL))
-            continue
 
-        # Block-level full diagram (standalone paragraph)
-        diag_full_match = re.match(
-            r"^\s*<!--\s*@diagram\s+full:\s*([a-z0-9_-]+)\s*\|\s*(.+?)\s*-->\s*$",
-            para,
-        )
-        if diag_full_match:
-            html_parts.append(
-                diagram_full_html(diag_full_match.group(1), diag_full_match.group(2).strip(), DIAGRAM_REL)
-            )
-            continue
+def prose_to_html(prose):
+    """Convert markdown prose to HTML paragraphs."""
+    return render_blocks_html(parse_blocks(prose))
 
-        # Handle blockquotes
-        if "<BLOCKQUOTE_START>" in para:
-            para = para.replace("<BLOCKQUOTE_START>", "").strip()
-            if "<BLOCKQUOTE_END>" in para:
-                para = para.replace("<BLOCKQUOTE_END>", "").strip()
-            bq_lines = para.split("\n")
-            bq_html = "\n".join(
-                f"      <p>{process_inline(l.strip())}</p>" for l in bq_lines if l.strip()
-            )
-            html_parts.append(f"    <blockquote>\n{bq_html}\n    </blockquote>")
-            continue
 
-        if "<BLOCKQUOTE_END>" in para:
-            para = para.replace("<BLOCKQUOTE_END>", "").strip()
+# ── Reader search index ───────────────────────────────────────────
 
-        if not para:
-            continue
 
-        # Process inline visuals before HTML escaping
-        para = process_visual_markers(para)
-        # Convert markdown italics to <em>
-        para = process_inline(para)
-        html_parts.append(f"    <p>{para}</p>")
+def inline_text(nodes):
+    """Visible text of an inline node list (thumb visuals and raw tags dropped)."""
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            parts.append(node)
+        elif isinstance(node, Emphasis):
+            parts.append(inline_text(node.children))
+        elif isinstance(node, Visual) and node.mode == "link":
+            parts.append(node.text)
+    return "".join(parts)
 
-    return "\n".join(html_parts)
+
+def paragraph_texts(prose):
+    """(anchor number, text) for each anchored block, numbered as render_blocks_html does."""
+    anchor = 0
+    for block in parse_blocks(prose):
+        if isinstance(block, Paragraph):
+            anchor += 1
+            yield anchor, inline_text(block.children)
+        elif isinstance(block, Blockquote):
+            anchor += 1
+            yield anchor, "\n".join(inline_text(line) for line in block.lines)
+
+
+def search_shard_key(term):
+    """Shard file stem: hex UTF-8 of the term's first SEARCH_PREFIX_LEN characters."""
+    return term[:SEARCH_PREFIX_LEN].encode("utf-8").hex()
 
 
-def process_visual_markers(text):
-    """Replace inline @illust/@diagram thumb/link markers with HTML before general escaping."""
-    def _replace_diag(m):
-        kind, diagram_id, caption = m.group(1), m.group(2), m.group(3).strip()
-        if kind == "thumb":
-            return diagram_thumb_html(diagram_id, caption, DIAGRAM_REL)
-        elif kind == "link":
-            return diagram_link_html(diagram_id, caption, DIAGRAM_REL)
-        # full markers handled at block level; pass through if misplaced inline
-        return m.group(0)
-
-    def _replace_illust(m):
-        kind, illust_id, caption = m.group(1), m.group(2), m.group(3).strip()
-        if kind == "thumb":
-            return illust_thumb_html(illust_id, caption, ILLUST_REL)
-        elif kind == "link":
-            return illust_link_html(illust_id, caption, ILLUST_REL)
-        # full markers handled at block level; pass through if misplaced inline
-        return m.group(0)
-
-    text = DIAGRAM_RE.sub(_replace_diag, text)
-    text = ILLUST_RE.sub(_replace_illust, text)
-    return text
-
-
-def process_inline(text):
-    """Process inline markdown: *italic*, **bold**.
-
-    Illustration HTML (from process_illustrations) is protected from escaping
-    by temporarily replacing it with placeholders.
+def chapter_postings(prose):
+    """Folded term -> ascending paragraph anchors for one chapter's prose."""
+    postings = {}
+    for anchor, text in paragraph_texts(prose):
+        for term, _ in tokenize(text):
+            paras = postings.setdefault(term, [])
+            if not paras or paras[-1] != anchor:
+                paras.append(anchor)
+    return postings
+
+
+_CHAPTER_POSTINGS = {}  # chapter search key -> postings; lets --watch skip the cache files
+
+
+def load_chapter_postings(key, ch=None):
+    """
+    Postings for chapter search `key`, from memory or .cache/search-postings/.
+    On a miss they are computed from `ch` and cached; without `ch` a miss is None.
     """
-    # Protect existing HTML tags (from illustration processing) from escaping
-    protected = []
+    if key in _CHAPTER_POSTINGS:
+        return _CHAPTER_POSTINGS[key]
+    path = os.path.join(SEARCH_CACHE_DIR, f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            postings = json.load(f)
+    except (OSError, ValueError):
+        if ch is None:
+            return None
+        postings = chapter_postings(ch["prose"] if "prose" in ch else load_chapter(ch["draft_path"]).prose)
+        os.makedirs(SEARCH_CACHE_DIR, exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(postings, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+    _CHAPTER_POSTINGS[key] = postings
+    return postings
+
+
+def prune_chapter_postings(live_keys):
+    """Drop cached postings (in memory and on disk) for keys no longer built."""
+    for key in set(_CHAPTER_POSTINGS) - live_keys:
+        del _CHAPTER_POSTINGS[key]
+    try:
+        names = os.listdir(SEARCH_CACHE_DIR)
+    except FileNotFoundError:
+        return
+    for name in names:
+        if name.endswith(".json") and name[:-5] not in live_keys:
+            os.remove(os.path.join(SEARCH_CACHE_DIR, name))
 
-    def _protect(m):
-        protected.append(m.group(0))
-        return f"\x00PROTECT{len(protected) - 1}\x00"
 
-    text = re.sub(r"<[^>]+>", _protect, text)
+def changed_prefixes(old, new):
+    """Term prefixes whose posting lists differ between two versions of a chapter."""
+    return {
+        term[:SEARCH_PREFIX_LEN]
+        for term in old.keys() | new.keys()
+        if old.get(term) != new.get(term)
+    }
 
-    # Escape HTML entities in prose text
-    text = text.replace("&", "&amp;")
-    text = text.replace("<", "&lt;")
-    text = text.replace(">", "&gt;")
 
-    # Bold: **text**
-    text = re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", text)
-    # Italic: *text*
-    text = re.sub(r"\*(.+?)\*", r"<em>\1</em>", text)
+def build_search_index(chapters, postings, prefixes=None):
+    """
+    Paragraph-level inverted index of the chapters, sharded by term prefix.
+
+    `postings` holds chapter_postings() for each chapter, in `chapters` order.
+    Returns (meta, shards). Each shard holds its terms sorted and front-coded
+    (`[shared prefix length, suffix]`) plus one posting list per term:
+    `[chapter delta, n, paragraph, paragraph delta, ...]` repeated per chapter.
+    A client only fetches the shards for the prefixes of the query's terms.
+    With `prefixes`, only the shards for those term prefixes are built;
+    meta still lists every shard.
+    """
+    entries = [
+        {
+            "num": ch["chapter_num"],
+            "title": ch["chapter_title"],
+            "href": f"manuscript/arc-{ch['arc_num']}/chapter-{ch['chapter_num']:02d}.html",
+        }
+        for ch in chapters
+    ]
+    all_prefixes = set()
+    merged = {}
+    for ch_idx, terms in enumerate(postings):
+        all_prefixes.update(term[:SEARCH_PREFIX_LEN] for term in terms)
+        for term, paras in terms.items():
+            if prefixes is None or term[:SEARCH_PREFIX_LEN] in prefixes:
+                merged.setdefault(term, {})[ch_idx] = paras
+
+    shards = {}
+    for term in sorted(merged):
+        shard = shards.setdefault(search_shard_key(term), {"t": [], "p": [], "_prev": ""})
+        prev = shard["_prev"]
+        shared = 0
+        while shared < min(len(prev), len(term)) and prev[shared] == term[shared]:
+            shared += 1
+        shard["t"].append([shared, term[shared:]])
+        shard["_prev"] = term
+        plist = []
+        last_ch = 0
+        for ch_idx, paras in merged[term].items():
+            plist += [ch_idx - last_ch, len(paras)]
+            plist += [p - (paras[i - 1] if i else 0) for i, p in enumerate(paras)]
+            last_ch = ch_idx
+        shard["p"].append(plist)
+    for shard in shards.values():
+        del shard["_prev"]
+
+    meta = {
+        "version": SEARCH_VERSION,
+        "lang": SEARCH_LANG,
+        "prefix": SEARCH_PREFIX_LEN,
+        "fold": "nfkd-strip-marks-lower",
+        "chapters": entries,
+        "shards": sorted(search_shard_key(p) for p in all_prefixes),
+    }
+    return meta, shards
 
-    # Restore protected HTML
-    for i, tag in enumerate(protected):
-        text = text.replace(f"\x00PROTECT{i}\x00", tag)
 
-    return text
+def write_search_index(meta, shards):
+    """
+    Write meta.json and `shards` to search/<lang>/; unchanged files are left
+    alone, and shards meta no longer lists are pruned.
+    """
+    out_dir = os.path.join(SEARCH_DIR, meta["lang"])
+    os.makedirs(out_dir, exist_ok=True)
+    files = {"meta.json": meta}
+    files.update({f"{key}.json": shard for key, shard in shards.items()})
+    live = {"meta.json"} | {f"{key}.json" for key in meta["shards"]}
+    written = 0
+    for name, data in files.items():
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+        path = os.path.join(out_dir, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                if f.read() == text:
+                    continue
+        except OSError:
+            pass
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        written += 1
+    for name in os.listdir(out_dir):
+        if name.endswith(".json") and name not in live:
+            os.remove(os.path.join(out_dir, name))
+    return written, len(files)
 
 
 def generate_chapter_html(data, prev_href, next_href):
@@ -582,8 +855,8 @@ def generate_chapter_html(data, prev_href, next_href):
 """
 
 
-def generate_index(chapters, *, style_href, manuscript_prefix, sigil_rel_base):
-    """Generate index.html table of contents."""
+def generate_index(chapters, *, style_href, manuscript_prefix, sigil_rel_base, search_base=""):
+    """Generate index.html table of contents (with the reader search box)."""
     arc_groups = {}
     for ch in chapters:
         arc = ch["arc_num"]
@@ -633,82 +906,504 @@ def generate_index(chapters, *, style_href, manuscript_prefix, sigil_rel_base):
     <h1>{html.escape(BOOK_TITLE)}</h1>
     <p class="subtitle">{html.escape(BOOK_SUBTITLE)}</p>
   </div>
+  <form class="book-search" role="search" data-base="{search_base}" data-index="{search_base}search/{SEARCH_LANG}/" onsubmit="return false">
+    <input type="search" placeholder="Search the book…" aria-label="Search the book" autocomplete="off">
+    <ol class="book-search-results" aria-live="polite"></ol>
+  </form>
 {chr(10).join(groups_html)}
+  <script>
+    (() => {{
+      /* Reader search: fetches search/<lang>/meta.json, then only the shards
+         for the query's term prefixes (see build_search_index in convert.py).
+         Terms fold as in tools/search_text.py: NFKD, drop marks, lowercase. */
+      const form = document.querySelector('.book-search');
+      if (!form || !('TextEncoder' in window)) return;
+      const input = form.querySelector('input');
+      const out = form.querySelector('.book-search-results');
+      const root = form.dataset.index;
+      let meta = null;
+      const shards = {{}};
+      const fold = s => s.normalize('NFKD').replace(/\\p{{M}}/gu, '').toLowerCase().replace(/\\u2019/g, "'");
+      const terms = q => (q.match(/[\\p{{L}}\\p{{N}}]+(?:['\\u2019][\\p{{L}}\\p{{N}}]+)*/gu) || [])
+        .map(fold).filter(t => t.length >= 2);
+      const hex = s => Array.from(new TextEncoder().encode(s), b => b.toString(16).padStart(2, '0')).join('');
+      const loadMeta = () => meta || (meta = fetch(root + 'meta.json').then(r => r.json()));
+      const loadShard = key => shards[key] || (shards[key] = fetch(root + key + '.json')
+        .then(r => r.json())
+        .then(sh => {{
+          let prev = '';
+          const words = sh.t.map(([shared, suffix]) => (prev = prev.slice(0, shared) + suffix));
+          return {{ words, postings: sh.p }};
+        }}));
+      async function lookup(term, prefix) {{
+        const m = await loadMeta();
+        const key = hex(Array.from(term).slice(0, m.prefix).join(''));
+        const found = new Map();
+        if (!m.shards.includes(key)) return found;
+        const sh = await loadShard(key);
+        sh.words.forEach((w, i) => {{
+          if (prefix ? !w.startsWith(term) : w !== term) return;
+          const p = sh.postings[i];
+          let ch = 0;
+          for (let j = 0; j < p.length; j += 2 + p[j + 1]) {{
+            ch += p[j];
+            let para = 0;
+            for (let k = 0; k < p[j + 1]; k++) {{
+              para += p[j + 2 + k];
+              const at = ch + ':' + para;
+              found.set(at, (found.get(at) || 0) + 1);
+            }}
+          }}
+        }});
+        return found;
+      }}
+      let seq = 0;
+      input.addEventListener('input', async () => {{
+        const q = terms(input.value);
+        const mine = ++seq;
+        if (!q.length) {{ out.replaceChildren(); return; }}
+        const sets = await Promise.all(q.map((t, i) => lookup(t, i === q.length - 1)));
+        if (mine !== seq) return;
+        const m = await loadMeta();
+        const hits = [...sets[0].keys()]
+          .filter(at => sets.every(s => s.has(at)))
+          .map(at => ({{ at, score: sets.reduce((n, s) => n + s.get(at), 0) }}))
+          .sort((a, b) => b.score - a.score)
+          .slice(0, 30);
+        out.replaceChildren(...hits.map(({{ at }}) => {{
+          const [ch, para] = at.split(':').map(Number);
+          const c = m.chapters[ch];
+          const li = document.createElement('li');
+          const a = document.createElement('a');
+          a.href = form.dataset.base + c.href + '#p' + para;
+          a.textContent = 'Chapter ' + c.num + ': ' + c.title;
+          const where = document.createElement('span');
+          where.className = 'book-search-para';
+          where.textContent = ' ¶' + para;
+          li.append(a, where);
+          return li;
+        }}));
+      }});
+    }})();
+  </script>
 </body>
 </html>
 """
 
 
-def main():
-    chapters = []
+_DIGESTS = {}  # path -> ((mtime_ns, size), sha256); lets --watch skip rehashing
+
+
+def file_digest(path):
+    """sha256 of a file's bytes ("" when the file does not exist)."""
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        hit = _DIGESTS.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return ""
+    _DIGESTS[path] = (stamp, digest)
+    return digest
+
+
+def inputs_key(*parts):
+    """Stable digest of JSON-serialisable build inputs."""
+    blob = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load_manifest():
+    """Load the incremental build manifest (empty when missing or stale)."""
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def save_manifest(manifest):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True, ensure_ascii=False)
+        f.write("\n")
+    os.replace(tmp, MANIFEST_PATH)
+
 
-    # Collect all draft files
+def collect_drafts():
+    """All `.draft.md` paths under manuscript/arc-N/, in arc/file order."""
+    paths = []
     for arc_num in range(1, 8):
         arc_dir = os.path.join(MANUSCRIPT, f"arc-{arc_num}")
         if not os.path.isdir(arc_dir):
             continue
         for fname in sorted(os.listdir(arc_dir)):
             if fname.endswith(".draft.md"):
-                filepath = os.path.join(arc_dir, fname)
-                data = parse_draft(filepath)
-                if data:
-                    chapters.append(data)
+                paths.append(os.path.join(arc_dir, fname))
+    return paths
+
+
+def chapter_meta(data):
+    """Chapter metadata without prose or source path (kept in the manifest)."""
+    return {k: v for k, v in data.items() if k not in ("prose", "draft_path")}
+
+
+def chapter_href(ch):
+    return f"../arc-{ch['arc_num']}/chapter-{ch['chapter_num']:02d}.html"
+
+
+def render_chapter(task):
+    """Worker: parse (if needed), render and write one chapter; returns (num, title, path)."""
+    ch, prev_href, next_href, html_path = task
+    if "prose" not in ch:
+        ch = parse_draft(ch["draft_path"])
+    chapter_html = generate_chapter_html(ch, prev_href, next_href)
+    with open(html_path, "w") as f:
+        f.write(chapter_html)
+    return ch["chapter_num"], ch["chapter_title"], html_path
+
+
+def run_tasks(fn, items, jobs):
+    """Map `fn` over `items`, in order, on up to `jobs` worker processes."""
+    if jobs <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    workers = min(jobs, len(items))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(fn, items, chunksize=max(1, len(items) // (workers * 4))))
+
+
+def build(old, jobs=1):
+    """Rebuild every output whose inputs changed since manifest `old`; returns the new manifest."""
+    old_drafts = old.get("drafts", {})
+    old_outputs = old.get("outputs", {})
+
+    # Inputs shared by every output: the converter and its draft parser, book.yaml and illustration sizes.
+    shared = {
+        "converter": file_digest(os.path.abspath(__file__)),
+        "draft_parser": file_digest(os.path.join(BASE, "tools", "draft_parser.py")),
+        "book": file_digest(os.path.join(BASE, "book.yaml")),
+        "illust_sizes": {k: {str(w): list(s) for w, s in v.items()} for k, v in ILLUST_SIZES.items()},
+    }
+
+    # Collect all draft files; unchanged drafts reuse their cached metadata.
+    chapters = []
+    drafts = {}
+    to_parse = []
+    for filepath in collect_drafts():
+        rel = os.path.relpath(filepath, BASE)
+        digest = file_digest(filepath)
+        cached = old_drafts.get(rel)
+        if cached and cached.get("sha256") == digest:
+            if cached.get("meta"):
+                data = dict(cached["meta"])
+                data["draft_path"] = filepath
+                chapters.append(data)
+            drafts[rel] = cached
+            continue
+        drafts[rel] = {"sha256": digest, "meta": None}
+        to_parse.append(filepath)
+
+    for filepath, data in zip(to_parse, run_tasks(parse_draft, to_parse, jobs)):
+        if not data:
+            continue
+        drafts[os.path.relpath(filepath, BASE)]["meta"] = chapter_meta(data)
+        data["draft_path"] = filepath
+        chapters.append(data)
 
     chapters.sort(key=lambda x: x["chapter_num"])
     print(f"Found {len(chapters)} chapters")
 
-    # Generate HTML for each chapter
+    outputs = {}
+    sigil_digests = {}
+    written = 0
+
+    def _sigil_digest(chapter_num):
+        sig = SIGIL_MAP.get(chapter_num) or {}
+        if not sig.get("id"):
+            return ""
+        if sig["id"] not in sigil_digests:
+            sigil_digests[sig["id"]] = file_digest(os.path.join(BASE, "assets", "sigils", f"{sig['id']}.svg"))
+        return sigil_digests[sig["id"]]
+
+    # Generate HTML for each chapter whose inputs changed
+    tasks = []
     for i, ch in enumerate(chapters):
         arc_dir = os.path.join(MANUSCRIPT, f"arc-{ch['arc_num']}")
         num_str = f"{ch['chapter_num']:02d}"
         html_path = os.path.join(arc_dir, f"chapter-{num_str}.html")
+        rel_out = os.path.relpath(html_path, BASE)
 
         # Navigation links
-        if i > 0:
-            prev_ch = chapters[i - 1]
-            prev_num = f"{prev_ch['chapter_num']:02d}"
-            prev_href = f"../arc-{prev_ch['arc_num']}/chapter-{prev_num}.html"
-        else:
-            prev_href = INDEX_REL
-
-        if i < len(chapters) - 1:
-            next_ch = chapters[i + 1]
-            next_num = f"{next_ch['chapter_num']:02d}"
-            next_href = f"../arc-{next_ch['arc_num']}/chapter-{next_num}.html"
-        else:
-            next_href = INDEX_REL
+        prev_href = chapter_href(chapters[i - 1]) if i > 0 else INDEX_REL
+        next_href = chapter_href(chapters[i + 1]) if i < len(chapters) - 1 else INDEX_REL
+
+        draft_rel = os.path.relpath(ch["draft_path"], BASE)
+        key = inputs_key(
+            shared,
+            drafts[draft_rel]["sha256"],
+            SIGIL_MAP.get(ch["chapter_num"]),
+            _sigil_digest(ch["chapter_num"]),
+            prev_href,
+            next_href,
+        )
+        outputs[rel_out] = key
+        if old_outputs.get(rel_out) == key and os.path.isfile(html_path):
+            continue
+        tasks.append((ch, prev_href, next_href, html_path))
 
-        chapter_html = generate_chapter_html(ch, prev_href, next_href)
-        with open(html_path, "w") as f:
-            f.write(chapter_html)
-        print(f"  ✓ Chapter {ch['chapter_num']}: {ch['chapter_title']} → {html_path}")
+    for num, title, html_path in run_tasks(render_chapter, tasks, jobs):
+        written += 1
+        print(f"  ✓ Chapter {num}: {title} → {html_path}")
 
     os.makedirs(BUILD, exist_ok=True)
 
+    # Index pages depend on the chapter list, sigil ids/alts and book.yaml.
+    index_key = inputs_key(
+        shared,
+        [chapter_meta(ch) for ch in chapters],
+        {str(k): v for k, v in sorted(SIGIL_MAP.items())},
+    )
+
     # Generate index (book root, used for deployment)
     index_root_path = os.path.join(BASE, "index.html")
-    index_root_html = generate_index(
-        chapters,
-        style_href="style/novel.css",
-        manuscript_prefix="manuscript",
-        sigil_rel_base="assets/sigils",
-    )
-    with open(index_root_path, "w") as f:
-        f.write(index_root_html)
-    print(f"  ✓ Index → {index_root_path}")
+    index_root_rel = os.path.relpath(index_root_path, BASE)
+    outputs[index_root_rel] = index_key
+    if old_outputs.get(index_root_rel) != index_key or not os.path.isfile(index_root_path):
+        index_root_html = generate_index(
+            chapters,
+            style_href="style/novel.css",
+            manuscript_prefix="manuscript",
+            sigil_rel_base="assets/sigils",
+        )
+        with open(index_root_path, "w") as f:
+            f.write(index_root_html)
+        written += 1
+        print(f"  ✓ Index → {index_root_path}")
 
     # Generate legacy index (build/), kept for backwards compatibility
     index_build_path = os.path.join(BUILD, "index.html")
-    index_build_html = generate_index(
-        chapters,
-        style_href="../style/novel.css",
-        manuscript_prefix="../manuscript",
-        sigil_rel_base="../assets/sigils",
+    index_build_rel = os.path.relpath(index_build_path, BASE)
+    outputs[index_build_rel] = index_key
+    if old_outputs.get(index_build_rel) != index_key or not os.path.isfile(index_build_path):
+        index_build_html = generate_index(
+            chapters,
+            style_href="../style/novel.css",
+            manuscript_prefix="../manuscript",
+            sigil_rel_base="../assets/sigils",
+            search_base="../",
+        )
+        with open(index_build_path, "w") as f:
+            f.write(index_build_html)
+        written += 1
+        print(f"  ✓ Index (legacy) → {index_build_path}")
+
+    # Reader search index: per-chapter postings are cached by draft, so an edit
+    # re-tokenizes one chapter and rewrites only the shards whose terms moved.
+    search_meta_path = os.path.join(SEARCH_DIR, SEARCH_LANG, "meta.json")
+    search_rel = os.path.relpath(search_meta_path, BASE)
+    search_shared = inputs_key(shared, file_digest(os.path.join(BASE, "tools", "search_text.py")))
+    search_chapters = [
+        [os.path.relpath(ch["draft_path"], BASE),
+         inputs_key(search_shared, drafts[os.path.relpath(ch["draft_path"], BASE)]["sha256"])]
+        for ch in chapters
+    ]
+    search_key = inputs_key(search_chapters)
+    outputs[search_rel] = search_key
+    if old_outputs.get(search_rel) != search_key or not os.path.isfile(search_meta_path):
+        old_search = old.get("search", {})
+        old_keys = dict(old_search.get("chapters", []))
+        prefixes = None
+        if (
+            old_search.get("shared") == search_shared
+            and list(old_keys) == [rel for rel, _ in search_chapters]
+            and os.path.isfile(search_meta_path)
+        ):
+            prefixes = set()
+            for (rel, key), ch in zip(search_chapters, chapters):
+                if old_keys[rel] == key:
+                    continue
+                before = load_chapter_postings(old_keys[rel])
+                if before is None:
+                    prefixes = None
+                    break
+                prefixes |= changed_prefixes(before, load_chapter_postings(key, ch))
+        postings = [load_chapter_postings(key, ch) for (_, key), ch in zip(search_chapters, chapters)]
+        changed, total = write_search_index(*build_search_index(chapters, postings, prefixes))
+        written += 1
+        scope = "all shards" if prefixes is None else f"{len(prefixes)} term prefixes"
+        print(f"  ✓ Search index → {os.path.dirname(search_meta_path)} ({changed}/{total} files changed, {scope})")
+    prune_chapter_postings({key for _, key in search_chapters})
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "drafts": drafts,
+        "outputs": outputs,
+        "search": {"shared": search_shared, "chapters": search_chapters},
+    }
+    save_manifest(manifest)
+    print(f"\nDone. {len(chapters)} chapters converted ({written} files written, {len(outputs) - written} unchanged).")
+    return manifest
+
+
+def is_watched(path):
+    """True for source files a rebuild depends on (never our own .html outputs)."""
+    rel = os.path.relpath(path, BASE)
+    if rel in WATCH_FILES:
+        return True
+    if rel.startswith("manuscript" + os.sep):
+        return rel.endswith(".draft.md")
+    if rel.startswith(os.path.join("assets", "sigils") + os.sep):
+        return rel.endswith(".svg")
+    return rel.startswith("style" + os.sep) and "__pycache__" not in rel
+
+
+def scan_sources():
+    """(mtime_ns, size) of every watched file."""
+    snap = {}
+    paths = [os.path.join(BASE, name) for name in WATCH_FILES]
+    for d in WATCH_DIRS:
+        for dirpath, _dirs, files in os.walk(os.path.join(BASE, d)):
+            paths.extend(os.path.join(dirpath, name) for name in files)
+    for path in paths:
+        if not is_watched(path):
+            continue
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            continue
+        snap[path] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+
+def poll_changes(interval):
+    """Yield sets of changed source paths by diffing periodic directory scans."""
+    prev = scan_sources()
+    while True:
+        time.sleep(interval)
+        cur = scan_sources()
+        if cur != prev:
+            changed = {p for p in cur.keys() | prev.keys() if cur.get(p) != prev.get(p)}
+            prev = cur
+            yield changed
+
+
+def notify_changes(debounce):
+    """Yield sets of changed source paths from filesystem notifications (watchdog)."""
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    pending = set()
+    cond = threading.Condition()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            paths = (event.src_path, getattr(event, "dest_path", ""))
+            hits = {os.fsdecode(p) for p in paths if p and is_watched(os.fsdecode(p))}
+            if hits:
+                with cond:
+                    pending.update(hits)
+                    cond.notify()
+
+    handler = Handler()
+    observer = Observer()
+    for d in WATCH_DIRS:
+        if os.path.isdir(os.path.join(BASE, d)):
+            observer.schedule(handler, os.path.join(BASE, d), recursive=True)
+    for d in sorted({os.path.dirname(os.path.join(BASE, name)) for name in WATCH_FILES}):
+        if os.path.isdir(d):
+            observer.schedule(handler, d, recursive=False)  # book.yaml, illustrations manifest
+    observer.start()
+    try:
+        while True:
+            with cond:
+                while not pending:
+                    cond.wait()
+            time.sleep(debounce)
+            with cond:
+                changed = set(pending)
+                pending.clear()
+            yield changed
+    finally:
+        observer.stop()
+        observer.join()
+
+
+def publish_book():
+    """Copy the book into site/ so `wrangler pages dev --live-reload` reloads open pages."""
+    root = os.path.dirname(os.path.dirname(BASE))
+    script = os.path.join(root, "tools", "publish_book.py")
+    if not os.path.isfile(script):
+        print(f"  ! publish skipped: {script} not found")
+        return
+    subprocess.run([sys.executable, script, "--slug", os.path.basename(BASE), "--root", root], check=False)
+
+
+def watch(manifest, jobs=1, publish=False):
+    """Rebuild on every source change, keeping parsed drafts and digests in memory."""
+    global SIGIL_MAP, ILLUST_SIZES
+    try:
+        import watchdog  # noqa: F401
+        changes, how = notify_changes(WATCH_DEBOUNCE), "filesystem events"
+    except ImportError:
+        changes, how = poll_changes(WATCH_POLL_INTERVAL), f"polling every {WATCH_POLL_INTERVAL}s"
+    print(f"\nWatching {', '.join(d + '/' for d in WATCH_DIRS)} and {', '.join(WATCH_FILES)} ({how}); Ctrl-C to stop.")
+    try:
+        for changed in changes:
+            rels = sorted(os.path.relpath(p, BASE) for p in changed)
+            print(f"\n[watch] changed: {', '.join(rels)}")
+            started = time.perf_counter()
+            if "book.yaml" in rels:
+                apply_book_config(load_book_config())
+            if os.path.join("style", "chapter-svg-themes.yaml") in rels:
+                SIGIL_MAP = load_sigil_map()
+            if ILLUST_MANIFEST_REL in rels:
+                ILLUST_SIZES = load_illust_sizes()
+            manifest = build(manifest, jobs=jobs)
+            print(f"[watch] rebuilt in {(time.perf_counter() - started) * 1000:.0f} ms")
+            if publish:
+                publish_book()
+    except KeyboardInterrupt:
+        print()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--force", action="store_true", help="Ignore the build manifest and rewrite every output")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse/render chapters on N worker processes (0 = one per CPU; default: 1)",
+    )
+    ap.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild affected chapters when manuscript/, assets/sigils/ or style/ change",
+    )
+    ap.add_argument(
+        "--publish",
+        action="store_true",
+        help="With --watch: run tools/publish_book.py after each rebuild (live-reloads `npm run dev`)",
     )
-    with open(index_build_path, "w") as f:
-        f.write(index_build_html)
-    print(f"  ✓ Index (legacy) → {index_build_path}")
-    print(f"\nDone. {len(chapters)} chapters converted.")
+    args = ap.parse_args(argv)
+    if args.publish and not args.watch:
+        ap.error("--publish requires --watch")
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    manifest = build({} if args.force else load_manifest(), jobs=jobs)
+    if args.watch:
+        if args.publish:
+            publish_book()
+        watch(manifest, jobs=jobs, publish=args.publish)
 
 
 if __name__ == "__main__":
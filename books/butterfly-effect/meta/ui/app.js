@@ -4,6 +4,11 @@
 
   let DATA = null;
   let mermaidReady = false;
+  // Doc bodies live in per-document shards (see tools/build_storyos.py); fetched on open.
+  const DOC_CACHE = {};
+  // Full-text index (meta/storyos/search.{json,bin}); fetched on first query.
+  let SEARCH = null;
+  let openDocByPath = null;
 
   // ── Data loading ──────────────────────────
 
@@ -14,6 +19,25 @@
     renderAll();
   }
 
+  function loadDocContent(item) {
+    // Older payloads embedded the body directly.
+    if (item.content != null) return Promise.resolve(item.content);
+    if (!item.shard) return Promise.resolve("");
+    if (!DOC_CACHE[item.shard]) {
+      DOC_CACHE[item.shard] = fetch("../" + item.shard)
+        .then(function (resp) {
+          if (!resp.ok) throw new Error("Failed to load " + item.shard);
+          return resp.json();
+        })
+        .then(function (shard) { return shard.content || ""; })
+        .catch(function (err) {
+          delete DOC_CACHE[item.shard];
+          throw err;
+        });
+    }
+    return DOC_CACHE[item.shard];
+  }
+
   // ── Lightweight markdown → HTML ───────────
 
   function mdToHtml(src) {
@@ -175,6 +199,8 @@
 
   function initSearch() {
     var input = document.getElementById("search");
+    var results = document.getElementById("search-results");
+    var timer = null;
     input.addEventListener("input", function () {
       var q = input.value.toLowerCase().trim();
       document.querySelectorAll("table tbody tr").forEach(function (tr) {
@@ -185,6 +211,135 @@
         var text = card.textContent.toLowerCase();
         card.style.display = q.length > 0 && text.indexOf(q) === -1 ? "none" : "";
       });
+      clearTimeout(timer);
+      timer = setTimeout(function () { runFullText(input.value, results); }, 120);
+    });
+  }
+
+  // Must match tools/search_text.py: NFKD, drop combining marks, lowercase.
+  function foldTerm(s) {
+    return s.normalize("NFKD").replace(/\p{M}/gu, "").toLowerCase().replace(/\u2019/g, "'");
+  }
+
+  function queryTerms(q) {
+    var m = q.match(/[\p{L}\p{N}]+(?:['\u2019][\p{L}\p{N}]+)*/gu) || [];
+    return m.map(foldTerm).filter(function (t) { return t.length >= 2; });
+  }
+
+  function loadSearchIndex() {
+    if (!SEARCH) {
+      SEARCH = fetch("../storyos/search.json")
+        .then(function (resp) {
+          if (!resp.ok) throw new Error("Failed to load search index");
+          return resp.json();
+        })
+        .then(function (idx) {
+          return fetch("../" + idx.postings).then(function (resp) {
+            if (!resp.ok) throw new Error("Failed to load search postings");
+            return resp.arrayBuffer();
+          }).then(function (buf) {
+            var starts = new Uint32Array(idx.lengths.length + 1);
+            for (var i = 0; i < idx.lengths.length; i++) starts[i + 1] = starts[i] + idx.lengths[i];
+            idx.starts = starts;
+            idx.blob = new Uint8Array(buf);
+            return idx;
+          });
+        })
+        .catch(function (err) {
+          SEARCH = null;
+          throw err;
+        });
+    }
+    return SEARCH;
+  }
+
+  // Postings for term i: varints "doc delta, count, offsets..." (see build_storyos.py).
+  function decodePostings(idx, i) {
+    var out = {};
+    var blob = idx.blob, pos = idx.starts[i], end = idx.starts[i + 1];
+    function next() {
+      var v = 0, shift = 0, b;
+      do {
+        b = blob[pos++];
+        v += (b & 0x7f) * Math.pow(2, shift);
+        shift += 7;
+      } while (b & 0x80);
+      return v;
+    }
+    var doc = 0;
+    while (pos < end) {
+      doc += next();
+      var count = next();
+      var n = Math.min(count, idx.max_offsets), off = 0, offsets = [];
+      for (var k = 0; k < n; k++) { off += next(); offsets.push(off); }
+      out[doc] = { count: count, offsets: offsets };
+    }
+    return out;
+  }
+
+  function termRange(terms, prefix) {
+    var lo = 0, hi = terms.length;
+    while (lo < hi) {
+      var mid = (lo + hi) >> 1;
+      if (terms[mid] < prefix) lo = mid + 1; else hi = mid;
+    }
+    var range = [];
+    for (var i = lo; i < terms.length && terms[i].lastIndexOf(prefix, 0) === 0 && range.length < 50; i++) range.push(i);
+    return range;
+  }
+
+  // Every query term must match; the last one also matches as a prefix.
+  function searchIndex(idx, terms) {
+    var scores = null;
+    terms.forEach(function (term, n) {
+      var ids = n === terms.length - 1 ? termRange(idx.terms, term) : termRange(idx.terms, term).filter(function (i) {
+        return idx.terms[i] === term;
+      });
+      var hits = {};
+      ids.forEach(function (i) {
+        var postings = decodePostings(idx, i);
+        Object.keys(postings).forEach(function (doc) {
+          hits[doc] = (hits[doc] || 0) + postings[doc].count;
+        });
+      });
+      if (scores === null) {
+        scores = hits;
+      } else {
+        Object.keys(scores).forEach(function (doc) {
+          if (hits[doc]) scores[doc] += hits[doc]; else delete scores[doc];
+        });
+      }
+    });
+    return Object.keys(scores || {})
+      .map(function (doc) { return { doc: idx.docs[doc], score: scores[doc] }; })
+      .sort(function (a, b) { return b.score - a.score || (a.doc.path < b.doc.path ? -1 : 1); });
+  }
+
+  function runFullText(q, results) {
+    var terms = queryTerms(q);
+    results.innerHTML = "";
+    if (!terms.length) return;
+    loadSearchIndex().then(function (idx) {
+      if (queryTerms(document.getElementById("search").value).join(" ") !== terms.join(" ")) return;
+      var hits = searchIndex(idx, terms);
+      results.innerHTML = "";
+      results.appendChild(h("p", { class: "search-count" }, hits.length + " match" + (hits.length === 1 ? "" : "es")));
+      var list = h("ul");
+      hits.slice(0, 20).forEach(function (hit) {
+        var d = hit.doc;
+        var link = h("a", { href: d.kind === "chapter" ? "../../" + d.path : "#docs", title: d.path }, d.title || d.path);
+        if (d.kind === "doc") {
+          link.addEventListener("click", function (e) {
+            e.preventDefault();
+            switchView("docs");
+            if (openDocByPath) openDocByPath(d.path);
+          });
+        }
+        list.appendChild(h("li", null, [link, h("span", { class: "search-score" }, " " + hit.score)]));
+      });
+      results.appendChild(list);
+    }).catch(function (err) {
+      results.textContent = err.message;
     });
   }
 
@@ -311,6 +466,11 @@
       index.appendChild(table);
     });
 
+    openDocByPath = function (path) {
+      var item = docs.filter(function (d) { return d.path === path; })[0];
+      if (item) showDoc(item, index, detail, detailTitle, detailPath, detailBody);
+    };
+
     backBtn.addEventListener("click", function () {
       detail.style.display = "none";
       index.style.display = "";
@@ -325,7 +485,18 @@
     detail.style.display = "";
     titleEl.textContent = item.name;
     pathEl.textContent = item.path;
-    bodyEl.innerHTML = mdToHtml(item.content || "");
+    bodyEl.innerHTML = "";
+    bodyEl.appendChild(h("p", { style: "color:#9ca3af" }, "Loading\u2026"));
+    bodyEl.dataset.path = item.path;
+    loadDocContent(item).then(function (content) {
+      // Ignore responses for a doc the user has already navigated away from.
+      if (bodyEl.dataset.path !== item.path) return;
+      bodyEl.innerHTML = mdToHtml(content);
+    }, function (err) {
+      if (bodyEl.dataset.path !== item.path) return;
+      bodyEl.innerHTML = "";
+      bodyEl.appendChild(h("p", { style: "color:#9ca3af" }, err.message));
+    });
   }
 
   // ── Story Map ─────────────────────────────
@@ -473,9 +644,20 @@
     el.appendChild(h("p", { style: "color:#9ca3af" }, "Diagrams will render when this tab is selected."));
   }
 
+  // Diagrams are pre-rendered to SVG by tools/build_storyos.py; mermaid is
+  // fetched only for a diagram that has no SVG (e.g. mmdc was not installed).
+  function loadMermaid() {
+    if (typeof mermaid !== "undefined") return Promise.resolve();
+    return new Promise(function (resolve, reject) {
+      var script = document.createElement("script");
+      script.src = "vendor/mermaid.min.js";
+      script.onload = function () { resolve(); };
+      script.onerror = function () { reject(new Error("Failed to load mermaid")); };
+      document.head.appendChild(script);
+    });
+  }
+
   function initMermaid() {
-    if (typeof mermaid === "undefined") return;
-    mermaid.initialize({ startOnLoad: false, theme: "neutral" });
     mermaidReady = true;
 
     var el = document.getElementById("view-graphs");
@@ -483,18 +665,31 @@
     el.appendChild(h("h2", null, "Graphs"));
 
     var diagrams = DATA.mermaid || {};
+    var svgs = DATA.mermaid_svg || {};
     var pending = [];
     [["Pipeline", "pipeline"], ["Arc Map", "arc_map"], ["Butterfly Graph", "butterfly"]].forEach(function (pair) {
       var code = diagrams[pair[1]];
       if (!code) return;
       el.appendChild(h("h3", null, pair[0]));
       var container = h("div", { class: "mermaid-container" });
-      var pre = h("pre", { class: "mermaid" }, code);
-      container.appendChild(pre);
+      if (svgs[pair[1]]) {
+        container.appendChild(h("img", { src: "../" + svgs[pair[1]], alt: pair[0], decoding: "async" }));
+      } else {
+        var pre = h("pre", { class: "mermaid" }, code);
+        container.appendChild(pre);
+        pending.push(pre);
+      }
       el.appendChild(container);
-      pending.push(pre);
     });
-    mermaid.run({ nodes: pending });
+    if (!pending.length) return;
+    loadMermaid().then(function () {
+      mermaid.initialize({ startOnLoad: false, theme: "neutral" });
+      mermaid.run({ nodes: pending });
+    }).catch(function (err) {
+      pending.forEach(function (pre) {
+        pre.parentNode.insertBefore(h("p", { style: "color:#9ca3af" }, err.message), pre);
+      });
+    });
   }
 
   // ── Init ──────────────────────────────────
@@ -0,0 +1,43 @@
+"""Rule compilation in tools/prose_lint.py: run with `python3 -m pytest books/butterfly-effect/tests`."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+
+from prose_lint import Rule, _first_char, compile_rules  # noqa: E402
+
+
+def rule(id: str, pattern: str) -> Rule:
+    return Rule(id=id, kind="forbidden", pattern=pattern, message=id)
+
+
+def test_first_char_only_for_certain_literals():
+    assert _first_char(r"\bwhispered softly\b") == "w"
+    assert _first_char(r"very|really") is None
+    assert _first_char(r"a?bc") is None
+    assert _first_char(r"a*bc") is None
+    assert _first_char(r"a{0,2}bc") is None
+    assert _first_char(r"(?:very|really)") is None
+    assert _first_char(r"v(?:ery|ast)") == "v"
+    assert _first_char(r"[|]x") is None
+
+
+def test_alternation_rule_matches_every_branch():
+    rules = compile_rules([rule("intensifier", r"\b(?:very)\b|\breally\b"), rule("plain", r"\bnodded\b")])
+    assert [r.id for r in rules.scan("It was really late; she nodded.")] == ["intensifier", "plain"]
+    rules = compile_rules([rule("intensifier", r"very|really"), rule("plain", r"nodded")])
+    assert [r.id for r in rules.scan("really very")] == ["intensifier", "intensifier"]
+
+
+def test_optional_first_atom_matches_without_it():
+    rules = compile_rules([rule("optional", r"a?bc"), rule("plain", r"zz")])
+    assert [r.id for r in rules.scan("xbc")] == ["optional"]
+    assert [r.id for r in rules.scan("bc")] == ["optional"]
+    assert [r.id for r in rules.scan("abc")] == ["optional"]
+
+
+def test_prefilter_kept_for_plain_literals():
+    rules = compile_rules([rule("a", r"\bwhispered\b"), rule("b", r"nodded")])
+    assert rules.matcher.pattern.startswith("(?=[")
+    assert [r.id for r in rules.scan("He Nodded and whispered.")] == ["b", "a"]
@@ -14,13 +14,19 @@ Plan formats accepted:
        { version, chapter, draft_path, inserts: [...] }
   2) Multi-chapter:
        { version, chapters: [{chapter, draft_path, inserts: [...]}, ...] }
+
+Each draft is split into paragraphs once, all of its inserts are applied to
+that index, and it is joined once; drafts are processed in parallel (--jobs).
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import os
 import re
 import sys
+from collections import Counter
 from pathlib import Path
 
 import yaml
@@ -45,102 +51,110 @@ def _find_para_indexes(chunks: list[str], needle: str) -> list[int]:
     return idxs
 
 
-def _apply_insert_after(text: str, *, anchor: str, marker: str, occurrence: int | None) -> str:
-    chunks = _split_chunks(text)
-    idxs = _find_para_indexes(chunks, anchor)
-    if not idxs:
-        raise ValueError(f'anchor not found for after_paragraph_including: {anchor!r}')
-    if occurrence is None:
-        if len(idxs) != 1:
-            raise ValueError(f'anchor matched {len(idxs)} paragraphs; add apply.occurrence to disambiguate: {anchor!r}')
-        i = idxs[0]
-    else:
+class DraftIndex:
+    """
+    One draft split into paragraph/separator chunks, plus the marker ids it holds.
+
+    Built once per draft: every insert edits the chunk list in place and keeps
+    the id counts current, and the text is joined once at the end. Edits keep
+    the invariant that paragraphs sit at even indexes, so the chunk list always
+    equals `_split_chunks(self.text())`.
+    """
+
+    def __init__(self, text: str) -> None:
+        self.reset(text)
+
+    def reset(self, text: str) -> None:
+        self.chunks = _split_chunks(text)
+        self.ids = Counter(m.group(3).lower() for m in MARKER_ID_RE.finditer(text))
+
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def has_marker(self, ins_id: str) -> bool:
+        return self.ids[ins_id.lower()] > 0
+
+    def _count(self, chunk: str, sign: int) -> None:
+        for m in MARKER_ID_RE.finditer(chunk):
+            self.ids[m.group(3).lower()] += sign
+
+    def set_chunk(self, i: int, value: str) -> None:
+        self._count(self.chunks[i], -1)
+        self.chunks[i] = value
+        self._count(value, 1)
+
+    def insert_chunks(self, at: int, values: list[str]) -> None:
+        self.chunks[at:at] = values
+        for value in values:
+            self._count(value, 1)
+
+    def paragraph(self, anchor: str, occurrence: int | None, mode: str) -> int:
+        """Chunk index of the paragraph containing `anchor` (1-based `occurrence` when ambiguous)."""
+        idxs = _find_para_indexes(self.chunks, anchor)
+        if not idxs:
+            raise ValueError(f"anchor not found for {mode}: {anchor!r}")
+        if occurrence is None:
+            if len(idxs) != 1:
+                raise ValueError(f"anchor matched {len(idxs)} paragraphs; add apply.occurrence to disambiguate: {anchor!r}")
+            return idxs[0]
         if occurrence < 1 or occurrence > len(idxs):
             raise ValueError(f"occurrence out of range: {occurrence} (matches: {len(idxs)}) for {anchor!r}")
-        i = idxs[occurrence - 1]
+        return idxs[occurrence - 1]
 
-    if i + 1 < len(chunks):
-        sep = chunks[i + 1]
-        insert_at = i + 2  # after the separator following the paragraph
-        chunks[insert_at:insert_at] = [marker, sep]
+
+def _apply_insert_after(doc: DraftIndex, *, anchor: str, marker: str, occurrence: int | None) -> None:
+    i = doc.paragraph(anchor, occurrence, "after_paragraph_including")
+    if i + 1 < len(doc.chunks):
+        sep = doc.chunks[i + 1]
+        doc.insert_chunks(i + 2, [marker, sep])  # after the separator following the paragraph
     else:
         # Paragraph is last; create a separator before the marker.
-        sep = "\n\n"
-        chunks.extend([sep, marker])
-    return "".join(chunks)
-
-
-def _apply_insert_before(text: str, *, anchor: str, marker: str, occurrence: int | None) -> str:
-    chunks = _split_chunks(text)
-    idxs = _find_para_indexes(chunks, anchor)
-    if not idxs:
-        raise ValueError(f'anchor not found for before_paragraph_including: {anchor!r}')
-    if occurrence is None:
-        if len(idxs) != 1:
-            raise ValueError(f'anchor matched {len(idxs)} paragraphs; add apply.occurrence to disambiguate: {anchor!r}')
-        i = idxs[0]
-    else:
-        if occurrence < 1 or occurrence > len(idxs):
-            raise ValueError(f"occurrence out of range: {occurrence} (matches: {len(idxs)}) for {anchor!r}")
-        i = idxs[occurrence - 1]
-
-    sep = chunks[i - 1] if i > 0 else "\n\n"
-    chunks[i:i] = [marker, sep]
-    return "".join(chunks)
-
-def _apply_inline_after(text: str, *, anchor: str, marker: str, occurrence: int | None) -> str:
-    chunks = _split_chunks(text)
-    idxs = _find_para_indexes(chunks, anchor)
-    if not idxs:
-        raise ValueError(f'anchor not found for after_paragraph_including: {anchor!r}')
-    if occurrence is None:
-        if len(idxs) != 1:
-            raise ValueError(f'anchor matched {len(idxs)} paragraphs; add apply.occurrence to disambiguate: {anchor!r}')
-        i = idxs[0]
-    else:
-        if occurrence < 1 or occurrence > len(idxs):
-            raise ValueError(f"occurrence out of range: {occurrence} (matches: {len(idxs)}) for {anchor!r}")
-        i = idxs[occurrence - 1]
+        doc.insert_chunks(i + 1, ["\n\n", marker])
+
+
+def _apply_insert_before(doc: DraftIndex, *, anchor: str, marker: str, occurrence: int | None) -> None:
+    i = doc.paragraph(anchor, occurrence, "before_paragraph_including")
+    sep = doc.chunks[i - 1] if i > 0 else "\n\n"
+    doc.insert_chunks(i, [marker, sep])
+
 
-    para = chunks[i]
+def _apply_inline_after(doc: DraftIndex, *, anchor: str, marker: str, occurrence: int | None) -> None:
+    i = doc.paragraph(anchor, occurrence, "after_paragraph_including")
+    para = doc.chunks[i]
     m = re.search(r"(\s*)\Z", para)
     tail_ws = m.group(1) if m else ""
     head = para[: m.start()] if m else para
     joiner = "" if not head or head.endswith((" ", "\t")) else " "
-    chunks[i] = f"{head}{joiner}{marker}{tail_ws}"
-    return "".join(chunks)
-
-
-def _apply_inline_before(text: str, *, anchor: str, marker: str, occurrence: int | None) -> str:
-    chunks = _split_chunks(text)
-    idxs = _find_para_indexes(chunks, anchor)
-    if not idxs:
-        raise ValueError(f'anchor not found for before_paragraph_including: {anchor!r}')
-    if occurrence is None:
-        if len(idxs) != 1:
-            raise ValueError(f'anchor matched {len(idxs)} paragraphs; add apply.occurrence to disambiguate: {anchor!r}')
-        i = idxs[0]
-    else:
-        if occurrence < 1 or occurrence > len(idxs):
-            raise ValueError(f"occurrence out of range: {occurrence} (matches: {len(idxs)}) for {anchor!r}")
-        i = idxs[occurrence - 1]
+    doc.set_chunk(i, f"{head}{joiner}{marker}{tail_ws}")
+
 
-    para = chunks[i]
+def _apply_inline_before(doc: DraftIndex, *, anchor: str, marker: str, occurrence: int | None) -> None:
+    i = doc.paragraph(anchor, occurrence, "before_paragraph_including")
+    para = doc.chunks[i]
     m = re.match(r"^(\s*)", para)
     lead_ws = m.group(1) if m else ""
     rest = para[len(lead_ws) :]
     joiner = "" if not rest or rest.startswith((" ", "\t")) else " "
-    chunks[i] = f"{lead_ws}{marker}{joiner}{rest}"
-    return "".join(chunks)
+    doc.set_chunk(i, f"{lead_ws}{marker}{joiner}{rest}")
 
 
-def _apply_replace_exact(text: str, *, old: str, marker: str) -> str:
-    count = text.count(old)
+def _apply_replace_exact(doc: DraftIndex, *, old: str, marker: str) -> None:
+    spans = "\n" in old  # may cross a paragraph break: search the joined text
+    if spans:
+        text = doc.text()
+        count = text.count(old)
+    else:
+        # Separators are pure newlines, so a match lies inside one paragraph chunk.
+        hits = [i for i in range(0, len(doc.chunks), 2) if old in doc.chunks[i]]
+        count = sum(doc.chunks[i].count(old) for i in hits)
     if count == 0:
         raise ValueError(f"replace_exact not found: {old!r}")
     if count != 1:
         raise ValueError(f"replace_exact matched {count} times (must be exactly 1): {old!r}")
-    return text.replace(old, marker, 1)
+    if spans:
+        doc.reset(text.replace(old, marker, 1))
+    else:
+        doc.set_chunk(hits[0], doc.chunks[hits[0]].replace(old, marker, 1))
 
 
 def _normalize_plan(data: object) -> list[dict]:
@@ -172,20 +186,13 @@ def _marker_for(insert: dict) -> str:
     return f"<!-- @{kind} {typ}: {ins_id} | {text} -->"
 
 
-def _already_present(text: str, ins_id: str) -> bool:
-    for m in MARKER_ID_RE.finditer(text):
-        if m.group(3).lower() == ins_id.lower():
-            return True
-    return False
-
-
-def _apply_one_insert(text: str, insert: dict) -> tuple[str, bool]:
+def _apply_one_insert(doc: DraftIndex, insert: dict) -> bool:
     ins_id = str(insert.get("id") or "").strip()
     marker = _marker_for(insert)
     typ = str(insert.get("type") or "").strip().lower()
 
-    if _already_present(text, ins_id):
-        return text, False
+    if doc.has_marker(ins_id):
+        return False
 
     apply = insert.get("apply")
     if not isinstance(apply, dict):
@@ -210,23 +217,66 @@ def _apply_one_insert(text: str, insert: dict) -> tuple[str, bool]:
     if typ == "full" and mode == "replace_exact":
         raise ValueError(f"full inserts must not use apply.replace_exact (id={ins_id})")
 
-    out = text
     if mode == "after_paragraph_including":
         if typ == "full":
-            out = _apply_insert_after(out, anchor=value, marker=marker, occurrence=occurrence)
+            _apply_insert_after(doc, anchor=value, marker=marker, occurrence=occurrence)
         else:
-            out = _apply_inline_after(out, anchor=value, marker=marker, occurrence=occurrence)
+            _apply_inline_after(doc, anchor=value, marker=marker, occurrence=occurrence)
     elif mode == "before_paragraph_including":
         if typ == "full":
-            out = _apply_insert_before(out, anchor=value, marker=marker, occurrence=occurrence)
+            _apply_insert_before(doc, anchor=value, marker=marker, occurrence=occurrence)
         else:
-            out = _apply_inline_before(out, anchor=value, marker=marker, occurrence=occurrence)
+            _apply_inline_before(doc, anchor=value, marker=marker, occurrence=occurrence)
     elif mode == "replace_exact":
-        out = _apply_replace_exact(out, old=value, marker=marker)
+        _apply_replace_exact(doc, old=value, marker=marker)
+        return value != marker
     else:
         raise ValueError(f"unknown apply mode: {mode!r} for id={ins_id}")
+    return True
+
+
+def _apply_chapter_text(text: str, inserts: list) -> tuple[str | None, bool, str | None]:
+    """Apply `inserts` in order; returns (updated text, changed, error)."""
+    doc = DraftIndex(text)
+    changed = False
+    for ins in inserts:
+        try:
+            if not isinstance(ins, dict):
+                raise ValueError("insert must be a mapping")
+            changed |= _apply_one_insert(doc, ins)
+        except Exception as e:
+            return None, False, str(e)
+    return doc.text(), changed, None
+
+
+def _apply_chapter(task: tuple[str, list]) -> tuple[str | None, bool, str | None]:
+    draft, inserts = task
+    return _apply_chapter_text(Path(draft).read_text(encoding="utf-8"), inserts)
+
+
+def _chapter_tasks(chapters: list) -> list[tuple[str, list]]:
+    """(draft path, inserts) per draft, in plan order; entries for the same draft are merged."""
+    tasks: dict[str, list] = {}
+    for ch in chapters:
+        if not isinstance(ch, dict):
+            raise ValueError("chapter entry must be a mapping")
+
+        draft_path = ch.get("draft_path") or ch.get("path") or ch.get("draft")
+        if not draft_path:
+            raise ValueError("chapter entry missing draft_path")
+        draft = Path(str(draft_path))
+        if not draft.is_absolute():
+            draft = ROOT / draft
+        if not draft.is_file():
+            raise ValueError(f"draft not found: {draft}")
 
-    return out, (out != text)
+        inserts = ch.get("inserts")
+        if inserts is None:
+            inserts = []
+        if not isinstance(inserts, list):
+            raise ValueError(f"inserts must be a list for draft {draft}")
+        tasks.setdefault(str(draft), []).extend(inserts)
+    return list(tasks.items())
 
 
 def _load_yaml(path: Path) -> object:
@@ -241,6 +291,7 @@ def main(argv: list[str]) -> int:
         help="YAML plan path (relative to book root unless absolute)",
     )
     ap.add_argument("--write", action="store_true", help="Write changes in-place")
+    ap.add_argument("--jobs", type=int, default=0, help="Chapters processed in parallel (0 = one per CPU; default: 0)")
     args = ap.parse_args(argv)
 
     plan_path = Path(args.plan)
@@ -257,51 +308,32 @@ def main(argv: list[str]) -> int:
         print(f"error: invalid plan: {e}", file=sys.stderr)
         return 2
 
-    any_changes = False
-    for ch in chapters:
-        if not isinstance(ch, dict):
-            print("error: chapter entry must be a mapping", file=sys.stderr)
-            return 2
+    try:
+        tasks = _chapter_tasks(chapters)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
 
-        draft_path = ch.get("draft_path") or ch.get("path") or ch.get("draft")
-        if not draft_path:
-            print("error: chapter entry missing draft_path", file=sys.stderr)
-            return 2
-        draft = Path(str(draft_path))
-        if not draft.is_absolute():
-            draft = ROOT / draft
-        if not draft.is_file():
-            print(f"error: draft not found: {draft}", file=sys.stderr)
-            return 2
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if jobs <= 1 or len(tasks) <= 1:
+        results = [_apply_chapter(t) for t in tasks]
+    else:
+        workers = min(jobs, len(tasks))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(_apply_chapter, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
 
-        inserts = ch.get("inserts")
-        if inserts is None:
-            inserts = []
-        if not isinstance(inserts, list):
-            print(f"error: inserts must be a list for draft {draft}", file=sys.stderr)
+    any_changes = False
+    for (draft, _), (updated, changed, error) in zip(tasks, results):
+        if error is not None:
+            print(f"error: {draft}: {error}", file=sys.stderr)
             return 2
+        any_changes |= changed
 
-        original = draft.read_text(encoding="utf-8")
-        updated = original
-
-        for ins in inserts:
-            if not isinstance(ins, dict):
-                print(f"error: insert must be a mapping for draft {draft}", file=sys.stderr)
-                return 2
-            try:
-                updated, changed = _apply_one_insert(updated, ins)
-            except Exception as e:
-                print(f"error: {draft}: {e}", file=sys.stderr)
-                return 2
-
-            if changed:
-                any_changes = True
-
-        if args.write and updated != original:
+        if args.write and changed:
             # Ensure the file ends with a newline (common convention).
             if not updated.endswith("\n"):
                 updated += "\n"
-            draft.write_text(updated, encoding="utf-8")
+            Path(draft).write_text(updated, encoding="utf-8")
 
     if not args.write:
         # In dry-run mode, exit 1 if changes would occur (useful for CI-style checks).
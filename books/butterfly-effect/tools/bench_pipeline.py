@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Benchmark the book build and translation tooling on a synthetic manuscript.
+
+Generates N chapters of realistic drafts (header + beat comments, paragraphs with
+emphasis and Satya terms, blockquotes, scene breaks, @illust/@diagram markers,
+trailing continuity notes) in a temp book root, then times:
+
+  - convert.parse_draft / convert.prose_to_html   (build/convert.py)
+  - build_storyos.main                            (against the synthetic root; cold = --no-cache,
+                                                   warm = every source from the parse cache)
+  - Protector.protect / Protector.unprotect       (MT placeholder pass)
+  - translation_qc.qc
+  - prose_lint.lint_file
+
+Usage:
+  python3 tools/bench_pipeline.py
+  python3 tools/bench_pipeline.py --chapters 200 --repeat 3 --json bench.json
+
+Results are printed as a table; --json writes a machine-readable copy for
+tracking regressions as the corpus grows. No model weights are needed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+import build_storyos
+import draft_parser
+import prose_lint
+import translation_qc
+from placeholders import Protector
+
+
+ROOT = Path(__file__).resolve().parents[1]
+PIPELINE_CFG = ROOT / "agents/translation/translation-pipeline.yaml"
+
+# Book sources build_storyos reads besides the manuscript (copied into the synthetic root).
+STORYOS_SKIP = {"manuscript", "meta", "translations", "assets", "build", "tools", ".cache", ".hf-cache", ".venv"}
+
+WORDS = (
+    "the glass harbor tide lens signal tower silence salt flats light wind "
+    "bell hull rope ledger ash current reef lantern copper river steel "
+    "grinding crooked amber narrow ancient patient quiet broken careful "
+    "remembered carried counted listened waited turned watched measured "
+    "against beneath through between across before after under beyond"
+).split()
+POVS = ("Kael", "Moss", "Sūrya", "Dual")
+
+
+def load_convert():
+    spec = importlib.util.spec_from_file_location("convert", ROOT / "build/convert.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ── Synthetic manuscript ──────────────────────────────────────────
+
+def synth_sentence(rng: random.Random, tokens: list[str]) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 22))]
+    roll = rng.random()
+    if roll < 0.25:
+        words[rng.randrange(len(words))] = rng.choice(tokens)
+    elif roll < 0.35:
+        i = rng.randrange(len(words))
+        words[i] = f"*{words[i]}*"
+    elif roll < 0.40:
+        i = rng.randrange(len(words))
+        words[i] = f"**{words[i]}**"
+    return " ".join(words).capitalize() + rng.choice((".", ".", ".", "?", "!", " —"))
+
+
+def synth_paragraph(rng: random.Random, tokens: list[str]) -> str:
+    return " ".join(synth_sentence(rng, tokens) for _ in range(rng.randint(2, 8)))
+
+
+def synth_chapter(rng: random.Random, *, num: int, arc: int, paragraphs: int, tokens: list[str]) -> str:
+    pov = rng.choice(POVS)
+    lines = [
+        f"# Chapter {num}: The {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}",
+        f"<!-- Arc: {arc} | POV: {pov} | Location: Synthetic coast | Timeline: 2587, Month {num % 12 + 1} -->",
+        "<!-- Word count target: 2,500-3,000 -->",
+        "",
+    ]
+    for i in range(paragraphs):
+        roll = rng.random()
+        if i % 15 == 0:
+            lines += [f"<!-- BEAT {i // 15 + 1}: {synth_sentence(rng, tokens)} -->", ""]
+        if roll < 0.04 and i:
+            lines += ["* * *", ""]
+        elif roll < 0.09:
+            lines += [f"> {synth_sentence(rng, tokens)}" for _ in range(rng.randint(1, 3))] + [""]
+        elif roll < 0.12:
+            kind = rng.choice(("illust", "diagram"))
+            lines += [f"<!-- @{kind} full: syn-{num:02d}-{i} | {synth_sentence(rng, tokens)} -->", ""]
+        elif roll < 0.16:
+            mode = rng.choice(("thumb", "link"))
+            marker = f"<!-- @illust {mode}: syn-{num:02d}-{i} | {rng.choice(WORDS)} -->"
+            lines += [f"{synth_paragraph(rng, tokens)} {marker}", ""]
+        else:
+            lines += [synth_paragraph(rng, tokens), ""]
+    lines += ["---", "", "<!-- CONTINUITY NOTES", "- synthetic", "-->", ""]
+    return "\n".join(lines)
+
+
+def build_synthetic_book(dst: Path, *, chapters: int, paragraphs: int, seed: int, tokens: list[str]) -> list[Path]:
+    """Write a book root with the real StoryOS sources and a synthetic manuscript."""
+    for src in ROOT.iterdir():
+        if src.name in STORYOS_SKIP:
+            continue
+        if src.is_dir():
+            shutil.copytree(src, dst / src.name, ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(src, dst / src.name)
+    # Committed diagram SVGs, so build_storyos reuses them instead of starting headless Chrome.
+    graphs = Path(build_storyos.SHARD_DIR) / build_storyos.GRAPHS_DIR
+    if (ROOT / "meta" / graphs).is_dir():
+        shutil.copytree(ROOT / "meta" / graphs, dst / "meta" / graphs)
+
+    rng = random.Random(seed)
+    drafts: list[Path] = []
+    for num in range(1, chapters + 1):
+        arc = min(7, (num - 1) * 7 // chapters + 1)
+        path = dst / "manuscript" / f"arc-{arc}" / f"chapter-{num:02d}.draft.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(synth_chapter(rng, num=num, arc=arc, paragraphs=paragraphs, tokens=tokens), encoding="utf-8")
+        path.with_name(f"chapter-{num:02d}.html").write_text("<!doctype html>\n", encoding="utf-8")
+        drafts.append(path)
+    return drafts
+
+
+def mangle_placeholders(text: str, rng: random.Random) -> str:
+    """Simulate MT output: most placeholders survive, some are 'normalized' by the model."""
+    out = []
+    for part in text.split("__PROT"):
+        if out and rng.random() < 0.2:
+            code, _, rest = part.partition("__")
+            part = f"[{'PROT' + code}]{rest}" if rng.random() < 0.5 else f"_ PROT{code} _{rest}"
+            out.append(part)
+        elif out:
+            out.append("__PROT" + part)
+        else:
+            out.append(part)
+    return "".join(out)
+
+
+# ── Timing ────────────────────────────────────────────────────────
+
+def measure(name: str, fn: Callable[[], Any], *, items: int, repeat: int, setup: Callable[[], Any] | None = None) -> dict:
+    times: list[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    best = min(times)
+    return {
+        "name": name,
+        "items": items,
+        "repeat": repeat,
+        "min_s": round(best, 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        "per_item_us": round(best / max(1, items) * 1e6, 2),
+    }
+
+
+def run(args: argparse.Namespace) -> dict:
+    cfg = yaml.safe_load(PIPELINE_CFG.read_text(encoding="utf-8"))
+    protector = Protector(translation_qc.load_protected_tokens(cfg))
+    convert = load_convert()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory(prefix="bench-book-") as tmp:
+        book = Path(tmp)
+        drafts = build_synthetic_book(
+            book, chapters=args.chapters, paragraphs=args.paragraphs, seed=args.seed, tokens=protector.tokens
+        )
+        parsed = [convert.parse_draft(str(p)) for p in drafts]
+        proses = [d["prose"] for d in parsed]
+        block_lists = [list(draft_parser.load_chapter(p).translatable_blocks) for p in drafts]
+        blocks = [b for bl in block_lists for b in bl]
+        protected = [protector.protect(b) for b in blocks]
+        mt_raw = [mangle_placeholders(p, rng) for p in protected]
+        mt_blocks = [[protector.unprotect(mangle_placeholders(protector.protect(b), rng)) for b in bl] for bl in block_lists]
+
+        def storyos_main(argv: list[str]) -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_storyos.main(argv)
+
+        def storyos_prime() -> None:
+            # Warm runs measure a rebuild with every source served from the parse cache.
+            if not (book / build_storyos.CACHE_PATH).exists():
+                storyos_main([])
+
+        # (name, thunk, measure options); --only selects before anything is timed.
+        benchmarks: list[tuple[str, Callable[[], Any], dict[str, Any]]] = [
+            (
+                "convert.parse_draft",
+                lambda: [convert.parse_draft(str(p)) for p in drafts],
+                {"items": len(drafts), "setup": draft_parser._load_chapter.cache_clear},
+            ),
+            ("convert.prose_to_html", lambda: [convert.prose_to_html(p) for p in proses], {"items": len(proses)}),
+            ("build_storyos.main (cold)", lambda: storyos_main(["--no-cache"]), {"items": 1}),
+            ("build_storyos.main (warm)", lambda: storyos_main([]), {"items": 1, "setup": storyos_prime}),
+            ("Protector.protect", lambda: [protector.protect(b) for b in blocks], {"items": len(blocks)}),
+            ("Protector.unprotect", lambda: [protector.unprotect(m) for m in mt_raw], {"items": len(mt_raw)}),
+            (
+                "translation_qc.qc",
+                lambda: [
+                    translation_qc.qc(src_blocks=src, mt_blocks=mt, protector=protector)
+                    for src, mt in zip(block_lists, mt_blocks)
+                ],
+                {"items": len(block_lists)},
+            ),
+            ("prose_lint.lint_file", lambda: [prose_lint.lint_file(p) for p in drafts], {"items": len(drafts)}),
+        ]
+        if args.only:
+            benchmarks = [b for b in benchmarks if any(sel in b[0] for sel in args.only)]
+
+        original_root = build_storyos.ROOT
+        build_storyos.ROOT = book
+        try:
+            results = [measure(name, fn, repeat=args.repeat, **opts) for name, fn, opts in benchmarks]
+        finally:
+            build_storyos.ROOT = original_root
+
+        corpus = {
+            "chapters": len(drafts),
+            "paragraphs_per_chapter": args.paragraphs,
+            "blocks": len(blocks),
+            "draft_bytes": sum(p.stat().st_size for p in drafts),
+        }
+
+    return {
+        "env": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "yaml_libyaml": bool(getattr(yaml, "__with_libyaml__", False)),
+        },
+        "seed": args.seed,
+        "corpus": corpus,
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark build/translation tooling on a synthetic manuscript")
+    ap.add_argument("--chapters", type=int, default=40, help="Synthetic chapters to generate (default: 40)")
+    ap.add_argument("--paragraphs", type=int, default=50, help="Paragraphs per chapter (default: 50)")
+    ap.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark; min/median/mean reported")
+    ap.add_argument("--seed", type=int, default=1, help="Generator seed (same seed = same corpus)")
+    ap.add_argument("--only", nargs="+", default=None, help="Only report benchmarks whose name contains one of these")
+    ap.add_argument("--json", default=None, help="Write results JSON to this path ('-' for stdout)")
+    args = ap.parse_args(argv)
+
+    report = run(args)
+
+    out = sys.stderr if args.json == "-" else sys.stdout
+    c = report["corpus"]
+    print(f"Synthetic corpus: {c['chapters']} chapters, {c['blocks']} blocks, {c['draft_bytes'] / 1024:.0f} KB", file=out)
+    print(f"  {'benchmark':<28} {'items':>6} {'min ms':>10} {'median ms':>10} {'per item':>12}", file=out)
+    for r in report["results"]:
+        print(
+            f"  {r['name']:<28} {r['items']:>6} {r['min_s'] * 1000:>10.2f} {r['median_s'] * 1000:>10.2f} {r['per_item_us']:>10.1f}us",
+            file=out,
+        )
+
+    if args.json:
+        text = json.dumps(report, indent=2, ensure_ascii=False) + "\n"
+        if args.json == "-":
+            sys.stdout.write(text)
+        else:
+            Path(args.json).write_text(text, encoding="utf-8")
+            print(f"Wrote {args.json}", file=out)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,26 +15,158 @@ Inputs:
   - **/*.md                     (docs index)
 
 Outputs:
-  - meta/storyos.json
+  - meta/storyos.json             (core payload; docs_index without bodies)
+  - meta/storyos/docs/<hash>.json (one content shard per indexed doc)
+  - meta/storyos/manifest.json    (doc path -> shard, bytes, sha256)
+  - meta/storyos/search.json      (full-text index: docs, term dictionary)
+  - meta/storyos/search.bin       (full-text index: varint-packed postings)
+  - meta/storyos/graphs/<name>.<hash>.svg (Mermaid diagrams, tools/render_mermaid.mjs)
   - meta/storyos.md
+
+Parsed results are cached per source file in .cache/storyos-cache.json (keyed on
+size/mtime, falling back to sha256; dropped when the parse code changes), so a
+rebuild after editing one doc re-parses only that doc. Outputs are only rewritten when their bytes change, and
+`generated_at` is carried over when nothing else did.
 """
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
 import re
+import shutil
+import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Callable
 
 import yaml
 
+from draft_parser import parse_chapter
+from search_text import encode_varints, term_postings
+
 ROOT = Path(__file__).resolve().parents[1]
 
+# Doc bodies are split out of the core payload into content-addressed shards
+# (relative to meta/) that the UI fetches only when a document is opened.
+SHARD_DIR = "storyos"
+# Pre-rendered Mermaid diagrams (under meta/storyos/), named by source hash.
+GRAPHS_DIR = "graphs"
+
+CACHE_PATH = ".cache/storyos-cache.json"  # relative to ROOT
+CACHE_VERSION = 1
+
+
+# ── Source cache ──────────────────────────────────────────────────
+
+def code_fingerprint() -> str:
+    """Cached parse results are only valid for the same parsers: this file, draft_parser.py and search_text.py."""
+    h = hashlib.sha256()
+    here = Path(__file__).resolve()
+    for p in (here, here.with_name("draft_parser.py"), here.with_name("search_text.py")):
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+class SourceCache:
+    """
+    Parsed results per input file, keyed on (kind, path).
+
+    A hit needs matching size and mtime_ns; when only the stat changed (checkout,
+    touch) the sha256 of the bytes decides. Values are stored as JSON, and fresh
+    results are round-tripped through JSON too, so cached and uncached runs emit
+    identical output. Entries not used by a run are dropped on save once the run
+    has parsed every source (`complete`; `--check` stops early and keeps them),
+    and the whole cache is dropped when the parse code (code_fingerprint) changes.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.fingerprint = code_fingerprint() if path is not None else ""
+        self.entries: dict[str, dict] = {}
+        self.used: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.complete = False
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = {}
+            if data.get("version") == CACHE_VERSION and data.get("fingerprint") == self.fingerprint:
+                self.entries = data.get("entries", {})
+
+    def parse(
+        self,
+        path: Path,
+        kind: str,
+        fn: Callable[[str], Any],
+        *,
+        errors: str = "strict",
+        valid: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        key = f"{kind}:{path.relative_to(ROOT).as_posix()}"
+        self.used.add(key)
+        st = path.stat()
+        entry = self.entries.get(key)
+        usable = entry is not None and (valid is None or valid(entry["value"]))
+        if usable and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            self.hits += 1
+            return entry["value"]
+
+        raw = path.read_bytes()
+        sha = hashlib.sha256(raw).hexdigest()
+        if usable and entry["sha256"] == sha:
+            value = entry["value"]
+            self.hits += 1
+        else:
+            value = json.loads(json.dumps(fn(raw.decode("utf-8", errors=errors)), ensure_ascii=False))
+            self.misses += 1
+        self.entries[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha, "value": value}
+        self.dirty = True
+        return value
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        if self.complete and set(self.entries) != self.used:
+            self.entries = {k: v for k, v in self.entries.items() if k in self.used}
+            self.dirty = True
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        data = {"version": CACHE_VERSION, "fingerprint": self.fingerprint, "entries": self.entries}
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+# Set by main(); importers that call the loaders directly get an uncached pass.
+_CACHE = SourceCache(None)
+
+
+def read_cached(path: Path, kind: str, fn: Callable[[str], Any], **kwargs: Any) -> Any:
+    return _CACHE.parse(path, kind, fn, **kwargs)
+
+
+def write_if_changed(path: Path, text: str | bytes) -> bool:
+    """Write `text` unless the file already holds exactly these bytes."""
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    return True
+
 # ── YAML loaders ──────────────────────────────────────────────────
 
 def load_yaml(path: Path) -> dict:
-    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    return read_cached(path, "yaml", lambda text: yaml.safe_load(text) or {})
 
 
 def load_storyos() -> dict:
@@ -60,7 +192,10 @@ def parse_arcs_md() -> list[dict]:
     path = ROOT / "outline/ARCS.md"
     if not path.exists():
         return []
-    text = path.read_text(encoding="utf-8")
+    return read_cached(path, "arcs", _arcs_from_text)
+
+
+def _arcs_from_text(text: str) -> list[dict]:
     arcs = []
     for m in re.finditer(
         r"\|\s*(\d+)\s*\|\s*(.+?)\s*\|\s*(\d+)\s*[–-]\s*(\d+)\s*\|",
@@ -79,7 +214,10 @@ def parse_butterfly_graph() -> dict:
     path = ROOT / "outline/BUTTERFLY_GRAPH.md"
     if not path.exists():
         return {"chains": {}, "dependency_matrix": []}
-    text = path.read_text(encoding="utf-8")
+    return read_cached(path, "butterfly_graph", _butterfly_graph_from_text)
+
+
+def _butterfly_graph_from_text(text: str) -> dict:
 
     # Parse chains
     chains: dict[str, dict] = {}
@@ -156,7 +294,10 @@ def parse_continuity_log() -> dict:
     path = ROOT / "review/continuity-log.md"
     if not path.exists():
         return {"chapters_logged": 0, "promises": []}
-    text = path.read_text(encoding="utf-8")
+    return read_cached(path, "continuity", _continuity_from_text)
+
+
+def _continuity_from_text(text: str) -> dict:
 
     chapters_logged = len(re.findall(r"^### Chapter \d+", text, re.M))
 
@@ -186,7 +327,10 @@ def parse_revision_queue() -> dict:
     path = ROOT / "review/revision-queue.md"
     if not path.exists():
         return {"open": 0, "closed": 0}
-    text = path.read_text(encoding="utf-8")
+    return read_cached(path, "revision_queue", _revision_queue_from_text)
+
+
+def _revision_queue_from_text(text: str) -> dict:
     # Strip fenced code blocks so template examples aren't counted
     text = re.sub(r"```.*?```", "", text, flags=re.S)
     open_count = len(re.findall(r"^- \[ \]", text, re.M))
@@ -230,13 +374,9 @@ def strip_md_inline(text: str) -> str:
     return text.strip()
 
 
-def first_meaningful_line(path: Path) -> str:
+def first_meaningful_line(text: str) -> str:
     """Return first non-empty, non-heading, non-metadata line."""
-    try:
-        lines = path.read_text(encoding="utf-8", errors="replace").split("\n")
-    except Exception:
-        return ""
-    for line in lines:
+    for line in text.split("\n"):
         stripped = line.strip()
         if not stripped:
             continue
@@ -253,10 +393,55 @@ def first_meaningful_line(path: Path) -> str:
     return ""
 
 
-def build_docs_index() -> list[dict]:
-    """Index all .md files under ROOT with metadata."""
+def git_doc_dates() -> dict[str, str]:
+    """
+    Last commit time (UTC ISO) of every unmodified .md path under ROOT, relative to ROOT.
+
+    Working-tree mtimes differ per checkout, so docs that match HEAD are dated
+    by commit to keep storyos.json byte-stable. Docs with uncommitted edits are
+    left out (their mtime is the real modification time). Empty when git or the
+    history is unavailable.
+    """
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", "-c", "core.quotepath=off", *args, "--relative", "--", "*.md"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+
+    try:
+        log = git("log", "--format=%x00%cI", "--name-only")
+        modified = set(git("diff", "--name-only", "HEAD").splitlines())
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+    dates: dict[str, str] = {}
+    current = ""
+    for line in log.splitlines():
+        if line.startswith("\0"):
+            current = datetime.fromisoformat(line[1:]).astimezone(timezone.utc).isoformat()
+        elif line and line not in dates:
+            dates[line] = current
+    for rel in modified:
+        dates.pop(rel, None)
+    return dates
+
+
+def file_mtime_iso(path: Path) -> str:
+    """Date for docs git does not know yet or that have uncommitted edits."""
+    return datetime.fromtimestamp(path.stat().st_mtime, tz=timezone.utc).isoformat()
+
+
+def build_docs_index() -> tuple[list[dict], list[dict]]:
+    """
+    Index all .md files under ROOT with metadata.
+
+    Bodies are written to content shards as docs are (re)parsed; returns the
+    body-free docs_index entries and the shard manifest entries.
+    """
     docs = []
+    shards = []
+    dates = git_doc_dates()
     skip_dirs = {"manuscript", "meta", "translations", ".venv"}
+    meta_dir = ROOT / "meta"
 
     for md in sorted(ROOT.rglob("*.md")):
         rel = str(md.relative_to(ROOT))
@@ -267,27 +452,122 @@ def build_docs_index() -> list[dict]:
         top_dir = parts[0]
         if top_dir in skip_dirs:
             continue
-        stat = md.stat()
-        mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
-        category = categorize(rel)
-        name = md.stem
-        synopsis = first_meaningful_line(md)
-
-        try:
-            content = md.read_text(encoding="utf-8", errors="replace")
-        except Exception:
-            content = ""
 
+        def index_doc(content: str, rel: str = rel) -> dict:
+            return {
+                "synopsis": first_meaningful_line(content),
+                "bytes": len(content.encode("utf-8")),
+                "shard": write_doc_shard(rel, content),
+            }
+
+        info = read_cached(
+            md, "doc", index_doc,
+            errors="replace",
+            valid=lambda v: (meta_dir / v["shard"]["shard"]).exists(),
+        )
         docs.append({
-            "category": category,
-            "name": name,
+            "category": categorize(rel),
+            "name": md.stem,
             "path": rel,
-            "mtime_iso": mtime,
-            "synopsis": synopsis,
-            "content": content,
+            "mtime_iso": dates.get(rel) or file_mtime_iso(md),
+            "synopsis": info["synopsis"],
+            "shard": info["shard"]["shard"],
+            "bytes": info["bytes"],
         })
+        shards.append({"path": rel, **info["shard"]})
+
+    return docs, shards
+
+
+# ── Full-text search index ────────────────────────────────────────
 
-    return docs
+SEARCH_INDEX = "search.json"  # under meta/storyos/
+SEARCH_POSTINGS = "search.bin"
+# Offsets kept per (term, doc); the full count is always stored for ranking.
+SEARCH_MAX_OFFSETS = 4
+
+
+def _chapter_search_entry(text: str) -> dict:
+    ch = parse_chapter(text)
+    title = f"Chapter {ch.meta.num}: {ch.meta.title}" if ch.meta else ""
+    terms = term_postings(ch.translatable_prose, SEARCH_MAX_OFFSETS)
+    return {"num": ch.meta.num if ch.meta else 0, "title": title, "terms": terms}
+
+
+def build_search_index(docs: list[dict]) -> tuple[dict, bytes]:
+    """
+    Inverted index over docs_index bodies and chapter prose.
+
+    Terms are Unicode-folded (see search_text.fold) and sorted. The postings
+    blob holds, per term and per matching doc, varints
+    `doc delta, count, offset, offset delta...` with at most SEARCH_MAX_OFFSETS
+    delta-coded char offsets (into the doc shard's `content`, or the chapter
+    prose). The JSON header lists the docs, the terms and the byte length of
+    each term's postings, so a lookup decodes only the terms it matched.
+    """
+    entries: list[dict] = []
+    per_doc: list[dict[str, list[int]]] = []
+
+    def doc_postings(text: str) -> dict[str, list[int]]:
+        return term_postings(text, SEARCH_MAX_OFFSETS)
+
+    for d in docs:
+        terms = read_cached(ROOT / d["path"], "search", doc_postings, errors="replace")
+        entries.append({"kind": "doc", "path": d["path"], "title": d["name"], "shard": d["shard"]})
+        per_doc.append(terms)
+
+    drafts = []
+    for draft in (ROOT / "manuscript").glob("**/chapter-*.draft.md"):
+        info = read_cached(draft, "search_chapter", _chapter_search_entry)
+        html = draft.with_name(draft.name.replace(".draft.md", ".html"))
+        drafts.append((info["num"], html.relative_to(ROOT).as_posix(), info))
+    for num, href, info in sorted(drafts, key=lambda x: (x[0], x[1])):
+        entries.append({"kind": "chapter", "path": href, "title": info["title"], "num": num})
+        per_doc.append(info["terms"])
+
+    # term -> [doc delta, count, offsets..., doc delta, count, ...]
+    postings: dict[str, list[int]] = {}
+    last_doc: dict[str, int] = {}
+    for doc_id, terms in enumerate(per_doc):
+        for term, values in terms.items():
+            plist = postings.setdefault(term, [])
+            plist.append(doc_id - last_doc.get(term, 0))
+            plist.extend(values)
+            last_doc[term] = doc_id
+
+    terms_sorted = sorted(postings)
+    packed = [encode_varints(postings[t]) for t in terms_sorted]
+    lengths = [len(p) for p in packed]
+    blob = b"".join(packed)
+
+    header = {
+        "version": 1,
+        "fold": "nfkd-strip-marks-lower",
+        "max_offsets": SEARCH_MAX_OFFSETS,
+        "postings": f"{SHARD_DIR}/{SEARCH_POSTINGS}",
+        "docs": entries,
+        "terms": terms_sorted,
+        "lengths": lengths,
+    }
+    return header, blob
+
+
+def write_search_index(header: dict, blob: bytes, out_dir: Path) -> tuple[bool, dict]:
+    """Write meta/storyos/search.{json,bin}; returns (changed, manifest entry)."""
+    raw = (json.dumps(header, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+    shard_root = out_dir / SHARD_DIR
+    shard_root.mkdir(parents=True, exist_ok=True)
+    changed = write_if_changed(shard_root / SEARCH_INDEX, raw)
+    changed = write_if_changed(shard_root / SEARCH_POSTINGS, blob) or changed
+    entry = {
+        "shard": f"{SHARD_DIR}/{SEARCH_INDEX}",
+        "postings": header["postings"],
+        "bytes": len(raw) + len(blob),
+        "sha256": hashlib.sha256(raw + blob).hexdigest(),
+        "terms": len(header["terms"]),
+        "docs": len(header["docs"]),
+    }
+    return changed, entry
 
 
 # ── Mermaid diagram builders ─────────────────────────────────────
@@ -366,6 +646,92 @@ def build_mermaid_butterfly(graph: dict) -> str:
     return "\n".join(lines)
 
 
+# ── Static diagram rendering ─────────────────────────────────────
+
+# Passed to mermaid.initialize(); part of every SVG's cache key. Plain SVG
+# labels (no <foreignObject> HTML) so the files render as <img>.
+MERMAID_CONFIG = {
+    "theme": "neutral",
+    "htmlLabels": False,
+    "flowchart": {"htmlLabels": False},
+}
+# Headless Chrome (puppeteer, pinned in the repo's package.json) driving the
+# same mermaid build the UI falls back to.
+# Renderer code lives next to this file, not under ROOT (bench_pipeline points ROOT at a synthetic book).
+MERMAID_RENDERER = Path(__file__).resolve().with_name("render_mermaid.mjs")
+MERMAID_LIB = MERMAID_RENDERER.parents[1] / "meta" / "ui" / "vendor" / "mermaid.min.js"
+MERMAID_TIMEOUT_S = 180
+
+
+def mermaid_svg_key(source: str) -> str:
+    """Hash of a diagram source, the render config, the renderer script and the mermaid build."""
+    h = hashlib.sha256()
+    for path in (MERMAID_RENDERER, MERMAID_LIB):
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    h.update(json.dumps(MERMAID_CONFIG, sort_keys=True).encode("utf-8"))
+    h.update(source.encode("utf-8"))
+    return h.hexdigest()
+
+
+def render_mermaid_svgs(diagrams: dict[str, str]) -> dict[str, str]:
+    """Render diagrams to SVG text in one renderer run; raises RuntimeError when it cannot."""
+    node = shutil.which("node")
+    if node is None:
+        raise RuntimeError("node is not installed")
+    request = json.dumps({"config": MERMAID_CONFIG, "diagrams": diagrams}, ensure_ascii=False)
+    try:
+        proc = subprocess.run(
+            [node, str(MERMAID_RENDERER)],
+            input=request.encode("utf-8"),
+            capture_output=True,
+            timeout=MERMAID_TIMEOUT_S,
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"renderer timed out after {MERMAID_TIMEOUT_S}s") from None
+    if proc.returncode != 0:
+        detail = proc.stderr.decode("utf-8", "replace").strip().splitlines()
+        raise RuntimeError(detail[0] if detail else f"renderer exited with status {proc.returncode}")
+    return json.loads(proc.stdout)
+
+
+def write_mermaid_svgs(diagrams: dict[str, str], out_dir: Path) -> tuple[dict[str, str], int, str | None]:
+    """
+    Pre-render each diagram to meta/storyos/graphs/<name>.<hash>.svg.
+
+    The file name carries mermaid_svg_key(), so an existing file is reused
+    without starting the renderer. Returns ({name: path relative to meta/}
+    for every diagram that has an SVG, number rendered, error or None);
+    diagrams left out are drawn client-side. Stale SVGs are pruned.
+    """
+    graphs_dir = out_dir / SHARD_DIR / GRAPHS_DIR
+    names = {name: f"{name}.{mermaid_svg_key(source)[:16]}.svg" for name, source in diagrams.items()}
+    missing = {name: diagrams[name] for name, svg_name in names.items() if not (graphs_dir / svg_name).exists()}
+
+    rendered = 0
+    error = None
+    if missing:
+        try:
+            svgs = render_mermaid_svgs(missing)
+        except RuntimeError as e:
+            error = str(e)
+        else:
+            graphs_dir.mkdir(parents=True, exist_ok=True)
+            for name, svg in svgs.items():
+                write_if_changed(graphs_dir / names[name], svg)
+                rendered += 1
+
+    paths = {
+        name: f"{SHARD_DIR}/{GRAPHS_DIR}/{svg_name}"
+        for name, svg_name in names.items()
+        if (graphs_dir / svg_name).exists()
+    }
+    if graphs_dir.is_dir():
+        for stale in graphs_dir.glob("*.svg"):
+            if stale.name not in names.values():
+                stale.unlink()
+    return paths, rendered, error
+
+
 # ── Assembly ──────────────────────────────────────────────────────
 
 def assemble_json(
@@ -427,6 +793,38 @@ def assemble_json(
     }
 
 
+# ── Doc content shards ───────────────────────────────────────────
+
+def write_doc_shard(rel: str, content: str) -> dict:
+    """Write one doc body to meta/storyos/docs/<sha>.json; returns its manifest fields."""
+    raw = (json.dumps({"path": rel, "content": content}, ensure_ascii=False) + "\n").encode("utf-8")
+    sha = hashlib.sha256(raw).hexdigest()
+    name = f"{sha[:16]}.json"
+    shard_path = ROOT / "meta" / SHARD_DIR / "docs" / name
+    # Content-addressed: an existing shard with this name already has these bytes.
+    if not shard_path.exists():
+        shard_path.parent.mkdir(parents=True, exist_ok=True)
+        shard_path.write_bytes(raw)
+    return {"shard": f"{SHARD_DIR}/docs/{name}", "bytes": len(raw), "sha256": sha}
+
+
+def write_shard_manifest(shards: list[dict], out_dir: Path, search: dict | None = None) -> bool:
+    """Prune shards no longer referenced and write meta/storyos/manifest.json."""
+    live = {Path(e["shard"]).name for e in shards}
+    docs_dir = out_dir / SHARD_DIR / "docs"
+    for stale in docs_dir.glob("*.json"):
+        if stale.name not in live:
+            stale.unlink()
+
+    manifest = {"version": 1, "core": "storyos.json", "docs": shards}
+    if search is not None:
+        manifest["search"] = search
+    return write_if_changed(
+        out_dir / SHARD_DIR / "manifest.json",
+        json.dumps(manifest, indent=2, ensure_ascii=False) + "\n",
+    )
+
+
 # ── Markdown renderer ────────────────────────────────────────────
 
 def render_markdown(data: dict) -> str:
@@ -650,11 +1048,37 @@ def validate(config: dict, chapters: list[dict]) -> list[str]:
 
 # ── CLI entry ─────────────────────────────────────────────────────
 
+def stable_generated_at(payload: dict, previous_path: Path) -> None:
+    """Keep the previous `generated_at` when nothing else in the payload changed."""
+    try:
+        previous = json.loads(previous_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    if not isinstance(previous, dict) or "generated_at" not in previous:
+        return
+    current = json.loads(json.dumps(payload, ensure_ascii=False))
+    current["generated_at"] = previous["generated_at"]
+    if current == previous:
+        payload["generated_at"] = previous["generated_at"]
+
+
 def main(argv: list[str] | None = None) -> int:
+    global _CACHE
+
     parser = argparse.ArgumentParser(description="Build StoryOS metadata hub")
     parser.add_argument("--check", action="store_true", help="Validate only, do not write files")
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-parse every source (ignore {CACHE_PATH})")
     args = parser.parse_args(argv)
 
+    _CACHE = SourceCache(None if args.no_cache else ROOT / CACHE_PATH)
+    try:
+        return build(args)
+    finally:
+        _CACHE.save()
+        _CACHE = SourceCache(None)
+
+
+def build(args: argparse.Namespace) -> int:
     # Load all sources
     config = load_storyos()
     entities = load_entities()
@@ -673,13 +1097,15 @@ def main(argv: list[str] | None = None) -> int:
         print("Validation passed.")
         return 0
 
-    # Parse supplemental sources
+    # Parse supplemental sources (doc bodies are sharded as they are parsed)
     arcs_md = parse_arcs_md()
     graph = parse_butterfly_graph()
     continuity = parse_continuity_log()
     revision = parse_revision_queue()
     drafted = count_drafted_chapters()
-    docs = build_docs_index()
+    docs, shards = build_docs_index()
+    search_header, search_blob = build_search_index(docs)
+    _CACHE.complete = True
 
     # Assemble
     payload = assemble_json(
@@ -687,24 +1113,38 @@ def main(argv: list[str] | None = None) -> int:
         arcs_md, graph, continuity, revision, drafted, docs,
     )
 
-    # Write JSON
     out_dir = ROOT / "meta"
     out_dir.mkdir(parents=True, exist_ok=True)
-
     json_path = out_dir / "storyos.json"
-    json_path.write_text(
-        json.dumps(payload, indent=2, ensure_ascii=False) + "\n",
-        encoding="utf-8",
-    )
-    print(f"Wrote {json_path.relative_to(ROOT)}")
+    payload["mermaid_svg"], svg_rendered, svg_error = write_mermaid_svgs(payload["mermaid"], out_dir)
+    stable_generated_at(payload, json_path)
+
+    def report(path: Path, changed: bool, extra: str = "") -> None:
+        print(f"{'Wrote' if changed else 'Unchanged'} {path.relative_to(ROOT)}{extra}")
+
+    svg_total = len(payload["mermaid"])
+    print(f"Diagrams: {len(payload['mermaid_svg'])}/{svg_total} pre-rendered ({svg_rendered} rendered this run)")
+    if len(payload["mermaid_svg"]) < svg_total:
+        left_out = sorted(set(payload["mermaid"]) - set(payload["mermaid_svg"]))
+        print(f"  WARNING: no SVG for {', '.join(left_out)}: {svg_error}")
+        print("  The Graphs tab will download mermaid.min.js to draw them. Run `npm ci` at the repo root and rebuild.")
+
+    changed, search = write_search_index(search_header, search_blob, out_dir)
+    report(out_dir / SHARD_DIR / SEARCH_INDEX, changed, f" ({search['terms']} terms over {search['docs']} docs, {search['bytes'] / 1024:.0f} KB)")
+
+    changed = write_shard_manifest(shards, out_dir, search)
+    shard_bytes = sum(e["bytes"] for e in shards)
+    report(out_dir / SHARD_DIR / "manifest.json", changed, f" ({len(shards)} doc shards, {shard_bytes / 1024:.0f} KB)")
+
+    changed = write_if_changed(json_path, json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
+    report(json_path, changed, f" ({json_path.stat().st_size / 1024:.0f} KB)")
 
     # Write Markdown
     md_path = out_dir / "storyos.md"
-    md_text = render_markdown(payload)
-    md_path.write_text(md_text, encoding="utf-8")
-    print(f"Wrote {md_path.relative_to(ROOT)}")
+    report(md_path, write_if_changed(md_path, render_markdown(payload)))
 
     print(f"  {len(chapters)} chapters, {len(docs)} docs indexed, {drafted} HTML files")
+    print(f"  cache: {_CACHE.hits} reused, {_CACHE.misses} parsed")
     return 0
 
 
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Shared chapter-draft parsing for the build, translation, QC and lint tools.
+
+One scan of a `.draft.md` (or a translated chapter `.md`) yields a ParsedChapter:
+header metadata, prose with/without @illust/@diagram markers, the block list
+every tool splits on, and the marker positions. `load_chapter()` memoizes on
+(path, mtime, size), so a pipeline run parses each draft exactly once.
+
+    from draft_parser import load_chapter
+
+    ch = load_chapter("manuscript/arc-1/chapter-01.draft.md")
+    ch.meta.title, ch.blocks, ch.translatable_blocks, ch.markers
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+TITLE_RE = re.compile(r"^# Chapter\s+(\d+):\s*(.+)$", re.MULTILINE)
+TITLE_LINE_RE = re.compile(r"# Chapter \d+:")
+META_RE = re.compile(
+    r"<!--\s*Arc:\s*(\d+)\s*\|\s*POV:\s*(.+?)\s*\|\s*Location:\s*(.+?)\s*\|\s*Timeline:\s*(.+?)\s*-->",
+    re.IGNORECASE,
+)
+TRAILING_RULE_RE = re.compile(r"\n---\s*$")
+SCENE_BREAK_RE = re.compile(r"\*[ \t]*\*[ \t]*\*")
+
+# Visual markers: <!-- @illust|@diagram full|thumb|link: id | text -->
+MARKER_RE = re.compile(
+    r"<!--\s*@(illust|diagram)\s+(full|thumb|link):\s*([a-z0-9_-]+)\s*\|\s*(.+?)\s*-->"
+)
+MARKER_LINE_RE = re.compile(r"\s*<!--\s*@(illust|diagram)\s")
+
+
+@dataclass(frozen=True)
+class ChapterMeta:
+    arc: int
+    num: int
+    title: str
+    pov: str
+    location: str
+    timeline: str
+
+
+@dataclass(frozen=True)
+class Marker:
+    kind: str  # "illust" | "diagram"
+    mode: str  # "full" | "thumb" | "link"
+    id: str
+    text: str
+    block: int  # index into ParsedChapter.blocks
+
+
+@dataclass(frozen=True)
+class ParsedChapter:
+    path: Path | None
+    meta: ChapterMeta | None
+    prose: str  # rendered prose; visual markers kept
+    translatable_prose: str  # prose without marker-only lines (what MT/QC see)
+    blocks: tuple[str, ...] = field(repr=False)
+    translatable_blocks: tuple[str, ...] = field(repr=False)
+    markers: tuple[Marker, ...] = ()
+
+
+def parse_chapter_meta(text: str) -> ChapterMeta:
+    title_m = TITLE_RE.search(text)
+    if not title_m:
+        raise ValueError("Missing chapter title line: '# Chapter NN: Title'")
+    num = int(title_m.group(1))
+    title = title_m.group(2).strip()
+
+    meta_m = META_RE.search(text)
+    if meta_m:
+        arc = int(meta_m.group(1))
+        pov = meta_m.group(2).strip()
+        location = meta_m.group(3).strip()
+        timeline = meta_m.group(4).strip()
+    else:
+        arc, pov, location, timeline = 1, "Unknown", "Unknown", "Unknown"
+
+    return ChapterMeta(arc=arc, num=num, title=title, pov=pov, location=location, timeline=timeline)
+
+
+def _finish_prose(lines: list[str]) -> str:
+    prose = "\n".join(lines).strip()
+    # Remove trailing --- (continuity notes follow it in drafts)
+    return TRAILING_RULE_RE.sub("", prose)
+
+
+def extract_prose(text: str) -> tuple[str, str]:
+    """
+    Strip draft-only scaffolding (title line, beat/continuity HTML comments).
+
+    Returns (prose, translatable_prose): the first keeps @illust/@diagram marker
+    lines for the HTML build, the second drops them so MT never sees them.
+    """
+    prose_lines: list[str] = []
+    text_lines: list[str] = []
+    in_comment = False
+    for line in text.split("\n"):
+        if in_comment:
+            if "-->" in line:
+                in_comment = False
+            continue
+        if line.startswith("# Chapter ") and TITLE_LINE_RE.match(line):
+            continue
+        stripped = line.strip()
+        if stripped.startswith("<!--"):
+            if MARKER_LINE_RE.match(line):
+                prose_lines.append(line)
+            elif "-->" not in line:
+                in_comment = True
+            elif not stripped.endswith("-->"):
+                prose_lines.append(line)
+                text_lines.append(line)
+            continue
+        prose_lines.append(line)
+        text_lines.append(line)
+    return _finish_prose(prose_lines), _finish_prose(text_lines)
+
+
+def is_scene_break(block: str) -> bool:
+    s = block.strip()
+    return s == "---" or SCENE_BREAK_RE.fullmatch(s) is not None
+
+
+def is_blockquote_block(block: str) -> bool:
+    lines = block.splitlines()
+    # Blockquote blocks are often contiguous groups of "> " lines.
+    return bool(lines) and all(l.lstrip().startswith("> ") for l in lines if l.strip())
+
+
+def split_blocks(prose: str) -> list[str]:
+    """Blank lines separate blocks; a scene-break line is always a block of its own."""
+    blocks: list[str] = []
+    para: list[str] = []
+    for line in prose.split("\n"):
+        stripped = line.strip()
+        if not stripped:
+            if para:
+                blocks.append("\n".join(para))
+                para = []
+        elif is_scene_break(stripped):
+            if para:
+                blocks.append("\n".join(para))
+                para = []
+            blocks.append(stripped)
+        else:
+            para.append(line)
+    if para:
+        blocks.append("\n".join(para))
+    return blocks
+
+
+def parse_chapter(text: str, *, path: Path | None = None) -> ParsedChapter:
+    """Parse draft/translation markdown text (no caching; see load_chapter)."""
+    try:
+        meta: ChapterMeta | None = parse_chapter_meta(text)
+    except ValueError:
+        meta = None
+    prose, translatable = extract_prose(text)
+    blocks = split_blocks(prose)
+    markers = tuple(
+        Marker(kind=m.group(1), mode=m.group(2), id=m.group(3), text=m.group(4).strip(), block=i)
+        for i, b in enumerate(blocks)
+        if "@" in b
+        for m in MARKER_RE.finditer(b)
+    )
+    return ParsedChapter(
+        path=path,
+        meta=meta,
+        prose=prose,
+        translatable_prose=translatable,
+        blocks=tuple(blocks),
+        translatable_blocks=tuple(split_blocks(translatable)) if translatable != prose else tuple(blocks),
+        markers=markers,
+    )
+
+
+@functools.lru_cache(maxsize=512)
+def _load_chapter(path: Path, mtime_ns: int, size: int) -> ParsedChapter:
+    return parse_chapter(path.read_text(encoding="utf-8"), path=path)
+
+
+def load_chapter(path: str | Path) -> ParsedChapter:
+    """Parse a chapter file once per (path, mtime, size) for the life of the process."""
+    p = Path(path).resolve()
+    st = p.stat()
+    return _load_chapter(p, st.st_mtime_ns, st.st_size)
@@ -4,12 +4,28 @@
 Usage:
     python3 tools/optimize_illustrations.py               # all images
     python3 tools/optimize_illustrations.py --chapter 1    # only ch01-*
-    python3 tools/optimize_illustrations.py --force        # overwrite existing
+    python3 tools/optimize_illustrations.py --force        # re-encode everything
+    python3 tools/optimize_illustrations.py --jobs 8       # encode on 8 processes
+
+Each source is decoded once and downscaled progressively (1200 -> 768 -> 480,
+each step from the previous one). With --jobs > 1 the decode/resize step and
+every (image, width, format) encode run as separate tasks on a process pool.
+
+assets/illustrations/manifest.json records, per image, the source hash and,
+per variant, the encoder settings, pixel size and bytes. A variant is only
+re-encoded when its source or settings change (or the file is missing), and
+build/convert.py reads the sizes for <img width/height>. A format the installed
+Pillow cannot write (AVIF) is marked unsupported and skipped until its settings
+change; pass --force after installing AVIF support.
 """
 
 import argparse
+import concurrent.futures
+import hashlib
+import json
 import os
 import sys
+import time
 
 try:
     from PIL import Image
@@ -19,59 +35,266 @@ except ImportError:
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE, "assets", "illustrations", "raw")
 OUT_DIR = os.path.join(BASE, "assets", "illustrations")
+MANIFEST_PATH = os.path.join(OUT_DIR, "manifest.json")
+MANIFEST_VERSION = 1
 
 WIDTHS = [480, 768, 1200]
+FORMATS = ["webp", "avif"]
 WEBP_QUALITY = 82
 AVIF_QUALITY = 60
 
+# Everything that shapes an encoded file besides the source; a change re-encodes.
+ENCODER_SETTINGS = {
+    "webp": {"quality": WEBP_QUALITY, "method": 6, "resample": "lanczos-progressive"},
+    "avif": {"quality": AVIF_QUALITY, "resample": "lanczos-progressive"},
+}
+
+
+def variant_path(basename, width, fmt):
+    return os.path.join(OUT_DIR, f"{basename}-{width}w.{fmt}")
 
-def optimize_image(src_path, force=False):
-    """Generate WebP (and optionally AVIF) variants at each target width."""
-    basename = os.path.splitext(os.path.basename(src_path))[0]  # e.g. ch01-sealed-room
 
+def variant_key(width, fmt):
+    return f"{width}w.{fmt}"
+
+
+def source_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest():
     try:
-        img = Image.open(src_path)
-    except Exception as e:
-        print(f"  ! Could not open {src_path}: {e}")
-        return 0
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("images", {})
+
 
-    img = img.convert("RGB")
+def save_manifest(images):
+    data = {"version": MANIFEST_VERSION, "images": dict(sorted(images.items()))}
+    text = json.dumps(data, indent=2, ensure_ascii=False) + "\n"
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return
+    except OSError:
+        pass
+    tmp = MANIFEST_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def image_id(src_path):
+    return os.path.splitext(os.path.basename(src_path))[0]  # e.g. ch01-sealed-room
+
+
+def variant_current(entry, path, fmt):
+    """A variant entry is current when its settings match and the file exists or the format is marked unsupported."""
+    if entry.get("settings") != ENCODER_SETTINGS[fmt]:
+        return False
+    if entry.get("unsupported"):
+        return True
+    return os.path.exists(path)
+
+
+def pending_variants(src_path, entry, force=False):
+    """(width, format) pairs of `src_path` whose manifest entry is missing, stale or lacks the file."""
+    basename = image_id(src_path)
+    variants = entry.get("variants", {})
+    return [
+        (w, fmt)
+        for w in WIDTHS
+        for fmt in FORMATS
+        if force
+        or not variant_current(variants.get(variant_key(w, fmt), {}), variant_path(basename, w, fmt), fmt)
+    ]
+
+
+def resize_chain(img, widths):
+    """Downscale `img` to each width, largest first, each step resizing the previous result."""
     orig_w, orig_h = img.size
-    count = 0
+    out = {}
+    current = img
+    for w in sorted(set(widths), reverse=True):
+        target_w = min(w, orig_w)
+        size = (target_w, int(orig_h * target_w / orig_w))
+        if current.size != size:
+            current = current.resize(size, Image.LANCZOS)
+        out[w] = current
+    return out
+
+
+def prepare_image(task):
+    """Decode one source and downscale it; frames come back as raw RGB so they pickle cheaply."""
+    src_path, widths = task
+    started = time.perf_counter()
+    try:
+        img = Image.open(src_path).convert("RGB")
+    except Exception as e:
+        return {"src": src_path, "error": str(e)}
+    frames = {w: (im.size, im.tobytes()) for w, im in resize_chain(img, widths).items()}
+    return {"src": src_path, "size": img.size, "frames": frames, "seconds": time.perf_counter() - started}
 
-    for w in WIDTHS:
-        if w > orig_w:
-            target_w = orig_w
-        else:
-            target_w = w
-        ratio = target_w / orig_w
-        target_h = int(orig_h * ratio)
-        resized = img.resize((target_w, target_h), Image.LANCZOS)
-
-        # WebP
-        webp_path = os.path.join(OUT_DIR, f"{basename}-{w}w.webp")
-        if force or not os.path.exists(webp_path):
-            resized.save(webp_path, "WEBP", quality=WEBP_QUALITY, method=6)
-            print(f"  + {os.path.basename(webp_path)}")
-            count += 1
 
+def encode_variant(task):
+    """Encode one (width, format) variant; returns False when AVIF support is missing."""
+    src_path, width, fmt, size, data = task
+    out_path = variant_path(image_id(src_path), width, fmt)
+    started = time.perf_counter()
+    img = Image.frombytes("RGB", size, data)
+    if fmt == "webp":
+        img.save(out_path, "WEBP", quality=WEBP_QUALITY, method=6)
+        ok = True
+    else:
         # AVIF (requires pillow-avif-plugin or Pillow >= 10.1)
-        avif_path = os.path.join(OUT_DIR, f"{basename}-{w}w.avif")
-        if force or not os.path.exists(avif_path):
-            try:
-                resized.save(avif_path, "AVIF", quality=AVIF_QUALITY)
-                print(f"  + {os.path.basename(avif_path)}")
-                count += 1
-            except Exception:
-                pass  # AVIF not available; WebP is sufficient
+        try:
+            img.save(out_path, "AVIF", quality=AVIF_QUALITY)
+            ok = True
+        except Exception:
+            ok = False  # AVIF not available; WebP is sufficient
+            if os.path.exists(out_path):
+                os.remove(out_path)
+    return {
+        "src": src_path,
+        "out": out_path,
+        "key": variant_key(width, fmt),
+        "ok": ok,
+        "width": size[0],
+        "height": size[1],
+        "bytes": os.path.getsize(out_path) if ok else 0,
+        "settings": ENCODER_SETTINGS[fmt],
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def encode_tasks(prepared, variants):
+    tasks = []
+    for w, fmt in variants:
+        size, data = prepared["frames"][w]
+        tasks.append((prepared["src"], w, fmt, size, data))
+    return tasks
+
+
+class ImageTimer:
+    """Per-image decode/resize and encode seconds; prints a line once the image is finished."""
+
+    def __init__(self, plans):
+        self.left = {src: len(variants) for src, variants in plans.items()}
+        self.prepare = dict.fromkeys(plans, 0.0)
+        self.encode = dict.fromkeys(plans, 0.0)
+        self.written = dict.fromkeys(plans, 0)
+
+    def prepared(self, result):
+        src = result["src"]
+        if "error" in result:
+            print(f"  ! Could not open {src}: {result['error']}")
+            self.left[src] = 0
+            return False
+        self.prepare[src] = result["seconds"]
+        return True
+
+    def encoded(self, result):
+        src = result["src"]
+        self.encode[src] += result["seconds"]
+        if result["ok"]:
+            print(f"  + {os.path.basename(result['out'])}")
+            self.written[src] += 1
+        self.left[src] -= 1
+        if not self.left[src]:
+            print(
+                f"  = {os.path.basename(src)}: decode+resize {self.prepare[src]:.2f}s, "
+                f"encode {self.encode[src]:.2f}s, {self.written[src]} files"
+            )
+
+    def total(self):
+        return sum(self.written.values())
+
+
+def optimize_all(sources, force=False, jobs=1, prune=False):
+    """
+    Encode the variants of `sources` whose source, settings or file changed
+    (all of them with force) and update the manifest; returns files written.
+    With prune, manifest entries for sources not in `sources` are dropped.
+    """
+    images = load_manifest()
+    if prune:
+        images = {k: v for k, v in images.items() if k in {image_id(src) for src in sources}}
 
-    return count
+    plans = {}
+    for src in sources:
+        sha = source_sha256(src)
+        entry = images.get(image_id(src))
+        if not entry or entry.get("sha256") != sha:
+            # New or replaced art: every recorded variant is stale.
+            entry = images[image_id(src)] = {"source": os.path.relpath(src, OUT_DIR), "sha256": sha, "variants": {}}
+        variants = pending_variants(src, entry, force)
+        if variants:
+            plans[src] = variants
+    timer = ImageTimer(plans)
+    prepare = [(src, [w for w, _ in variants]) for src, variants in plans.items()]
+
+    def prepared(result):
+        if not timer.prepared(result):
+            return False
+        entry = images[image_id(result["src"])]
+        entry["width"], entry["height"] = result["size"]
+        return True
+
+    def encoded(result):
+        timer.encoded(result)
+        variants = images[image_id(result["src"])]["variants"]
+        if result["ok"]:
+            variants[result["key"]] = {k: result[k] for k in ("width", "height", "bytes", "settings")}
+        else:
+            # Not retried until the encoder settings change (or --force), so a
+            # Pillow without AVIF does not re-decode every image on each run.
+            variants[result["key"]] = {"unsupported": True, "settings": result["settings"]}
+
+    try:
+        if jobs <= 1 or len(plans) * len(FORMATS) <= 1:
+            for task in prepare:
+                print(f"Processing {os.path.basename(task[0])}...")
+                result = prepare_image(task)
+                if prepared(result):
+                    for enc in encode_tasks(result, plans[task[0]]):
+                        encoded(encode_variant(enc))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as ex:
+                pending = {ex.submit(prepare_image, task) for task in prepare}
+                while pending:
+                    done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for fut in done:
+                        result = fut.result()
+                        if "out" in result:
+                            encoded(result)
+                        elif prepared(result):
+                            pending |= {ex.submit(encode_variant, enc) for enc in encode_tasks(result, plans[result["src"]])}
+    finally:
+        # Keep whatever was encoded, even if a later task failed.
+        for entry in images.values():
+            entry["variants"] = dict(sorted(entry["variants"].items()))
+        save_manifest(images)
+    return timer.total()
+
+
+def optimize_image(src_path, force=False):
+    """Generate WebP (and optionally AVIF) variants at each target width."""
+    return optimize_all([src_path], force=force)
 
 
 def main():
     parser = argparse.ArgumentParser(description="Optimize illustration images")
     parser.add_argument("--chapter", type=int, help="Only process images for this chapter number")
-    parser.add_argument("--force", action="store_true", help="Overwrite existing optimized files")
+    parser.add_argument("--force", action="store_true", help="Re-encode every variant, even if the manifest says it is current")
+    parser.add_argument("--jobs", type=int, default=0, help="Encode processes (0 = one per CPU; default: 0)")
     args = parser.parse_args()
 
     if not os.path.isdir(RAW_DIR):
@@ -96,12 +319,11 @@ def main():
         return
 
     os.makedirs(OUT_DIR, exist_ok=True)
-    total = 0
-    for src in sources:
-        print(f"Processing {os.path.basename(src)}...")
-        total += optimize_image(src, force=args.force)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    started = time.perf_counter()
+    total = optimize_all(sources, force=args.force, jobs=jobs, prune=args.chapter is None)
 
-    print(f"\nDone. {total} files written to {OUT_DIR}")
+    print(f"\nDone. {total} files written to {OUT_DIR} in {time.perf_counter() - started:.1f}s")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Protected-token placeholders for machine translation.
+
+Names, acronyms and Satya terms are swapped for `__PROT000__`-style placeholders
+before MT and restored afterwards. All tokens are compiled into one alternation
+(longest first), so protecting, restoring and presence checks are a single regex
+pass per block instead of one `re.sub` per token.
+
+    from placeholders import Protector
+
+    prot = Protector(tokens)
+    out = prot.unprotect(model(prot.protect(block)))
+    missing = prot.present(src) - prot.present(out)
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+
+# Tokens made only of these characters must not touch other ASCII word characters
+# (so Satya "mati" never matches inside "formation"); CJK neighbours are fine.
+WORD_TOKEN_RE = re.compile(r"[A-Za-z0-9_]+")
+
+# The exact placeholder plus the normalizations MT models were observed to produce:
+# `_PROT000_`, `__ PROT000 __`, `[[PROT000]]`, `[PROT000]`.
+PLACEHOLDER_RE = re.compile(
+    r"_{1,3}\s*PROT(?P<u>\d{3,})\s*_{1,3}"
+    r"|\[\[\s*PROT(?P<bb>\d{3,})\s*\]\]"
+    r"|\[\s*PROT(?P<b>\d{3,})\s*\]"
+)
+PLACEHOLDER_RESIDUE_RE = re.compile(r"(?:_{1,3}|\[\[|\[)\s*PROT\d{3}\s*(?:_{1,3}|\]\]|\])")
+
+
+def placeholder(i: int) -> str:
+    # Underscores tend to survive MT unchanged, unlike bracket-heavy tokens.
+    return f"__PROT{i:03d}__"
+
+
+def token_pattern(tok: str) -> str:
+    if WORD_TOKEN_RE.fullmatch(tok):
+        return rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])"
+    return re.escape(tok)
+
+
+def has_placeholders(text: str) -> bool:
+    """True when MT output still contains (possibly mangled) placeholders."""
+    return PLACEHOLDER_RESIDUE_RE.search(text) is not None
+
+
+class Protector:
+    def __init__(self, tokens: Iterable[str]) -> None:
+        # Longest first so "Satya-speaker" wins over "Satya"; ties broken by text
+        # so placeholder numbering is stable across runs.
+        self.tokens: list[str] = sorted({t for t in tokens if t}, key=lambda t: (-len(t), t))
+        self.ph_map: dict[str, str] = {placeholder(i): tok for i, tok in enumerate(self.tokens)}
+        self._placeholder = {tok: placeholder(i) for i, tok in enumerate(self.tokens)}
+
+        alternation = "|".join(token_pattern(t) for t in self.tokens)
+        # Leading lookahead lets the regex engine skip text that cannot start a token.
+        first = "".join(sorted({re.escape(t[0]) for t in self.tokens}))
+        self._protect_re = re.compile(f"(?=[{first}])(?:{alternation})") if self.tokens else None
+        # Zero-width variant: reports a token at every start position, so tokens that
+        # overlap a longer match (e.g. "dharma" inside "*dharma*") are still seen.
+        self._present_re = re.compile(f"(?=[{first}])(?=({alternation}))") if self.tokens else None
+        # Shorter tokens that are prefixes of a longer one start at the same position
+        # and are shadowed by it in the alternation; check them explicitly.
+        self._prefixes: dict[str, list[tuple[str, re.Pattern[str]]]] = {}
+        for tok in self.tokens:
+            shorter = [s for s in self.tokens if len(s) < len(tok) and tok.startswith(s)]
+            if shorter:
+                self._prefixes[tok] = [(s, re.compile(token_pattern(s))) for s in shorter]
+
+    def protect(self, text: str) -> str:
+        if self._protect_re is None:
+            return text
+        return self._protect_re.sub(lambda m: self._placeholder[m.group(0)], text)
+
+    def _restore(self, m: re.Match[str]) -> str:
+        i = int(m.group("u") or m.group("bb") or m.group("b"))
+        return self.tokens[i] if i < len(self.tokens) else m.group(0)
+
+    def unprotect(self, text: str) -> str:
+        if "PROT" not in text:
+            return text
+        return PLACEHOLDER_RE.sub(self._restore, text)
+
+    def present(self, text: str) -> set[str]:
+        """Protected tokens occurring in `text` (ASCII word tokens honour word boundaries)."""
+        found: set[str] = set()
+        if self._present_re is None:
+            return found
+        for m in self._present_re.finditer(text):
+            tok = m.group(1)
+            found.add(tok)
+            for short, pat in self._prefixes.get(tok, ()):
+                if pat.match(text, m.start()):
+                    found.add(short)
+        return found
@@ -4,15 +4,45 @@ Lightweight prose lint for The Sundering drafts.
 
 Focus: STYLE_GUIDE forbidden phrases + a few POV-dependent checks.
 This is not a grammar checker; it's a friction detector.
+
+Rules live in style/lint-rules.yaml (derived from style/STYLE_GUIDE.md) and are
+compiled into one zero-width matcher, so each line is scanned once no matter
+how many rules there are. `--check-rules` reports drift between the
+rules file and the guide's "Forbidden Words/Phrases" table.
+
+Lint the whole manuscript (parallel; findings cached per file content hash in
+.cache/prose-lint-cache.json, so unchanged chapters are skipped):
+  python3 tools/prose_lint.py --all
+  python3 tools/prose_lint.py --all --format sarif --output .cache/prose-lint.sarif
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import dataclasses
+import functools
+import hashlib
+import json
+import os
 import re
 import sys
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
+
+import yaml
+
+from draft_parser import META_RE, parse_chapter
+
+
+ROOT = Path(__file__).resolve().parents[1]
+RULES_PATH = ROOT / "style/lint-rules.yaml"
+STYLE_GUIDE_PATH = ROOT / "style/STYLE_GUIDE.md"
+CACHE_PATH = ROOT / ".cache/prose-lint-cache.json"
+CACHE_VERSION = 1
+
+WORD_RE = re.compile(r"\w+")
 
 
 @dataclass(frozen=True)
@@ -22,29 +52,153 @@ class Finding:
     kind: str
     message: str
     excerpt: str
+    rule: str = ""  # rule id from lint-rules.yaml
+
+
+@dataclass(frozen=True)
+class Rule:
+    id: str
+    kind: str  # "forbidden" (per-line finding) | "counter" (per-chapter total vs max)
+    pattern: str
+    message: str
+    max: int | None = None
+    pov: str | None = None  # counters: only enforced for this POV family
+    guide: str | None = None
+
 
+@dataclass(frozen=True)
+class RuleSet:
+    rules: tuple[Rule, ...]
+    patterns: tuple[re.Pattern[str], ...]  # one per rule
+    matcher: re.Pattern[str]  # zero-width (?=...|...) over all rules: positions where any rule matches
+
+    def scan(self, line: str) -> list[Rule]:
+        """
+        Every rule hit on `line`, in order (one entry per match). Rules are
+        counted independently, so overlapping rules ("whispered softly" and
+        "whispered") both see a shared match; each rule alone behaves as its
+        own finditer (no overlapping matches of the same rule).
+        """
+        hits: list[Rule] = []
+        ends = [0] * len(self.rules)
+        for m in self.matcher.finditer(line):
+            pos = m.start()
+            for i, pattern in enumerate(self.patterns):
+                if pos < ends[i]:
+                    continue
+                hit = pattern.match(line, pos)
+                if hit and hit.end() > pos:
+                    hits.append(self.rules[i])
+                    ends[i] = hit.end()
+        return hits
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """True when `pattern` has a `|` outside every group and character class."""
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
 
-FORBIDDEN_PATTERNS: list[tuple[str, re.Pattern[str], str]] = [
-    ("forbidden", re.compile(r"\bsuddenly\b", re.IGNORECASE), 'Banned: "suddenly"'),
-    ("forbidden", re.compile(r"\bvery\b", re.IGNORECASE), 'Banned: "very"'),
-    ("forbidden", re.compile(r"\breally\b", re.IGNORECASE), 'Banned: "really"'),
-    ("forbidden", re.compile(r"\bbegan to\b", re.IGNORECASE), 'Banned: "began to"'),
-    ("forbidden", re.compile(r"\bstarted to\b", re.IGNORECASE), 'Banned: "started to"'),
-    ("forbidden", re.compile(r"\bseemed to\b", re.IGNORECASE), 'Banned: "seemed to"'),
-    ("forbidden", re.compile(r"\bappeared to\b", re.IGNORECASE), 'Banned: "appeared to"'),
-    ("forbidden", re.compile(r"a chill ran down", re.IGNORECASE), "Banned cliche: chill/spine"),
-    ("forbidden", re.compile(r"let out a breath", re.IGNORECASE), "Banned cliche: breath (didn't know holding)"),
-    ("forbidden", re.compile(r"\borbs\b", re.IGNORECASE), 'Banned: "orbs"'),
-    ("forbidden", re.compile(r"\bsmirked\b", re.IGNORECASE), 'Banned dialogue tag: "smirked"'),
-]
 
+def _first_char(pattern: str) -> str | None:
+    """
+    Literal first character every match must start with, or None when that is
+    not certain: a top-level alternation (`very|really`) or a quantified first
+    atom (`a?bc`) can start a match with some other character.
+    """
+    p = pattern[2:] if pattern.startswith(r"\b") else pattern
+    if not p or not (p[0].isalnum() or p[0] in "!;,:'\"-"):
+        return None
+    if p[1:2] and p[1] in "?*{|":
+        return None
+    if _has_top_level_alternation(p):
+        return None
+    return p[0]
+
+
+def compile_rules(rules: list[Rule]) -> RuleSet:
+    if not rules:
+        return RuleSet(rules=(), patterns=(), matcher=re.compile(r"(?!)"))
+    # The combined matcher is zero-width, so finditer advances one character at a
+    # time and a match of one rule never consumes text another rule needs.
+    matcher = "(?=" + "|".join(f"(?:{r.pattern})" for r in rules) + ")"
+    # Leading lookahead lets the regex engine skip text that cannot start any rule.
+    firsts = [_first_char(r.pattern) for r in rules]
+    if all(firsts):
+        chars = {c for f in firsts for c in (f.lower(), f.upper())}
+        matcher = f"(?=[{re.escape(''.join(sorted(chars)))}]){matcher}"
+    return RuleSet(
+        rules=tuple(rules),
+        patterns=tuple(re.compile(r.pattern, re.IGNORECASE) for r in rules),
+        matcher=re.compile(matcher, re.IGNORECASE),
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def load_rules(path: Path = RULES_PATH) -> RuleSet:
+    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    rules: list[Rule] = []
+    for kind, section in (("forbidden", "forbidden"), ("counter", "counters")):
+        for entry in data.get(section, []) or []:
+            rules.append(
+                Rule(
+                    id=str(entry["id"]),
+                    kind=kind,
+                    pattern=str(entry["pattern"]),
+                    message=str(entry["message"]),
+                    max=entry.get("max"),
+                    pov=entry.get("pov"),
+                    guide=entry.get("guide"),
+                )
+            )
+    ids = [r.id for r in rules]
+    dupes = sorted({i for i in ids if ids.count(i) > 1})
+    if dupes:
+        raise ValueError(f"{path}: duplicate rule id(s): {', '.join(dupes)}")
+    return compile_rules(rules)
+
+
+def style_guide_banned(path: Path = STYLE_GUIDE_PATH) -> list[str]:
+    """Banned cells of the STYLE_GUIDE "Forbidden Words/Phrases" table."""
+    text = path.read_text(encoding="utf-8")
+    m = re.search(r"^## Forbidden Words/Phrases\s*$(.*?)(?=^## |\Z)", text, re.M | re.S)
+    if not m:
+        return []
+    cells = []
+    for line in m.group(1).splitlines():
+        line = line.strip()
+        if not line.startswith("|") or re.fullmatch(r"\|[\s:|-]+\|", line):
+            continue
+        cell = line.strip("|").split("|")[0].strip()
+        if cell and cell != "Banned":
+            cells.append(cell)
+    return cells
 
-META_RE = re.compile(
-    r"<!--\s*Arc:\s*(\d+)\s*\|\s*POV:\s*(.+?)\s*\|\s*Location:\s*(.+?)\s*\|\s*Timeline:\s*(.+?)\s*-->",
-    re.IGNORECASE,
-)
 
-TITLE_RE = re.compile(r"^# Chapter\s+(\d+):\s*(.+)$")
+def check_rules(rules: RuleSet) -> list[str]:
+    """Drift between lint-rules.yaml and the STYLE_GUIDE table."""
+    banned = style_guide_banned()
+    guides = {r.guide for r in rules.rules if r.guide}
+    problems = [f"STYLE_GUIDE bans {cell} but no rule has guide: {cell}" for cell in banned if cell not in guides]
+    problems += [f"Rule guide {g} is not in the STYLE_GUIDE table" for g in sorted(guides) if g not in banned]
+    return problems
 
 
 def is_continental_pov(pov: str) -> bool:
@@ -60,33 +214,33 @@ def is_continental_pov(pov: str) -> bool:
     return False
 
 
-def lint_file(path: Path) -> tuple[dict[str, str], list[Finding]]:
-    txt = path.read_text(encoding="utf-8")
+@dataclass(frozen=True)
+class LintResult:
+    meta: dict[str, str]
+    findings: list[Finding]
+    counts: dict[str, int]  # counter rule id -> occurrences in the chapter
+    words: int  # words of prose (title, beat and continuity comments excluded)
+
+
+def lint_text(txt: str, path: Path, rules: RuleSet | None = None) -> LintResult:
+    rules = rules or load_rules()
     lines = txt.splitlines()
 
     meta: dict[str, str] = {"chapter": "?", "title": "?", "arc": "?", "pov": "?", "location": "?", "timeline": "?"}
 
-    for i, line in enumerate(lines, start=1):
-        m = TITLE_RE.match(line.strip())
-        if m:
-            meta["chapter"] = m.group(1)
-            meta["title"] = m.group(2).strip()
-            break
-
-    for line in lines[:40]:
-        m = META_RE.search(line)
-        if m:
-            meta["arc"] = m.group(1).strip()
-            meta["pov"] = m.group(2).strip()
-            meta["location"] = m.group(3).strip()
-            meta["timeline"] = m.group(4).strip()
-            break
+    chapter = parse_chapter(txt, path=path)
+    if chapter.meta is not None:
+        meta["chapter"] = str(chapter.meta.num)
+        meta["title"] = chapter.meta.title
+        # Only report header fields the draft actually declares.
+        if META_RE.search(txt):
+            meta["arc"] = str(chapter.meta.arc)
+            meta["pov"] = chapter.meta.pov
+            meta["location"] = chapter.meta.location
+            meta["timeline"] = chapter.meta.timeline
 
     findings: list[Finding] = []
-
-    whispered = 0
-    exclamations = 0
-    semicolons = 0
+    counts: dict[str, int] = {r.id: 0 for r in rules.rules if r.kind == "counter"}
 
     for i, line in enumerate(lines, start=1):
         s = line
@@ -94,96 +248,286 @@ def lint_file(path: Path) -> tuple[dict[str, str], list[Finding]]:
         if "<!--" in s:
             continue
 
-        if "whispered" in s.lower():
-            whispered += len(re.findall(r"\bwhispered\b", s, flags=re.IGNORECASE))
-        exclamations += s.count("!")
-        semicolons += s.count(";")
-
-        for kind, pat, msg in FORBIDDEN_PATTERNS:
-            if pat.search(s):
-                excerpt = s.strip()
-                if len(excerpt) > 160:
-                    excerpt = excerpt[:157] + "..."
-                findings.append(
-                    Finding(
-                        path=str(path),
-                        line=i,
-                        kind=kind,
-                        message=msg,
-                        excerpt=excerpt,
-                    )
+        reported: set[str] = set()
+        for rule in rules.scan(s):
+            if rule.kind == "counter":
+                counts[rule.id] += 1
+                continue
+            # One finding per rule per line, however often it matches.
+            if rule.id in reported:
+                continue
+            reported.add(rule.id)
+            excerpt = s.strip()
+            if len(excerpt) > 160:
+                excerpt = excerpt[:157] + "..."
+            findings.append(
+                Finding(
+                    path=str(path),
+                    line=i,
+                    kind=rule.kind,
+                    message=rule.message,
+                    excerpt=excerpt,
+                    rule=rule.id,
                 )
-
-    if whispered > 2:
-        findings.append(
-            Finding(
-                path=str(path),
-                line=0,
-                kind="style",
-                message=f'Overuse: "whispered" occurs {whispered}x (style guide: <= 2x/chapter).',
-                excerpt="",
             )
-        )
 
-    if exclamations >= 6:
+    for rule in rules.rules:
+        if rule.kind != "counter" or rule.max is None or counts[rule.id] <= rule.max:
+            continue
+        if rule.pov == "continental" and not (meta.get("pov", "?") != "?" and is_continental_pov(meta["pov"])):
+            continue
         findings.append(
             Finding(
                 path=str(path),
                 line=0,
                 kind="style",
-                message=f"High exclamation count: {exclamations} occurrences. Consider reducing narration exclamation marks.",
+                message=rule.message.format(count=counts[rule.id]),
                 excerpt="",
+                rule=rule.id,
             )
         )
 
-    if meta.get("pov", "?") != "?" and is_continental_pov(meta["pov"]) and semicolons > 0:
-        findings.append(
-            Finding(
-                path=str(path),
-                line=0,
-                kind="style",
-                message=f"Continental POV semicolons: {semicolons} occurrences (STYLE_GUIDE: avoid semicolons in Continental chapters).",
-                excerpt="",
-            )
+    words = len(WORD_RE.findall(chapter.translatable_prose))
+    return LintResult(meta=meta, findings=findings, counts=counts, words=words)
+
+
+def lint_file(path: Path, rules: RuleSet | None = None) -> tuple[dict[str, str], list[Finding]]:
+    res = lint_text(path.read_text(encoding="utf-8"), path, rules)
+    return res.meta, res.findings
+
+
+# ── Corpus mode: cache, workers, aggregates, output ───────────────
+
+def all_drafts() -> list[Path]:
+    return sorted((ROOT / "manuscript").glob("arc-*/chapter-*.draft.md"))
+
+
+def lint_fingerprint(rules_path: Path) -> str:
+    """Cached findings are only valid for the same rules and lint code."""
+    h = hashlib.sha256()
+    here = Path(__file__).resolve()
+    for p in (rules_path, here, here.with_name("draft_parser.py")):
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def result_to_json(res: LintResult) -> dict[str, Any]:
+    # Paths are left out so identical content under another name reuses the entry.
+    return {
+        "meta": res.meta,
+        "findings": [{k: v for k, v in dataclasses.asdict(f).items() if k != "path"} for f in res.findings],
+        "counts": res.counts,
+        "words": res.words,
+    }
+
+
+def result_from_json(data: dict[str, Any], path: str) -> LintResult:
+    return LintResult(
+        meta=data["meta"],
+        findings=[Finding(path=path, **f) for f in data["findings"]],
+        counts=data["counts"],
+        words=data["words"],
+    )
+
+
+def _lint_worker(task: tuple[str, str]) -> dict[str, Any]:
+    path, rules_path = task
+    txt = Path(path).read_text(encoding="utf-8")
+    return result_to_json(lint_text(txt, Path(path), load_rules(Path(rules_path))))
+
+
+def lint_corpus(
+    paths: list[Path], rules_path: Path, *, jobs: int = 1, use_cache: bool = True, prune: bool = False
+) -> tuple[list[LintResult], int]:
+    """
+    Lint `paths`, cache misses on up to `jobs` processes; returns (results, cache hits).
+    Other files' cache entries are kept; with `prune` (a whole-corpus run) only `paths` are.
+    """
+    fingerprint = lint_fingerprint(rules_path)
+    entries: dict[str, Any] = {}
+    if use_cache:
+        try:
+            cached = json.loads(CACHE_PATH.read_text(encoding="utf-8"))
+            if cached.get("version") == CACHE_VERSION and cached.get("fingerprint") == fingerprint:
+                entries = cached.get("entries", {})
+        except (OSError, ValueError):
+            pass
+
+    digests = [hashlib.sha256(p.read_bytes()).hexdigest() for p in paths]
+    hits = sum(1 for d in digests if d in entries)
+    todo = sorted({d: str(p) for p, d in zip(paths, digests) if d not in entries}.items())
+
+    tasks = [(path, str(rules_path)) for _, path in todo]
+    if jobs <= 1 or len(tasks) <= 1:
+        fresh = [_lint_worker(t) for t in tasks]
+    else:
+        workers = min(jobs, len(tasks))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as ex:
+            fresh = list(ex.map(_lint_worker, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+    for (digest, _), data in zip(todo, fresh):
+        entries[digest] = data
+
+    if use_cache and (todo or (prune and len(entries) != len(set(digests)))):
+        live = {d: entries[d] for d in digests} if prune else entries
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CACHE_PATH.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"version": CACHE_VERSION, "fingerprint": fingerprint, "entries": live}, ensure_ascii=False),
+            encoding="utf-8",
         )
-
-    return meta, findings
-
-
-def main() -> int:
+        tmp.replace(CACHE_PATH)
+
+    return [result_from_json(entries[d], str(p)) for p, d in zip(paths, digests)], hits
+
+
+def per_1k(count: int, words: int) -> float:
+    return round(count * 1000 / words, 2) if words else 0.0
+
+
+def aggregate(paths: list[Path], results: list[LintResult]) -> dict[str, Any]:
+    """Per-chapter and book-level words, counter densities per 1k words, and findings by rule."""
+    chapters = []
+    book_counts: dict[str, int] = {}
+    book_rules: dict[str, int] = {}
+    for path, res in zip(paths, results):
+        by_rule: dict[str, int] = {}
+        for f in res.findings:
+            by_rule[f.rule] = by_rule.get(f.rule, 0) + 1
+            book_rules[f.rule] = book_rules.get(f.rule, 0) + 1
+        for rule_id, n in res.counts.items():
+            book_counts[rule_id] = book_counts.get(rule_id, 0) + n
+        chapters.append({
+            "path": str(path),
+            "chapter": res.meta["chapter"],
+            "title": res.meta["title"],
+            "pov": res.meta["pov"],
+            "words": res.words,
+            "counts": res.counts,
+            "per_1k_words": {k: per_1k(v, res.words) for k, v in res.counts.items()},
+            "findings": len(res.findings),
+            "findings_by_rule": by_rule,
+        })
+    words = sum(r.words for r in results)
+    return {
+        "chapters": chapters,
+        "book": {
+            "chapters": len(results),
+            "words": words,
+            "counts": book_counts,
+            "per_1k_words": {k: per_1k(v, words) for k, v in book_counts.items()},
+            "findings": sum(len(r.findings) for r in results),
+            "findings_by_rule": dict(sorted(book_rules.items())),
+        },
+    }
+
+
+def to_sarif(results: list[LintResult], rules: RuleSet) -> dict[str, Any]:
+    """SARIF 2.1.0 log; chapter-level findings (line 0) carry no region."""
+    sarif_results = []
+    for res in results:
+        for f in res.findings:
+            location: dict[str, Any] = {"artifactLocation": {"uri": Path(os.path.relpath(f.path, ROOT)).as_posix()}}
+            if f.line:
+                location["region"] = {"startLine": f.line}
+            sarif_results.append({
+                "ruleId": f.rule,
+                "level": "warning",
+                "message": {"text": f.message},
+                "locations": [{"physicalLocation": location}],
+            })
+    return {
+        "version": "2.1.0",
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "runs": [{
+            "tool": {"driver": {
+                "name": "prose_lint",
+                "rules": [
+                    {"id": r.id, "shortDescription": {"text": r.message.replace("{count}", "N")}}
+                    for r in rules.rules
+                ],
+            }},
+            "results": sarif_results,
+        }],
+    }
+
+
+def print_result(path: Path, res: LintResult) -> None:
+    meta, findings = res.meta, res.findings
+    print(f"\n{path}")
+    print(f"  Chapter: {meta['chapter']}  Title: {meta['title']}")
+    print(f"  Arc: {meta['arc']}  POV: {meta['pov']}")
+    print(f"  Words: {res.words}")
+
+    if not findings:
+        print("  Findings: none")
+    else:
+        print(f"  Findings: {len(findings)}")
+        for f in findings:
+            loc = f"L{f.line}" if f.line else "-"
+            if f.excerpt:
+                print(f"    [{f.kind}] {loc}: {f.message} :: {f.excerpt}")
+            else:
+                print(f"    [{f.kind}] {loc}: {f.message}")
+
+
+def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("paths", nargs="+", help="Draft markdown files (.draft.md)")
-    args = ap.parse_args()
-
-    all_findings: list[Finding] = []
-    for p in args.paths:
-        path = Path(p)
+    ap.add_argument("paths", nargs="*", help="Draft markdown files (.draft.md)")
+    ap.add_argument("--all", action="store_true", help="Lint every manuscript/arc-*/chapter-*.draft.md")
+    ap.add_argument("--jobs", type=int, default=0, help="Processes for files not in the cache (0 = one per CPU; default: 0)")
+    ap.add_argument("--no-cache", action="store_true", help="Ignore and do not update .cache/prose-lint-cache.json")
+    ap.add_argument("--format", choices=("text", "json", "sarif"), default="text", help="Output format (default: text)")
+    ap.add_argument("--output", default=None, help="With --format json/sarif: write here instead of stdout")
+    ap.add_argument("--rules", default=str(RULES_PATH), help="Lint rules file (default: style/lint-rules.yaml)")
+    ap.add_argument("--check-rules", action="store_true", help="Report drift between the rules file and STYLE_GUIDE.md")
+    args = ap.parse_args(argv)
+
+    rules = load_rules(Path(args.rules))
+    if args.check_rules:
+        problems = check_rules(rules)
+        for problem in problems:
+            print(problem)
+        if not problems:
+            print(f"{len(rules.rules)} rules in sync with {STYLE_GUIDE_PATH.relative_to(ROOT)}")
+        return 1 if problems else 0
+
+    paths = all_drafts() if args.all else [Path(p) for p in args.paths]
+    if not paths:
+        ap.error("no draft paths given (pass paths or --all)")
+    for path in paths:
         if not path.exists():
-            print(f"error: not found: {p}", file=sys.stderr)
+            print(f"error: not found: {path}", file=sys.stderr)
             return 2
-        meta, findings = lint_file(path)
-        words = len(re.findall(r"\b\\w+\\b", path.read_text(encoding="utf-8")))
-
-        print(f"\n{path}")
-        print(f"  Chapter: {meta['chapter']}  Title: {meta['title']}")
-        print(f"  Arc: {meta['arc']}  POV: {meta['pov']}")
-        print(f"  Words: {words}")
 
-        if not findings:
-            print("  Findings: none")
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    results, hits = lint_corpus(paths, Path(args.rules), jobs=jobs, use_cache=not args.no_cache, prune=args.all)
+
+    if args.format == "text":
+        for path, res in zip(paths, results):
+            print_result(path, res)
+        if len(results) > 1:
+            book = aggregate(paths, results)["book"]
+            density = "  ".join(f"{k}={v}" for k, v in book["per_1k_words"].items())
+            print(f"\nBook: {book['chapters']} chapters, {book['words']} words, {book['findings']} findings")
+            print(f"  Per 1k words: {density}")
+            print(f"  Cache: {hits} reused, {len(results) - hits} linted")
+    else:
+        if args.format == "sarif":
+            doc = to_sarif(results, rules)
         else:
-            print(f"  Findings: {len(findings)}")
-            for f in findings:
-                loc = f"L{f.line}" if f.line else "-"
-                if f.excerpt:
-                    print(f"    [{f.kind}] {loc}: {f.message} :: {f.excerpt}")
-                else:
-                    print(f"    [{f.kind}] {loc}: {f.message}")
-        all_findings.extend(findings)
+            doc = aggregate(paths, results)
+            doc["findings"] = [dataclasses.asdict(f) for res in results for f in res.findings]
+        text = json.dumps(doc, ensure_ascii=False, indent=2) + "\n"
+        if args.output:
+            out = Path(args.output)
+            out.parent.mkdir(parents=True, exist_ok=True)
+            out.write_text(text, encoding="utf-8")
+            print(f"Wrote {args.output} ({sum(len(r.findings) for r in results)} findings)", file=sys.stderr)
+        else:
+            sys.stdout.write(text)
 
-    return 0 if not all_findings else 1
+    return 0 if not any(res.findings for res in results) else 1
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
@@ -0,0 +1,79 @@
+#!/usr/bin/env node
+/**
+ * Headless Mermaid -> SVG renderer for tools/build_storyos.py.
+ *
+ * Reads `{"config": {...}, "diagrams": {name: source}}` as JSON on stdin and
+ * writes `{name: svg}` to stdout. Diagrams are rendered in headless Chrome
+ * (puppeteer, pinned in the repo's package.json) with the same
+ * meta/ui/vendor/mermaid.min.js the dashboard falls back to, one browser for
+ * the whole batch.
+ *
+ *   echo '{"config": {}, "diagrams": {"a": "graph LR\n  x --> y"}}' | node tools/render_mermaid.mjs
+ */
+
+import { readFile } from "node:fs/promises";
+import { dirname, resolve } from "node:path";
+import process from "node:process";
+import { fileURLToPath } from "node:url";
+
+const BOOK = resolve(dirname(fileURLToPath(import.meta.url)), "..");
+const MERMAID_JS = resolve(BOOK, "meta", "ui", "vendor", "mermaid.min.js");
+
+async function readStdin() {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return Buffer.concat(chunks).toString("utf8");
+}
+
+async function main() {
+  let puppeteer;
+  try {
+    puppeteer = (await import("puppeteer")).default;
+  } catch {
+    console.error("render_mermaid: puppeteer is not installed (run `npm ci` at the repo root)");
+    return 3;
+  }
+
+  const { config = {}, diagrams = {} } = JSON.parse(await readStdin());
+  const browser = await puppeteer.launch({ headless: "shell", args: ["--no-sandbox"] });
+  try {
+    const page = await browser.newPage();
+    await page.setContent("<!doctype html><html><body></body></html>");
+    await page.addScriptTag({ content: await readFile(MERMAID_JS, "utf8") });
+    const svgs = await page.evaluate(
+      async (config, diagrams) => {
+        /* global mermaid */
+        mermaid.initialize({ startOnLoad: false, ...config });
+        const out = {};
+        for (const [name, source] of Object.entries(diagrams)) {
+          const { svg } = await mermaid.render(`storyos-${name}`, source);
+          // Fixed pixel size from the viewBox so the file renders at scale as <img>.
+          const doc = new DOMParser().parseFromString(svg, "image/svg+xml");
+          const root = doc.documentElement;
+          const [, , w, h] = (root.getAttribute("viewBox") || "").split(/\s+/).map(Number);
+          if (w && h) {
+            root.setAttribute("width", String(Math.ceil(w)));
+            root.setAttribute("height", String(Math.ceil(h)));
+            root.style.removeProperty("max-width");
+          }
+          out[name] = new XMLSerializer().serializeToString(root) + "\n";
+        }
+        return out;
+      },
+      config,
+      diagrams,
+    );
+    process.stdout.write(JSON.stringify(svgs));
+  } finally {
+    await browser.close();
+  }
+  return 0;
+}
+
+main().then(
+  (code) => process.exit(code),
+  (err) => {
+    console.error(`render_mermaid: ${err.stack || err}`);
+    process.exit(1);
+  },
+);
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tokenizing and Unicode folding shared by the search index builders.
+
+Terms are folded so a query typed without diacritics finds the original
+spelling: NFKD, combining marks dropped, lowercased ("Sūrya" -> "surya",
+"Satyā" -> "satya"). Lowercasing (not casefold) is what the browser clients
+can reproduce exactly with String.prototype.toLowerCase(). Offsets always point into the unfolded source text, so
+clients can highlight the original characters.
+
+    from search_text import fold, tokenize
+
+    fold("Sūrya")                      # "surya"
+    list(tokenize("Kael's lens"))      # [("kael's", 0), ("lens", 7)]
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterator
+
+
+# Letters/digits, with inner apostrophes kept ("Kael's", "don't").
+TOKEN_RE = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+MIN_TERM_LEN = 2
+
+
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.lower().replace("’", "'")
+
+
+def tokenize(text: str) -> Iterator[tuple[str, int]]:
+    """Yield (folded term, char offset in `text`) for every indexable token."""
+    for m in TOKEN_RE.finditer(text):
+        term = fold(m.group(0))
+        if len(term) >= MIN_TERM_LEN:
+            yield term, m.start()
+
+
+def term_offsets(text: str) -> dict[str, list[int]]:
+    """Folded term -> ascending char offsets of its occurrences."""
+    out: dict[str, list[int]] = {}
+    for term, offset in tokenize(text):
+        out.setdefault(term, []).append(offset)
+    return out
+
+
+def term_postings(text: str, max_offsets: int) -> dict[str, list[int]]:
+    """Folded term -> [count, first offset, deltas...] with at most `max_offsets` offsets."""
+    return {
+        term: [len(offsets), *delta_encode(offsets[:max_offsets])]
+        for term, offsets in term_offsets(text).items()
+    }
+
+
+def delta_encode(values: list[int]) -> list[int]:
+    """[3, 10, 12] -> [3, 7, 2]; inputs are ascending."""
+    return [v - values[i - 1] if i else v for i, v in enumerate(values)]
+
+
+def encode_varints(values: list[int]) -> bytes:
+    """Unsigned LEB128: 7 bits per byte, high bit set on all but the last byte."""
+    if max(values, default=0) < 0x80:
+        return bytes(values)
+    out = bytearray()
+    for v in values:
+        while v >= 0x80:
+            out.append((v & 0x7F) | 0x80)
+            v >>= 7
+        out.append(v)
+    return bytes(out)
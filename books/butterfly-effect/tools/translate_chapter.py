@@ -12,138 +12,24 @@ from __future__ import annotations
 
 import argparse
 import os
-import re
-from dataclasses import dataclass
 from pathlib import Path
 
 import torch
 import yaml
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
 
+from draft_parser import is_blockquote_block, is_scene_break, load_chapter
+from placeholders import Protector
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CFG_PATH = ROOT / "agents/translation/translation-config.yaml"
 
 
-TITLE_RE = re.compile(r"^# Chapter\s+(\d+):\s*(.+)$", re.MULTILINE)
-META_RE = re.compile(
-    r"<!--\s*Arc:\s*(\d+)\s*\|\s*POV:\s*(.+?)\s*\|\s*Location:\s*(.+?)\s*\|\s*Timeline:\s*(.+?)\s*-->",
-    re.IGNORECASE,
-)
-
-
-@dataclass(frozen=True)
-class ChapterMeta:
-    arc: int
-    num: int
-    title: str
-    pov: str
-    location: str
-    timeline: str
-
-
 def load_cfg() -> dict:
     return yaml.safe_load(CFG_PATH.read_text(encoding="utf-8"))
 
 
-def parse_chapter_meta(draft_text: str) -> ChapterMeta:
-    title_m = TITLE_RE.search(draft_text)
-    if not title_m:
-        raise ValueError("Missing chapter title line: '# Chapter NN: Title'")
-    num = int(title_m.group(1))
-    title = title_m.group(2).strip()
-
-    meta_m = META_RE.search(draft_text)
-    if meta_m:
-        arc = int(meta_m.group(1))
-        pov = meta_m.group(2).strip()
-        location = meta_m.group(3).strip()
-        timeline = meta_m.group(4).strip()
-    else:
-        arc, pov, location, timeline = 1, "Unknown", "Unknown", "Unknown"
-
-    return ChapterMeta(arc=arc, num=num, title=title, pov=pov, location=location, timeline=timeline)
-
-
-def extract_prose(draft_text: str) -> str:
-    """
-    Strip draft-only scaffolding (title + HTML comments) and return prose markdown.
-    Mirrors build/convert.py behavior to avoid translating beat-sheet comments.
-    """
-    lines = draft_text.splitlines()
-    prose_lines: list[str] = []
-    in_comment_block = False
-
-    for line in lines:
-        if re.match(r"^# Chapter \d+:", line):
-            continue
-        if re.match(r"^\s*<!--.*-->\s*$", line):
-            continue
-        if re.match(r"^\s*<!--", line) and "-->" not in line:
-            in_comment_block = True
-            continue
-        if in_comment_block:
-            if "-->" in line:
-                in_comment_block = False
-            continue
-        prose_lines.append(line)
-
-    prose = "\n".join(prose_lines).strip()
-    prose = re.sub(r"\n---\s*$", "", prose)
-    return prose
-
-
-def make_placeholders(tokens: list[str]) -> tuple[list[str], dict[str, str]]:
-    """
-    Returns (sorted_tokens, mapping placeholder->token).
-    We do not return token->placeholder because multiple tokens can collide after normalization.
-    """
-    # Sort by length to avoid partial replacements (e.g., "Satya" inside "Satya-speaker")
-    sorted_tokens = sorted(set(tokens), key=len, reverse=True)
-    mapping: dict[str, str] = {}
-    for i, tok in enumerate(sorted_tokens):
-        # Use a placeholder that's unlikely to be "normalized" by MT models.
-        # Underscores tend to survive MT unchanged, unlike bracket-heavy tokens.
-        mapping[f"__PROT{i:03d}__"] = tok
-    return sorted_tokens, mapping
-
-
-def protect(text: str, tokens: list[str], ph_map: dict[str, str]) -> str:
-    out = text
-    # Replace tokens with placeholders deterministically.
-    for ph, tok in ph_map.items():
-        # Prefer whole-token replacement for word-ish tokens to avoid corrupting substrings
-        # (e.g. Satya term "mati" inside English word "formation").
-        if re.fullmatch(r"[A-Za-z0-9_]+", tok):
-            # ASCII boundaries so tokens can be adjacent to CJK characters without spaces.
-            out = re.sub(rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])", ph, out)
-        else:
-            out = out.replace(tok, ph)
-    return out
-
-
-def unprotect(text: str, ph_map: dict[str, str]) -> str:
-    out = text
-    for ph, tok in ph_map.items():
-        code = ph.strip("_")  # "PROT000"
-
-        # Exact placeholder.
-        out = out.replace(ph, tok)
-
-        # Common model "normalizations" we observed in practice.
-        out = re.sub(rf"_{1,3}\s*{re.escape(code)}\s*_{1,3}", tok, out)
-        out = re.sub(rf"\[\[\s*{re.escape(code)}\s*\]\]", tok, out)
-        out = re.sub(rf"\[\s*{re.escape(code)}\s*\]", tok, out)
-
-    return out
-
-
-def split_paragraphs(prose: str) -> list[str]:
-    # Preserve scene breaks as standalone paragraphs.
-    paras = re.split(r"\n\s*\n", prose)
-    return [p for p in (para.rstrip() for para in paras) if p.strip() != ""]
-
-
 def translate_blocks(
     blocks: list[str],
     *,
@@ -163,29 +49,27 @@ def translate_blocks(
         tokens.append(t)
         tokens.append(f"*{t}*")
 
-    sorted_tokens, ph_map = make_placeholders(tokens)
+    protector = Protector(tokens)
 
     tokenizer.src_lang = src_lang
     forced_bos_token_id = tokenizer.convert_tokens_to_ids(tgt_lang)
 
     out_blocks: list[str] = []
     for b in blocks:
-        s = b.strip()
-        if s in {"---", "***"}:
-            out_blocks.append(s)
+        if is_scene_break(b):
+            out_blocks.append(b.strip())
             continue
 
         # Blockquotes: preserve leading "> " markers line-by-line.
-        lines = b.splitlines()
-        if lines and all(l.lstrip().startswith("> ") for l in lines if l.strip()):
+        if is_blockquote_block(b):
             translated_lines: list[str] = []
-            for line in lines:
+            for line in b.splitlines():
                 if not line.strip():
                     translated_lines.append(line)
                     continue
                 prefix = line.split("> ", 1)[0] + "> "
                 content = line.split("> ", 1)[1]
-                protected = protect(content, sorted_tokens, ph_map)
+                protected = protector.protect(content)
                 inp = tokenizer(protected, return_tensors="pt", truncation=True).to(device)
                 gen = model.generate(
                     **inp,
@@ -194,12 +78,12 @@ def translate_blocks(
                     max_new_tokens=max_new_tokens,
                 )
                 out = tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-                out = unprotect(out, ph_map).strip()
+                out = protector.unprotect(out).strip()
                 translated_lines.append(prefix + out)
             out_blocks.append("\n".join(translated_lines).rstrip())
             continue
 
-        protected = protect(b, sorted_tokens, ph_map)
+        protected = protector.protect(b)
         inp = tokenizer(protected, return_tensors="pt", truncation=True).to(device)
         gen = model.generate(
             **inp,
@@ -208,7 +92,7 @@ def translate_blocks(
             max_new_tokens=max_new_tokens,
         )
         out = tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-        out = unprotect(out, ph_map).strip()
+        out = protector.unprotect(out).strip()
         out_blocks.append(out)
 
     return out_blocks
@@ -249,10 +133,11 @@ def main() -> int:
     model.eval()
 
     chapter_path = Path(args.chapter)
-    draft_text = chapter_path.read_text(encoding="utf-8")
-    meta = parse_chapter_meta(draft_text)
-    prose = extract_prose(draft_text)
-    blocks = split_paragraphs(prose)
+    chapter = load_chapter(chapter_path)
+    if chapter.meta is None:
+        raise SystemExit(f"{chapter_path}: missing chapter title line: '# Chapter NN: Title'")
+    meta = chapter.meta
+    blocks = list(chapter.translatable_blocks)
 
     protected_tokens = cfg.get("protected", {}).get("tokens", [])
     satya_terms = cfg.get("protected", {}).get("satya_terms", [])
@@ -9,6 +9,10 @@ Goal: "1000 minds" robustness without relying on a single model.
 
 Usage:
   python3 tools/translate_chapter_ensemble.py --chapter manuscript/arc-1/chapter-01.draft.md --lang hi es
+  python3 tools/translate_chapter_ensemble.py --chapters 'manuscript/arc-2/*.draft.md' --lang hi
+  python3 tools/translate_chapter_ensemble.py --all
+
+Batch runs load each engine (and the QE scorer) once for all chapters and languages.
 
 Notes:
 - COMETKiwi QE models may require HuggingFace license acceptance + HF token.
@@ -18,13 +22,15 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import glob
+import hashlib
 import json
 import os
-import re
+import sqlite3
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any
 
 import torch
 import yaml
@@ -36,154 +42,238 @@ from transformers import (
     SeamlessM4Tv2ForTextToText,
 )
 
+from draft_parser import ChapterMeta, is_blockquote_block, is_scene_break, load_chapter
+from placeholders import Protector, has_placeholders
+
 
 ROOT = Path(__file__).resolve().parents[1]
 CFG_PATH = ROOT / "agents/translation/translation-pipeline.yaml"
 ENTITIES_PATH = ROOT / "schema/entities.yaml"
-
-TITLE_RE = re.compile(r"^# Chapter\s+(\d+):\s*(.+)$", re.MULTILINE)
-META_RE = re.compile(
-    r"<!--\s*Arc:\s*(\d+)\s*\|\s*POV:\s*(.+?)\s*\|\s*Location:\s*(.+?)\s*\|\s*Timeline:\s*(.+?)\s*-->",
-    re.IGNORECASE,
-)
-
-
-@dataclass(frozen=True)
-class ChapterMeta:
-    arc: int
-    num: int
-    title: str
-    pov: str
-    location: str
-    timeline: str
+TM_PATH = ROOT / ".cache/translation-memory.sqlite"
 
 
 def load_yaml(path: Path) -> dict[str, Any]:
     return yaml.safe_load(path.read_text(encoding="utf-8"))
 
 
-def parse_chapter_meta(draft_text: str) -> ChapterMeta:
-    title_m = TITLE_RE.search(draft_text)
-    if not title_m:
-        raise ValueError("Missing chapter title line: '# Chapter NN: Title'")
-    num = int(title_m.group(1))
-    title = title_m.group(2).strip()
+@dataclass(frozen=True)
+class ChapterInput:
+    path: Path
+    meta: ChapterMeta
+    blocks: list[str]
+    score_src_blocks: list[str]
+
+
+def resolve_chapters(patterns: list[str] | None, *, all_chapters: bool) -> list[Path]:
+    """Expand --chapter/--chapters globs (cwd first, then book root) or --all, in book order."""
+    if all_chapters:
+        patterns = ["manuscript/arc-*/chapter-*.draft.md"]
+    paths: dict[Path, None] = {}
+    for pattern in patterns or []:
+        hits = glob.glob(pattern) or (glob.glob(str(ROOT / pattern)) if not Path(pattern).is_absolute() else [])
+        if not hits:
+            raise SystemExit(f"No chapter drafts match {pattern!r}")
+        for hit in hits:
+            paths[Path(hit).resolve()] = None
+    return sorted(paths, key=lambda p: (p.parent.name, p.name))
+
+
+def load_chapter_input(path: Path) -> ChapterInput:
+    chapter = load_chapter(path)
+    if chapter.meta is None:
+        raise SystemExit(f"{path}: missing chapter title line: '# Chapter NN: Title'")
+    blocks = list(chapter.translatable_blocks)
+    return ChapterInput(path=path, meta=chapter.meta, blocks=blocks, score_src_blocks=flatten_for_scoring(blocks))
 
-    meta_m = META_RE.search(draft_text)
-    if meta_m:
-        arc = int(meta_m.group(1))
-        pov = meta_m.group(2).strip()
-        location = meta_m.group(3).strip()
-        timeline = meta_m.group(4).strip()
-    else:
-        arc, pov, location, timeline = 1, "Unknown", "Unknown", "Unknown"
 
-    return ChapterMeta(arc=arc, num=num, title=title, pov=pov, location=location, timeline=timeline)
+def ensure_dir(p: Path) -> None:
+    p.mkdir(parents=True, exist_ok=True)
 
 
-def extract_prose(draft_text: str) -> str:
-    """
-    Strip draft-only scaffolding (title + HTML comments) and return prose markdown.
-    Mirrors build/convert.py behavior to avoid translating beat-sheet comments.
+def pick_device(pref: str) -> str:
+    if pref == "cpu":
+        return "cpu"
+    if pref == "cuda":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    # auto
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def segment_blocks(blocks: list[str]) -> tuple[list[list[tuple[str, int | None]]], list[str]]:
     """
-    lines = draft_text.splitlines()
-    prose_lines: list[str] = []
-    in_comment_block = False
+    Flatten blocks into the text segments the models see.
 
-    for line in lines:
-        if re.match(r"^# Chapter \d+:", line):
-            continue
-        if re.match(r"^\s*<!--.*-->\s*$", line):
-            continue
-        if re.match(r"^\s*<!--", line) and "-->" not in line:
-            in_comment_block = True
+    Paragraphs are one segment; blockquotes are one segment per "> " line (the
+    prefix is kept out of the model input); scene breaks pass through. Returns
+    (layout, segments): per block, a list of (prefix, segment index) lines, where
+    index None means the prefix is a literal line.
+    """
+    layout: list[list[tuple[str, int | None]]] = []
+    segments: list[str] = []
+    for b in blocks:
+        if is_scene_break(b):
+            layout.append([(b.strip(), None)])
             continue
-        if in_comment_block:
-            if "-->" in line:
-                in_comment_block = False
+        if is_blockquote_block(b):
+            lines: list[tuple[str, int | None]] = []
+            for line in b.splitlines():
+                if not line.strip():
+                    lines.append((line, None))
+                    continue
+                prefix, content = line.split("> ", 1)
+                lines.append((prefix + "> ", len(segments)))
+                segments.append(content)
+            layout.append(lines)
             continue
-        prose_lines.append(line)
+        layout.append([("", len(segments))])
+        segments.append(b)
+    return layout, segments
 
-    prose = "\n".join(prose_lines).strip()
-    prose = re.sub(r"\n---\s*$", "", prose)
-    return prose
 
+def assemble_blocks(layout: list[list[tuple[str, int | None]]], outputs: list[str]) -> list[str]:
+    return [
+        "\n".join(prefix if seg is None else prefix + outputs[seg] for prefix, seg in lines).rstrip()
+        for lines in layout
+    ]
 
-def split_paragraphs(prose: str) -> list[str]:
-    paras = re.split(r"\n\s*\n", prose)
-    return [p for p in (para.rstrip() for para in paras) if p.strip() != ""]
 
+def length_buckets(lengths: list[int], *, batch_size: int, max_tokens: int) -> list[list[int]]:
+    """
+    Group segment indices into generate() batches, longest first, so similar lengths
+    share a batch (little padding) and batch_size x longest input stays <= max_tokens.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches: list[list[int]] = []
+    cur: list[int] = []
+    width = 0
+    for i in order:
+        if cur and (len(cur) >= batch_size or (max_tokens > 0 and width * (len(cur) + 1) > max_tokens)):
+            batches.append(cur)
+            cur = []
+        if not cur:
+            width = lengths[i]
+        cur.append(i)
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+class TranslationMemory:
+    """
+    Segment-level MT cache in SQLite.
 
-def is_scene_break(block: str) -> bool:
-    s = block.strip()
-    return s in {"---", "***"} or re.fullmatch(r"\*\s*\*\s*\*", s) is not None
-
-
-def is_blockquote_block(block: str) -> bool:
-    lines = block.splitlines()
-    # Blockquote blocks are often contiguous groups of "> " lines.
-    return bool(lines) and all(l.lstrip().startswith("> ") for l in lines if l.strip())
-
-
-def make_placeholders(tokens: list[str]) -> tuple[list[str], dict[str, str]]:
-    sorted_tokens = sorted(set(tokens), key=len, reverse=True)
-    mapping: dict[str, str] = {}
-    for i, tok in enumerate(sorted_tokens):
-        # Underscores tend to survive MT unchanged, unlike bracket-heavy tokens.
-        mapping[f"__PROT{i:03d}__"] = tok
-    return sorted_tokens, mapping
-
-
-def protect_text(text: str, ph_map: dict[str, str]) -> str:
-    out = text
-    for ph, tok in ph_map.items():
-        # Whole-token replacement for word-ish tokens prevents substring corruption
-        # (e.g. Satya "mati" inside English word "formation").
-        if re.fullmatch(r"[A-Za-z0-9_]+", tok):
-            # ASCII boundaries so tokens can be adjacent to CJK characters without spaces.
-            out = re.sub(rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])", ph, out)
-        else:
-            out = out.replace(tok, ph)
-    return out
-
-
-def unprotect_text(text: str, ph_map: dict[str, str]) -> str:
-    out = text
-    for ph, tok in ph_map.items():
-        code = ph.strip("_")  # "PROT000"
-
-        # Exact placeholder.
-        out = out.replace(ph, tok)
-
-        # Common model "normalizations".
-        out = re.sub(rf"_{1,3}\s*{re.escape(code)}\s*_{1,3}", tok, out)
-        out = re.sub(rf"\[\[\s*{re.escape(code)}\s*\]\]", tok, out)
-        out = re.sub(rf"\[\s*{re.escape(code)}\s*\]", tok, out)
-    return out
+    Key: sha256 of (engine id, model + revision, load options (dtype, 4-bit),
+    generation params, target code, protected segment text). Value: the raw
+    model output, placeholders included, so it is restored by whatever
+    Protector the current run uses.
+    """
 
+    def __init__(self, path: Path) -> None:
+        ensure_dir(path.parent)
+        self.path = path
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "key TEXT PRIMARY KEY, engine TEXT NOT NULL, lang TEXT NOT NULL, output TEXT NOT NULL)"
+        )
+        self.conn.commit()
 
-def ensure_dir(p: Path) -> None:
-    p.mkdir(parents=True, exist_ok=True)
+    @staticmethod
+    def key(identity: dict[str, Any], text: str) -> str:
+        blob = json.dumps([identity, text], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        found: dict[str, str] = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), 500):  # stay under SQLite's bound-parameter limit
+            chunk = unique[i : i + 500]
+            rows = self.conn.execute(
+                f"SELECT key, output FROM segments WHERE key IN ({','.join('?' * len(chunk))})", chunk
+            )
+            found.update(rows)
+        return found
 
+    def put_many(self, rows: list[tuple[str, str, str, str]]) -> None:
+        """rows: (key, engine id, lang, raw output)."""
+        self.conn.executemany("INSERT OR REPLACE INTO segments (key, engine, lang, output) VALUES (?, ?, ?, ?)", rows)
+        self.conn.commit()
 
-def pick_device(pref: str) -> str:
-    if pref == "cpu":
-        return "cpu"
-    if pref == "cuda":
-        return "cuda" if torch.cuda.is_available() else "cpu"
-    # auto
-    return "cuda" if torch.cuda.is_available() else "cpu"
+    def close(self) -> None:
+        self.conn.close()
 
 
 class Engine:
     id: str
+    model_name: str
+    load: dict[str, Any]  # weight dtype / quantization the model was loaded with
+
+    def configure_generation(self, generate: dict[str, Any]) -> None:
+        self.num_beams = int(generate.get("num_beams", 5))
+        self.max_new_tokens = int(generate.get("max_new_tokens", 512))
+        self.batch_size = max(1, int(generate.get("batch_size", 8)))
+        self.max_tokens_per_batch = int(generate.get("max_tokens_per_batch", 4096))
 
     def supports(self, lang: str) -> bool:
         raise NotImplementedError
 
-    def translate(self, blocks: list[str], *, lang: str, ph_map: dict[str, str]) -> list[str]:
+    def cache_identity(self, lang: str) -> dict[str, Any]:
+        """Everything besides the input text that determines this engine's output."""
+        config = getattr(getattr(self, "model", None), "config", None)
+        return {
+            "engine": self.id,
+            "model": self.model_name,
+            "revision": getattr(config, "_commit_hash", None) or "",
+            "load": self.load,
+            "generate": {"num_beams": self.num_beams, "max_new_tokens": self.max_new_tokens},
+            "target": self.targets[lang],
+        }
+
+    def token_lengths(self, texts: list[str], *, lang: str) -> list[int]:
+        raise NotImplementedError
+
+    def generate_batch(self, texts: list[str], *, lang: str) -> list[str]:
+        """Translate a batch of protected segments (inputs padded to the batch's longest)."""
         raise NotImplementedError
 
+    def translate(
+        self,
+        blocks: list[str],
+        *,
+        lang: str,
+        protector: Protector,
+        tm: TranslationMemory | None = None,
+    ) -> list[str]:
+        layout, segments = segment_blocks(blocks)
+        protected = [protector.protect(seg) for seg in segments]
+        raw: list[str | None] = [None] * len(protected)
+        keys: list[str] = []
+        if tm is not None:
+            identity = self.cache_identity(lang)
+            keys = [tm.key(identity, p) for p in protected]
+            found = tm.get_many(keys)
+            raw = [found.get(k) for k in keys]
+
+        todo = [i for i, r in enumerate(raw) if r is None]
+        buckets = length_buckets(
+            self.token_lengths([protected[i] for i in todo], lang=lang) if todo else [],
+            batch_size=self.batch_size,
+            max_tokens=self.max_tokens_per_batch,
+        )
+        for batch in buckets:
+            idx = [todo[j] for j in batch]
+            for i, out in zip(idx, self.generate_batch([protected[i] for i in idx], lang=lang)):
+                raw[i] = out
+            if tm is not None:
+                # Commit per batch so an interrupted run keeps what it already paid for.
+                tm.put_many([(keys[i], self.id, lang, raw[i]) for i in idx])
+        if tm is not None and protected:
+            sys.stderr.write(f"[tm] engine={self.id} lang={lang} reused={len(protected) - len(todo)}/{len(protected)}\n")
+
+        outputs = [protector.unprotect(r or "").strip() for r in raw]
+        return assemble_blocks(layout, outputs)
+
     def close(self) -> None:
         pass
 
@@ -194,11 +284,11 @@ class NLLBEngine(Engine):
         self.model_name = model_name
         self.source_lang = source_lang
         self.targets = targets
-        self.num_beams = int(generate.get("num_beams", 5))
-        self.max_new_tokens = int(generate.get("max_new_tokens", 512))
+        self.configure_generation(generate)
         self.device = device
 
         dtype = torch.float32 if device == "cpu" else torch.float16
+        self.load = {"dtype": str(dtype), "load_in_4bit": False}
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModelForSeq2SeqLM.from_pretrained(
             model_name,
@@ -212,52 +302,25 @@ class NLLBEngine(Engine):
     def supports(self, lang: str) -> bool:
         return lang in self.targets
 
-    def translate(self, blocks: list[str], *, lang: str, ph_map: dict[str, str]) -> list[str]:
-        tgt_lang = self.targets[lang]
-        self.tokenizer.src_lang = self.source_lang
-        forced_bos_token_id = self.tokenizer.convert_tokens_to_ids(tgt_lang)
-
-        out_blocks: list[str] = []
-        for b in blocks:
-            if is_scene_break(b):
-                out_blocks.append(b.strip())
-                continue
+    def cache_identity(self, lang: str) -> dict[str, Any]:
+        # NLLB is told the source language too (tokenizer.src_lang).
+        return {**super().cache_identity(lang), "source": self.source_lang}
 
-            if is_blockquote_block(b):
-                translated_lines: list[str] = []
-                for line in b.splitlines():
-                    if not line.strip():
-                        translated_lines.append(line)
-                        continue
-                    prefix = line.split("> ", 1)[0] + "> "
-                    content = line.split("> ", 1)[1]
-                    protected = protect_text(content, ph_map)
-                    inp = self.tokenizer(protected, return_tensors="pt", truncation=True).to(self.device)
-                    gen = self.model.generate(
-                        **inp,
-                        forced_bos_token_id=forced_bos_token_id,
-                        num_beams=self.num_beams,
-                        max_new_tokens=self.max_new_tokens,
-                    )
-                    out = self.tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-                    out = unprotect_text(out, ph_map).strip()
-                    translated_lines.append(prefix + out)
-                out_blocks.append("\n".join(translated_lines).rstrip())
-                continue
-
-            protected = protect_text(b, ph_map)
-            inp = self.tokenizer(protected, return_tensors="pt", truncation=True).to(self.device)
-            gen = self.model.generate(
-                **inp,
-                forced_bos_token_id=forced_bos_token_id,
-                num_beams=self.num_beams,
-                max_new_tokens=self.max_new_tokens,
-            )
-            out = self.tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-            out = unprotect_text(out, ph_map).strip()
-            out_blocks.append(out)
+    def token_lengths(self, texts: list[str], *, lang: str) -> list[int]:
+        self.tokenizer.src_lang = self.source_lang
+        return [len(ids) for ids in self.tokenizer(texts, truncation=True)["input_ids"]]
 
-        return out_blocks
+    def generate_batch(self, texts: list[str], *, lang: str) -> list[str]:
+        self.tokenizer.src_lang = self.source_lang
+        forced_bos_token_id = self.tokenizer.convert_tokens_to_ids(self.targets[lang])
+        inp = self.tokenizer(texts, return_tensors="pt", padding=True, truncation=True).to(self.device)
+        gen = self.model.generate(
+            **inp,
+            forced_bos_token_id=forced_bos_token_id,
+            num_beams=self.num_beams,
+            max_new_tokens=self.max_new_tokens,
+        )
+        return self.tokenizer.batch_decode(gen, skip_special_tokens=True)
 
     def close(self) -> None:
         del self.model
@@ -271,11 +334,11 @@ class SeamlessV2Engine(Engine):
         self.id = engine_id
         self.model_name = model_name
         self.targets = targets
-        self.num_beams = int(generate.get("num_beams", 5))
-        self.max_new_tokens = int(generate.get("max_new_tokens", 512))
+        self.configure_generation(generate)
         self.device = device
 
         dtype = torch.float32 if device == "cpu" else torch.float16
+        self.load = {"dtype": str(dtype), "load_in_4bit": False}
         self.processor = AutoProcessor.from_pretrained(model_name)
         self.model = SeamlessM4Tv2ForTextToText.from_pretrained(
             model_name,
@@ -289,50 +352,18 @@ class SeamlessV2Engine(Engine):
     def supports(self, lang: str) -> bool:
         return lang in self.targets
 
-    def translate(self, blocks: list[str], *, lang: str, ph_map: dict[str, str]) -> list[str]:
-        tgt_lang = self.targets[lang]
-        out_blocks: list[str] = []
+    def token_lengths(self, texts: list[str], *, lang: str) -> list[int]:
+        return [len(ids) for ids in self.processor.tokenizer(texts)["input_ids"]]
 
-        for b in blocks:
-            if is_scene_break(b):
-                out_blocks.append(b.strip())
-                continue
-
-            if is_blockquote_block(b):
-                translated_lines: list[str] = []
-                for line in b.splitlines():
-                    if not line.strip():
-                        translated_lines.append(line)
-                        continue
-                    prefix = line.split("> ", 1)[0] + "> "
-                    content = line.split("> ", 1)[1]
-                    protected = protect_text(content, ph_map)
-                    inp = self.processor(text=protected, return_tensors="pt").to(self.device)
-                    gen = self.model.generate(
-                        **inp,
-                        tgt_lang=tgt_lang,
-                        num_beams=self.num_beams,
-                        max_new_tokens=self.max_new_tokens,
-                    )
-                    out = self.processor.batch_decode(gen, skip_special_tokens=True)[0]
-                    out = unprotect_text(out, ph_map).strip()
-                    translated_lines.append(prefix + out)
-                out_blocks.append("\n".join(translated_lines).rstrip())
-                continue
-
-            protected = protect_text(b, ph_map)
-            inp = self.processor(text=protected, return_tensors="pt").to(self.device)
-            gen = self.model.generate(
-                **inp,
-                tgt_lang=tgt_lang,
-                num_beams=self.num_beams,
-                max_new_tokens=self.max_new_tokens,
-            )
-            out = self.processor.batch_decode(gen, skip_special_tokens=True)[0]
-            out = unprotect_text(out, ph_map).strip()
-            out_blocks.append(out)
-
-        return out_blocks
+    def generate_batch(self, texts: list[str], *, lang: str) -> list[str]:
+        inp = self.processor(text=texts, return_tensors="pt", padding=True).to(self.device)
+        gen = self.model.generate(
+            **inp,
+            tgt_lang=self.targets[lang],
+            num_beams=self.num_beams,
+            max_new_tokens=self.max_new_tokens,
+        )
+        return self.processor.batch_decode(gen, skip_special_tokens=True)
 
     def close(self) -> None:
         del self.model
@@ -346,14 +377,14 @@ class MadladEngine(Engine):
         self.id = engine_id
         self.model_name = model_name
         self.targets = targets
-        self.num_beams = int(generate.get("num_beams", 5))
-        self.max_new_tokens = int(generate.get("max_new_tokens", 512))
+        self.configure_generation(generate)
         self.device = device
 
         self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=False)
         dtype = torch.float32 if device == "cpu" else torch.float16
+        self.load = {"dtype": str(dtype), "load_in_4bit": load_in_4bit and device == "cuda"}
 
-        if load_in_4bit and device == "cuda":
+        if self.load["load_in_4bit"]:
             self.model = AutoModelForSeq2SeqLM.from_pretrained(
                 model_name,
                 torch_dtype=dtype,
@@ -374,48 +405,21 @@ class MadladEngine(Engine):
     def supports(self, lang: str) -> bool:
         return lang in self.targets
 
-    def translate(self, blocks: list[str], *, lang: str, ph_map: dict[str, str]) -> list[str]:
+    def _with_prefix(self, texts: list[str], lang: str) -> list[str]:
         prefix = self.targets[lang].strip()
-        out_blocks: list[str] = []
+        return [f"{prefix} {t}" for t in texts]
 
-        for b in blocks:
-            if is_scene_break(b):
-                out_blocks.append(b.strip())
-                continue
-
-            if is_blockquote_block(b):
-                translated_lines: list[str] = []
-                for line in b.splitlines():
-                    if not line.strip():
-                        translated_lines.append(line)
-                        continue
-                    bq_prefix = line.split("> ", 1)[0] + "> "
-                    content = line.split("> ", 1)[1]
-                    protected = protect_text(content, ph_map)
-                    inp = self.tokenizer(f"{prefix} {protected}", return_tensors="pt", truncation=True).to(self.device)
-                    gen = self.model.generate(
-                        **inp,
-                        num_beams=self.num_beams,
-                        max_new_tokens=self.max_new_tokens,
-                    )
-                    out = self.tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-                    out = unprotect_text(out, ph_map).strip()
-                    translated_lines.append(bq_prefix + out)
-                out_blocks.append("\n".join(translated_lines).rstrip())
-                continue
-
-            protected = protect_text(b, ph_map)
-            inp = self.tokenizer(f"{prefix} {protected}", return_tensors="pt", truncation=True).to(self.device)
-            gen = self.model.generate(
-                **inp,
-                num_beams=self.num_beams,
-                max_new_tokens=self.max_new_tokens,
-            )
-            out = self.tokenizer.batch_decode(gen, skip_special_tokens=True)[0]
-            out = unprotect_text(out, ph_map).strip()
-            out_blocks.append(out)
+    def token_lengths(self, texts: list[str], *, lang: str) -> list[int]:
+        return [len(ids) for ids in self.tokenizer(self._with_prefix(texts, lang), truncation=True)["input_ids"]]
 
-        return out_blocks
+    def generate_batch(self, texts: list[str], *, lang: str) -> list[str]:
+        inp = self.tokenizer(self._with_prefix(texts, lang), return_tensors="pt", padding=True, truncation=True).to(self.device)
+        gen = self.model.generate(
+            **inp,
+            num_beams=self.num_beams,
+            max_new_tokens=self.max_new_tokens,
+        )
+        return self.tokenizer.batch_decode(gen, skip_special_tokens=True)
 
     def close(self) -> None:
         del self.model
@@ -500,21 +504,13 @@ def cometkiwi_scores(model: Any, *, src: list[str], mt: list[str], batch_size: i
     return [float(x) for x in scores]
 
 
-def compute_penalties(*, src_block: str, mt_block: str, protected_tokens: Iterable[str]) -> float:
+def compute_penalties(*, src_block: str, mt_block: str, protector: Protector) -> float:
     penalty = 0.0
-    if re.search(r"(?:_{1,3}|\[\[|\[)\s*PROT\d{3}\s*(?:_{1,3}|\]\]|\])", mt_block):
+    if has_placeholders(mt_block):
         penalty -= 0.6
 
     # If a protected token appears in the source block but not in the MT block, penalize hard.
-    for tok in protected_tokens:
-        if re.fullmatch(r"[A-Za-z0-9_]+", tok):
-            in_src = re.search(rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])", src_block) is not None
-            in_mt = re.search(rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])", mt_block) is not None
-        else:
-            in_src = tok in src_block
-            in_mt = tok in mt_block
-        if in_src and not in_mt:
-            penalty -= 0.4
+    penalty -= 0.4 * len(protector.present(src_block) - protector.present(mt_block))
     return penalty
 
 
@@ -607,11 +603,15 @@ def instantiate_engine(engine_cfg: dict[str, Any], *, device: str) -> Engine:
 
 def main() -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--chapter", required=True, help="Path to .draft.md")
+    which = ap.add_mutually_exclusive_group(required=True)
+    which.add_argument("--chapter", help="Path to .draft.md")
+    which.add_argument("--chapters", nargs="+", help="Draft paths or globs, e.g. 'manuscript/arc-2/*.draft.md'")
+    which.add_argument("--all", action="store_true", help="Every chapter under manuscript/")
     ap.add_argument("--lang", nargs="+", default=None, help="Target languages (default: all in config)")
     ap.add_argument("--device", default="auto", choices=["auto", "cuda", "cpu"])
     ap.add_argument("--cfg", default=str(CFG_PATH), help="Path to translation pipeline YAML")
     ap.add_argument("--engines", nargs="+", default=None, help="Engine ids to use (default: enabled engines)")
+    ap.add_argument("--no-tm", action="store_true", help="Bypass the translation memory (always run the models)")
     args = ap.parse_args()
 
     cfg = load_yaml(Path(args.cfg))
@@ -633,15 +633,12 @@ def main() -> int:
         raise SystemExit(f"Unknown language(s): {', '.join(unknown)} (add to {Path(args.cfg).relative_to(ROOT)})")
 
     # Prepare chapter inputs
-    chapter_path = Path(args.chapter)
-    draft_text = chapter_path.read_text(encoding="utf-8")
-    meta = parse_chapter_meta(draft_text)
-    prose = extract_prose(draft_text)
-    blocks = split_paragraphs(prose)
-    score_src_blocks = flatten_for_scoring(blocks)
+    chapters = [
+        load_chapter_input(p)
+        for p in resolve_chapters([args.chapter] if args.chapter else args.chapters, all_chapters=args.all)
+    ]
 
-    protected_tokens = load_protected_tokens(cfg)
-    _, ph_map = make_placeholders(protected_tokens)
+    protector = Protector(load_protected_tokens(cfg))
 
     engines_cfg_all = build_engines(cfg, device=device)
     if args.engines:
@@ -655,9 +652,16 @@ def main() -> int:
     if not engines_cfg:
         raise SystemExit("No enabled engines found in config.")
 
-    # Generate candidates: candidates[lang][engine_id] = list[str]
-    candidates: dict[str, dict[str, list[str]]] = {l: {} for l in langs}
-    title_candidates: dict[str, dict[str, str]] = {l: {} for l in langs}
+    # Translation memory: unchanged segments cost no model time on re-runs.
+    tm: TranslationMemory | None = None
+    if not args.no_tm:
+        tm_path = (cfg.get("io", {}) or {}).get("translation_memory")
+        tm = TranslationMemory(ROOT / tm_path if tm_path else TM_PATH)
+
+    # Generate candidates: candidates[chapter][lang][engine_id] = list[str].
+    # Each engine is loaded once and streams every chapter and language before the next loads.
+    candidates: list[dict[str, dict[str, list[str]]]] = [{l: {} for l in langs} for _ in chapters]
+    title_candidates: list[dict[str, dict[str, str]]] = [{l: {} for l in langs} for _ in chapters]
 
     for engine_id, engine_cfg in engines_cfg.items():
         try:
@@ -666,19 +670,22 @@ def main() -> int:
             sys.stderr.write(f"[engine] skip engine={engine_id} (load failed): {type(e).__name__}: {e}\n")
             continue
         try:
-            for lang in langs:
-                if not eng.supports(lang):
-                    continue
-                sys.stderr.write(f"[translate] engine={engine_id} lang={lang}\n")
-                try:
-                    title_candidates[lang][engine_id] = eng.translate([meta.title], lang=lang, ph_map=ph_map)[0].strip()
-                except Exception:
-                    title_candidates[lang][engine_id] = meta.title
-                out = eng.translate(blocks, lang=lang, ph_map=ph_map)
-                candidates[lang][engine_id] = out
+            for ci, ch in enumerate(chapters):
+                for lang in langs:
+                    if not eng.supports(lang):
+                        continue
+                    sys.stderr.write(f"[translate] engine={engine_id} chapter={ch.meta.num} lang={lang}\n")
+                    try:
+                        title_candidates[ci][lang][engine_id] = eng.translate([ch.meta.title], lang=lang, protector=protector, tm=tm)[0].strip()
+                    except Exception:
+                        title_candidates[ci][lang][engine_id] = ch.meta.title
+                    candidates[ci][lang][engine_id] = eng.translate(ch.blocks, lang=lang, protector=protector, tm=tm)
         finally:
             eng.close()
 
+    if tm is not None:
+        tm.close()
+
     # Scoring: prefer COMETKiwi if enabled and available, else embedding similarity
     qe_cfg = cfg.get("qe", {}) or {}
     comet_cfg = qe_cfg.get("cometkiwi", {}) or {}
@@ -703,103 +710,105 @@ def main() -> int:
             batch_size=int(embed_cfg.get("batch_size", 16)),
         )
 
-    # For each language: compute per-engine scores, select, write output + report
+    # For each chapter and language: compute per-engine scores, select, write output + report
     out_root = ROOT / str((cfg.get("io", {}) or {}).get("output_root", "translations"))
     ensure_dir(out_root)
 
-    for lang in langs:
-        eng_map = candidates.get(lang, {})
-        if not eng_map:
-            sys.stderr.write(f"[warn] No candidates produced for lang={lang}\n")
-            continue
+    for ci, ch in enumerate(chapters):
+        meta, blocks, score_src_blocks = ch.meta, ch.blocks, ch.score_src_blocks
+        for lang in langs:
+            eng_map = candidates[ci].get(lang, {})
+            if not eng_map:
+                sys.stderr.write(f"[warn] No candidates produced for chapter={meta.num} lang={lang}\n")
+                continue
 
-        engine_ids = sorted(eng_map.keys())
-        scores_by_engine: dict[str, list[float]] = {}
-        avg_by_engine: dict[str, float] = {}
-
-        for engine_id in engine_ids:
-            mt_blocks = flatten_for_scoring(eng_map[engine_id])
-            if comet_enabled and comet_model is not None:
-                qe_device = pick_device(str(comet_cfg.get("device", "auto")))
-                base_scores = cometkiwi_scores(
-                    comet_model,
-                    src=score_src_blocks,
-                    mt=mt_blocks,
-                    batch_size=int(comet_cfg.get("batch_size", 8)),
-                    device=qe_device,
-                )
-            elif embed_scorer is not None:
-                base_scores = embed_scorer.score_pairs(src=score_src_blocks, mt=mt_blocks)
+            engine_ids = sorted(eng_map.keys())
+            scores_by_engine: dict[str, list[float]] = {}
+            avg_by_engine: dict[str, float] = {}
+
+            for engine_id in engine_ids:
+                mt_blocks = flatten_for_scoring(eng_map[engine_id])
+                if comet_enabled and comet_model is not None:
+                    qe_device = pick_device(str(comet_cfg.get("device", "auto")))
+                    base_scores = cometkiwi_scores(
+                        comet_model,
+                        src=score_src_blocks,
+                        mt=mt_blocks,
+                        batch_size=int(comet_cfg.get("batch_size", 8)),
+                        device=qe_device,
+                    )
+                elif embed_scorer is not None:
+                    base_scores = embed_scorer.score_pairs(src=score_src_blocks, mt=mt_blocks)
+                else:
+                    # Last resort: no scorer available. Prefer Seamless then NLLB then others by name.
+                    base_scores = [0.0 for _ in mt_blocks]
+
+                penalties = [
+                    compute_penalties(src_block=s, mt_block=m, protector=protector)
+                    for s, m in zip(score_src_blocks, mt_blocks)
+                ]
+                final_scores = [float(b + p) for b, p in zip(base_scores, penalties)]
+                scores_by_engine[engine_id] = final_scores
+                avg_by_engine[engine_id] = float(sum(final_scores) / max(1, len(final_scores)))
+
+            # Selection
+            selected_engine: str
+            selected_blocks: list[str]
+            selection_detail: Any
+
+            if selection_mode == "chapter":
+                selected_engine = max(avg_by_engine.keys(), key=lambda k: avg_by_engine[k])
+                selected_blocks = eng_map[selected_engine]
+                selection_detail = {"selected_engine": selected_engine, "avg_scores": avg_by_engine}
             else:
-                # Last resort: no scorer available. Prefer Seamless then NLLB then others by name.
-                base_scores = [0.0 for _ in mt_blocks]
-
-            penalties = [
-                compute_penalties(src_block=s, mt_block=m, protected_tokens=protected_tokens)
-                for s, m in zip(score_src_blocks, mt_blocks)
+                selected_blocks = []
+                selected_engine = "mixed"
+                chosen: list[str] = []
+                for i in range(len(blocks)):
+                    best = max(engine_ids, key=lambda e: scores_by_engine[e][i])
+                    chosen.append(best)
+                    selected_blocks.append(eng_map[best][i])
+                selection_detail = {"selected_engines_per_block": chosen, "avg_scores": avg_by_engine}
+
+            # Title translation: prefer the selected engine (or Seamless if mixed).
+            title_engine_id = selected_engine if selected_engine != "mixed" else ("seamless_v2" if "seamless_v2" in engines_cfg else engine_ids[0])
+            translated_title = title_candidates[ci].get(lang, {}).get(title_engine_id, meta.title)
+
+            arc_dir = f"arc-{meta.arc}"
+            ch_file = f"chapter-{meta.num:02d}.md"
+            out_dir = out_root / lang / arc_dir
+            ensure_dir(out_dir)
+            out_path = out_dir / ch_file
+
+            header = [
+                f"# Chapter {meta.num}: {translated_title}",
+                f"<!-- Arc: {meta.arc} | POV: {meta.pov} | Location: {meta.location} | Timeline: {meta.timeline} -->",
+                f"<!-- Translation: {lang} | Pipeline: ensemble | Selection: {selection_mode} | Selected: {selection_detail.get('selected_engine', 'mixed')} | Device: {device} -->",
+                "",
             ]
-            final_scores = [float(b + p) for b, p in zip(base_scores, penalties)]
-            scores_by_engine[engine_id] = final_scores
-            avg_by_engine[engine_id] = float(sum(final_scores) / max(1, len(final_scores)))
-
-        # Selection
-        selected_engine: str
-        selected_blocks: list[str]
-        selection_detail: Any
-
-        if selection_mode == "chapter":
-            selected_engine = max(avg_by_engine.keys(), key=lambda k: avg_by_engine[k])
-            selected_blocks = eng_map[selected_engine]
-            selection_detail = {"selected_engine": selected_engine, "avg_scores": avg_by_engine}
-        else:
-            selected_blocks = []
-            selected_engine = "mixed"
-            chosen: list[str] = []
-            for i in range(len(blocks)):
-                best = max(engine_ids, key=lambda e: scores_by_engine[e][i])
-                chosen.append(best)
-                selected_blocks.append(eng_map[best][i])
-            selection_detail = {"selected_engines_per_block": chosen, "avg_scores": avg_by_engine}
-
-        # Title translation: prefer the selected engine (or Seamless if mixed).
-        title_engine_id = selected_engine if selected_engine != "mixed" else ("seamless_v2" if "seamless_v2" in engines_cfg else engine_ids[0])
-        translated_title = title_candidates.get(lang, {}).get(title_engine_id, meta.title)
-
-        arc_dir = f"arc-{meta.arc}"
-        ch_file = f"chapter-{meta.num:02d}.md"
-        out_dir = out_root / lang / arc_dir
-        ensure_dir(out_dir)
-        out_path = out_dir / ch_file
-
-        header = [
-            f"# Chapter {meta.num}: {translated_title}",
-            f"<!-- Arc: {meta.arc} | POV: {meta.pov} | Location: {meta.location} | Timeline: {meta.timeline} -->",
-            f"<!-- Translation: {lang} | Pipeline: ensemble | Selection: {selection_mode} | Selected: {selection_detail.get('selected_engine', 'mixed')} | Device: {device} -->",
-            "",
-        ]
-        body = "\n\n".join(selected_blocks).rstrip() + "\n"
-        out_path.write_text("\n".join(header) + body, encoding="utf-8")
-
-        report = {
-            "chapter": {"arc": meta.arc, "num": meta.num, "title": meta.title, "pov": meta.pov, "location": meta.location, "timeline": meta.timeline},
-            "lang": lang,
-            "selection_mode": selection_mode,
-            "selection": selection_detail,
-            "scores": {
-                "avg_by_engine": avg_by_engine,
-            },
-            "qe": {
-                "cometkiwi_enabled": comet_enabled,
-                "embed_fallback_enabled": embed_scorer is not None,
-                "embed_model": getattr(embed_scorer, "model_name", None),
-                "comet_model": str(comet_cfg.get("model")) if comet_enabled else None,
-            },
-        }
-        report_path = out_path.with_suffix(".report.json")
-        report_path.write_text(json.dumps(report, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
-
-        print(f"Wrote {out_path.relative_to(ROOT)}")
-        print(f"Wrote {report_path.relative_to(ROOT)}")
+            body = "\n\n".join(selected_blocks).rstrip() + "\n"
+            out_path.write_text("\n".join(header) + body, encoding="utf-8")
+
+            report = {
+                "chapter": {"arc": meta.arc, "num": meta.num, "title": meta.title, "pov": meta.pov, "location": meta.location, "timeline": meta.timeline},
+                "lang": lang,
+                "selection_mode": selection_mode,
+                "selection": selection_detail,
+                "scores": {
+                    "avg_by_engine": avg_by_engine,
+                },
+                "qe": {
+                    "cometkiwi_enabled": comet_enabled,
+                    "embed_fallback_enabled": embed_scorer is not None,
+                    "embed_model": getattr(embed_scorer, "model_name", None),
+                    "comet_model": str(comet_cfg.get("model")) if comet_enabled else None,
+                },
+            }
+            report_path = out_path.with_suffix(".report.json")
+            report_path.write_text(json.dumps(report, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
+
+            print(f"Wrote {out_path.relative_to(ROOT)}")
+            print(f"Wrote {report_path.relative_to(ROOT)}")
 
     if embed_scorer is not None:
         embed_scorer.close()
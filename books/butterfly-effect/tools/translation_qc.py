@@ -6,25 +6,41 @@ This does not attempt to judge literary quality. It tries to catch "hard failure
 - protected tokens got translated or dropped
 - paragraph/scene-break structure drift
 - leftover placeholders
+
+Check one pair:
+  python3 tools/translation_qc.py --src manuscript/arc-1/chapter-01.draft.md --mt translations/hi/arc-1/chapter-01.md
+
+Check every translation against its draft (process pool, one aggregated report):
+  python3 tools/translation_qc.py --all --report .cache/translation-qc.json
+  python3 tools/translation_qc.py --all --lang hi es --jobs 8
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import json
+import os
 import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from draft_parser import is_scene_break, load_chapter
+from placeholders import Protector, has_placeholders
+
 
 ROOT = Path(__file__).resolve().parents[1]
 PIPELINE_CFG = ROOT / "agents/translation/translation-pipeline.yaml"
 ENTITIES_PATH = ROOT / "schema/entities.yaml"
+MANUSCRIPT = ROOT / "manuscript"
+TRANSLATIONS = ROOT / "translations"
 
-TITLE_RE = re.compile(r"^# Chapter\s+(\d+):\s*(.+)$", re.MULTILINE)
+# translations/<lang>/arc-N/chapter-NN.md <-> manuscript/arc-N/chapter-NN.draft.md
+CHAPTER_FILE_RE = re.compile(r"chapter-(\d+)\.md")
 
 
 @dataclass(frozen=True)
@@ -38,58 +54,6 @@ def load_yaml(path: Path) -> dict[str, Any]:
     return yaml.safe_load(path.read_text(encoding="utf-8"))
 
 
-def extract_prose_from_draft(md: str) -> str:
-    lines = md.splitlines()
-    prose_lines: list[str] = []
-    in_comment_block = False
-    for line in lines:
-        if re.match(r"^# Chapter \d+:", line):
-            continue
-        if re.match(r"^\s*<!--.*-->\s*$", line):
-            continue
-        if re.match(r"^\s*<!--", line) and "-->" not in line:
-            in_comment_block = True
-            continue
-        if in_comment_block:
-            if "-->" in line:
-                in_comment_block = False
-            continue
-        prose_lines.append(line)
-    prose = "\n".join(prose_lines).strip()
-    prose = re.sub(r"\n---\s*$", "", prose)
-    return prose
-
-
-def extract_prose_from_translation(md: str) -> str:
-    """
-    Translation files are markdown with:
-    - title heading
-    - HTML comments for meta
-    - prose
-    """
-    lines = md.splitlines()
-    out: list[str] = []
-    for line in lines:
-        if TITLE_RE.match(line):
-            continue
-        if re.match(r"^\s*<!--.*-->\s*$", line):
-            continue
-        out.append(line)
-    prose = "\n".join(out).strip()
-    prose = re.sub(r"\n---\s*$", "", prose)
-    return prose
-
-
-def split_paragraphs(prose: str) -> list[str]:
-    paras = re.split(r"\n\s*\n", prose)
-    return [p for p in (para.rstrip() for para in paras) if p.strip() != ""]
-
-
-def is_scene_break(block: str) -> bool:
-    s = block.strip()
-    return s in {"---", "***"} or re.fullmatch(r"\*\s*\*\s*\*", s) is not None
-
-
 def load_protected_tokens(cfg: dict[str, Any]) -> list[str]:
     prot = cfg.get("protected", {}) or {}
     tokens: list[str] = list(prot.get("tokens", []) or [])
@@ -109,13 +73,7 @@ def load_protected_tokens(cfg: dict[str, Any]) -> list[str]:
     return sorted(set(tokens), key=len, reverse=True)
 
 
-def is_ascii_word(tok: str) -> bool:
-    # Treat only ASCII "word" tokens as needing boundary-aware checks. This works for CJK text where
-    # Latin tokens may appear adjacent to CJK characters without spaces (e.g. "Kael把...").
-    return re.fullmatch(r"[A-Za-z0-9_]+", tok) is not None
-
-
-def qc(*, src_blocks: list[str], mt_blocks: list[str], protected_tokens: list[str]) -> QCResult:
+def qc(*, src_blocks: list[str], mt_blocks: list[str], protector: Protector) -> QCResult:
     issues: list[str] = []
 
     if len(src_blocks) != len(mt_blocks):
@@ -129,18 +87,14 @@ def qc(*, src_blocks: list[str], mt_blocks: list[str], protected_tokens: list[st
     # Token checks: only require tokens that appear in source overall.
     src_all = "\n\n".join(src_blocks)
     mt_all = "\n\n".join(mt_blocks)
-    for tok in protected_tokens:
-        if is_ascii_word(tok):
-            # Use ASCII boundaries so `Kael` in `Kael把...` counts as present.
-            in_src = re.search(rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])", src_all) is not None
-            in_mt = re.search(rf"(?<![A-Za-z0-9_]){re.escape(tok)}(?![A-Za-z0-9_])", mt_all) is not None
-        else:
-            in_src = tok in src_all
-            in_mt = tok in mt_all
-        if in_src and not in_mt:
+    # ASCII word tokens use boundaries, so `Kael` in `Kael把...` counts as present.
+    src_tokens = protector.present(src_all)
+    mt_tokens = protector.present(mt_all)
+    for tok in protector.tokens:
+        if tok in src_tokens and tok not in mt_tokens:
             issues.append(f"[TOKENS] Missing protected token in MT: {tok!r}")
 
-    if re.search(r"(?:_{1,3}|\[\[|\[)\s*PROT\d{3}\s*(?:_{1,3}|\]\]|\])", mt_all):
+    if has_placeholders(mt_all):
         issues.append("[TOKENS] Placeholder(s) found in MT output (PROT placeholder left behind).")
 
     stats = {
@@ -152,26 +106,175 @@ def qc(*, src_blocks: list[str], mt_blocks: list[str], protected_tokens: list[st
     return QCResult(ok=len(issues) == 0, issues=issues, stats=stats)
 
 
-def main() -> int:
+# ── Corpus mode (--all) ───────────────────────────────────────────
+
+@dataclass(frozen=True)
+class QCPair:
+    lang: str
+    chapter: int
+    src: Path
+    mt: Path
+
+
+def pair_translations(langs: list[str] | None = None) -> tuple[list[QCPair], dict[str, list[str]]]:
+    """
+    Pair every translated chapter with its draft.
+
+    Returns (pairs, untranslated) where `untranslated` maps each language to the
+    drafts it has no translation for yet (coverage, not a QC failure).
+    """
+    drafts = {p.relative_to(MANUSCRIPT).as_posix(): p for p in MANUSCRIPT.glob("arc-*/chapter-*.draft.md")}
+    lang_dirs = sorted(d for d in TRANSLATIONS.iterdir() if d.is_dir()) if TRANSLATIONS.is_dir() else []
+    if langs:
+        lang_dirs = [d for d in lang_dirs if d.name in langs]
+
+    pairs: list[QCPair] = []
+    untranslated: dict[str, list[str]] = {}
+    for lang_dir in lang_dirs:
+        seen: set[str] = set()
+        for mt in sorted(lang_dir.glob("arc-*/chapter-*.md")):
+            m = CHAPTER_FILE_RE.fullmatch(mt.name)
+            if not m:
+                continue
+            rel = mt.relative_to(lang_dir).with_name(f"chapter-{m.group(1)}.draft.md").as_posix()
+            seen.add(rel)
+            pairs.append(QCPair(lang=lang_dir.name, chapter=int(m.group(1)), src=MANUSCRIPT / rel, mt=mt))
+        untranslated[lang_dir.name] = sorted(f"manuscript/{rel}" for rel in drafts if rel not in seen)
+    return pairs, untranslated
+
+
+_WORKER_PROTECTOR: Protector | None = None
+
+
+def _init_worker(tokens: list[str]) -> None:
+    # Built once per worker process instead of once per chapter pair.
+    global _WORKER_PROTECTOR
+    _WORKER_PROTECTOR = Protector(tokens)
+
+
+def _qc_pair(pair: QCPair) -> dict[str, Any]:
+    assert _WORKER_PROTECTOR is not None
+    row: dict[str, Any] = {
+        "lang": pair.lang,
+        "chapter": pair.chapter,
+        "src": pair.src.relative_to(ROOT).as_posix(),
+        "mt": pair.mt.relative_to(ROOT).as_posix(),
+    }
+    if not pair.src.exists():
+        return {**row, "ok": False, "issues": ["[PAIRING] No source draft for this translation."], "stats": {}}
+    res = qc(
+        src_blocks=list(load_chapter(pair.src).translatable_blocks),
+        mt_blocks=list(load_chapter(pair.mt).translatable_blocks),
+        protector=_WORKER_PROTECTOR,
+    )
+    return {**row, "ok": res.ok, "issues": res.issues, "stats": res.stats}
+
+
+def issue_kind(issue: str) -> str:
+    """"[TOKENS] Missing ..." -> "TOKENS"."""
+    return issue[1:issue.index("]")] if issue.startswith("[") and "]" in issue else "OTHER"
+
+
+def run_all(tokens: list[str], *, langs: list[str] | None = None, jobs: int = 1) -> dict[str, Any]:
+    """QC every translation pair on up to `jobs` processes; returns the aggregated report."""
+    pairs, untranslated = pair_translations(langs)
+    if jobs <= 1 or len(pairs) <= 1:
+        _init_worker(tokens)
+        rows = [_qc_pair(p) for p in pairs]
+    else:
+        workers = min(jobs, len(pairs))
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(tokens,)
+        ) as ex:
+            rows = list(ex.map(_qc_pair, pairs, chunksize=max(1, len(pairs) // (workers * 4))))
+
+    languages: dict[str, dict[str, Any]] = {}
+    for lang, missing in untranslated.items():
+        languages[lang] = {
+            "chapters": 0,
+            "failed": 0,
+            "issues": 0,
+            "issues_by_kind": {},
+            "stats": {"src_blocks": 0, "mt_blocks": 0, "src_chars": 0, "mt_chars": 0},
+            "failed_chapters": [],
+            "untranslated": missing,
+        }
+    for row in rows:
+        agg = languages[row["lang"]]
+        agg["chapters"] += 1
+        agg["issues"] += len(row["issues"])
+        for issue in row["issues"]:
+            kind = issue_kind(issue)
+            agg["issues_by_kind"][kind] = agg["issues_by_kind"].get(kind, 0) + 1
+        for key, value in row["stats"].items():
+            agg["stats"][key] = agg["stats"].get(key, 0) + value
+        if not row["ok"]:
+            agg["failed"] += 1
+            agg["failed_chapters"].append(row["chapter"])
+
+    return {
+        "ok": all(row["ok"] for row in rows),
+        "pairs": len(rows),
+        "failed": sum(1 for row in rows if not row["ok"]),
+        "languages": languages,
+        "chapters": rows,
+    }
+
+
+def print_summary(report: dict[str, Any], out=sys.stdout) -> None:
+    print(f"{report['pairs']} translation(s) checked, {report['failed']} with issues", file=out)
+    for lang, agg in report["languages"].items():
+        kinds = ", ".join(f"{k}={v}" for k, v in sorted(agg["issues_by_kind"].items())) or "-"
+        print(
+            f"  {lang:<8} {agg['chapters']:>3} checked  {agg['failed']:>3} failed  "
+            f"{len(agg['untranslated']):>3} untranslated  issues: {kinds}",
+            file=out,
+        )
+    for row in report["chapters"]:
+        for issue in row["issues"]:
+            print(f"  {row['mt']}: {issue}", file=out)
+
+
+def main(argv: list[str] | None = None) -> int:
     ap = argparse.ArgumentParser()
-    ap.add_argument("--src", required=True, help="Source chapter (.draft.md)")
-    ap.add_argument("--mt", required=True, help="Translated chapter (.md in translations/)")
+    ap.add_argument("--src", help="Source chapter (.draft.md)")
+    ap.add_argument("--mt", help="Translated chapter (.md in translations/)")
+    ap.add_argument("--all", action="store_true", help="Check every translations/<lang>/ chapter against its draft")
+    ap.add_argument("--lang", nargs="+", default=None, help="With --all: only these language codes")
+    ap.add_argument("--jobs", type=int, default=0, help="With --all: worker processes (0 = one per CPU; default: 0)")
+    ap.add_argument("--report", default=None, help="With --all: write the aggregated JSON report to this path")
     ap.add_argument("--cfg", default=str(PIPELINE_CFG), help="Pipeline config (for protected tokens)")
     ap.add_argument("--json", action="store_true", help="Emit JSON to stdout")
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
+    if args.all == bool(args.src or args.mt):
+        ap.error("pass either --src and --mt, or --all")
+    if not args.all and not (args.src and args.mt):
+        ap.error("--src and --mt are required together")
 
     cfg = load_yaml(Path(args.cfg))
-    protected_tokens = load_protected_tokens(cfg)
-
-    src_text = Path(args.src).read_text(encoding="utf-8")
-    mt_text = Path(args.mt).read_text(encoding="utf-8")
+    tokens = load_protected_tokens(cfg)
+
+    if args.all:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        report = run_all(tokens, langs=args.lang, jobs=jobs)
+        if args.report:
+            path = Path(args.report)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        if args.json:
+            print(json.dumps(report, ensure_ascii=True, indent=2))
+        else:
+            print_summary(report)
+            if args.report:
+                print(f"Wrote {args.report}")
+        return 0 if report["ok"] else 1
 
-    src_prose = extract_prose_from_draft(src_text)
-    mt_prose = extract_prose_from_translation(mt_text)
-    src_blocks = split_paragraphs(src_prose)
-    mt_blocks = split_paragraphs(mt_prose)
+    protector = Protector(tokens)
+    # Drafts and translations share one format: title line, HTML comments, prose.
+    src_blocks = list(load_chapter(args.src).translatable_blocks)
+    mt_blocks = list(load_chapter(args.mt).translatable_blocks)
 
-    res = qc(src_blocks=src_blocks, mt_blocks=mt_blocks, protected_tokens=protected_tokens)
+    res = qc(src_blocks=src_blocks, mt_blocks=mt_blocks, protector=protector)
     if args.json:
         print(json.dumps({"ok": res.ok, "issues": res.issues, "stats": res.stats}, ensure_ascii=True, indent=2))
     else:
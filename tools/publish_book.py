@@ -3,65 +3,436 @@
 Publish a book's public artifacts from `books/<slug>/` into `site/books/<slug>/`.
 
 This intentionally avoids any build system: it's a deterministic file sync.
+
+The sync is incremental. `books/<slug>/.cache/publish-manifest.json` records
+the sha256 and stat of every published file. Sources whose stat is unchanged
+are not re-hashed. Only changed files are copied (or hard-linked with
+--link), and files that disappeared from the source are pruned from the
+site. Each run writes the added/updated/removed paths to
+`books/<slug>/.cache/publish-changes.json`.
+
+Images and fonts under `assets/` and `style/fonts/` are published with a content
+hash in their name (`ch01-lensmaker.<hash>.svg`). References to them in the
+published HTML/CSS/JS/JSON are rewritten, so site/_headers can keep serving
+those paths as immutable for a year.
+
+Compressible files of 1 KB or more get `.gz` siblings, and `.br` siblings
+when the `brotli` package is installed. Both use maximum compression and run
+on a process pool. They are re-made only when the published bytes change.
+`tools/serve_site.py` serves them locally, and `--report` prints raw vs
+compressed sizes per file type.
 """
 
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
+import gzip
+import hashlib
+import json
 import os
+import posixpath
+import re
 import shutil
 import sys
 from pathlib import Path
 
+try:
+    import brotli
+except ImportError:  # optional: without it only .gz siblings are written
+    brotli = None
+
 
-PUBLIC_DIRS = ("assets", "manuscript", "style", "build", "meta")
+PUBLIC_DIRS = ("assets", "manuscript", "style", "build", "meta", "search")
 PUBLIC_FILES = ("index.html",)  # book table of contents (preferred)
 
+# Never published: interpreter and OS droppings inside the public dirs, plus
+# build inputs that live next to published assets.
+SKIP_NAMES = {"__pycache__", ".DS_Store", "Thumbs.db"}
+SKIP_SUFFIXES = (".pyc", ".pyo", ".tmp")
+PRIVATE_PATHS = ("assets/illustrations/raw/", "assets/illustrations/manifest.json")
 
-def copy_tree(src: Path, dst: Path) -> None:
-    if not src.exists():
-        return
+# Content-hashed names (site/_headers serves these dirs as immutable for a year).
+# novel.css keeps its name: pages link it directly and it is not cached immutably.
+FINGERPRINT_DIRS = ("assets/", "style/fonts/")
+FINGERPRINT_SUFFIXES = (".svg", ".webp", ".avif", ".png", ".jpg", ".jpeg", ".gif", ".woff", ".woff2")
+FINGERPRINT_LEN = 10
+REWRITE_SUFFIXES = (".html", ".css", ".js", ".json")
+ASSET_REF_RE = re.compile(
+    r"(?<![\w./-])/?(?:[\w.-]+/)*[\w.-]+\.(?:svg|webp|avif|png|jpe?g|gif|woff2?)(?![\w.-])", re.IGNORECASE
+)
+
+# Precompressed `.br`/`.gz` siblings, for origins and preview servers that serve them.
+COMPRESS_SUFFIXES = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".md", ".txt", ".xml", ".bin")
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+MANIFEST_REL = ".cache/publish-manifest.json"
+CHANGES_REL = ".cache/publish-changes.json"
+COMPRESSION_REL = ".cache/publish-compression.json"
+MANIFEST_VERSION = 2
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def is_public(rel: str) -> bool:
+    parts = rel.split("/")
+    return (
+        not any(p in SKIP_NAMES for p in parts)
+        and not rel.endswith(SKIP_SUFFIXES)
+        and not rel.startswith(PRIVATE_PATHS)
+    )
+
+
+def public_files(src_root: Path) -> dict[str, Path]:
+    """Posix path relative to the book root -> source file, for everything that gets published."""
+    out: dict[str, Path] = {}
+    for d in PUBLIC_DIRS:
+        top = src_root / d
+        if not top.is_dir():
+            continue
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = sorted(n for n in dirnames if n not in SKIP_NAMES)
+            for name in filenames:
+                path = Path(dirpath) / name
+                rel = path.relative_to(src_root).as_posix()
+                if is_public(rel):
+                    out[rel] = path
+    for f in PUBLIC_FILES:
+        if (src_root / f).is_file():
+            out[f] = src_root / f
+    return dict(sorted(out.items()))
+
+
+def load_manifest(path: Path) -> dict[str, dict]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def write_json(path: Path, data: object) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    tmp.replace(path)
+
+
+def write_bytes(dst: Path, data: bytes) -> None:
     dst.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copytree(src, dst, dirs_exist_ok=True)
+    tmp = dst.with_name(dst.name + ".publish-tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, dst)
 
 
-def copy_file(src: Path, dst: Path) -> None:
-    if not src.exists():
-        return
+def place_file(src: Path, dst: Path, *, link: bool) -> None:
+    """Copy `src` over `dst` (hard link when asked and possible), never leaving a partial file."""
     dst.parent.mkdir(parents=True, exist_ok=True)
-    shutil.copy2(src, dst)
+    tmp = dst.with_name(dst.name + ".publish-tmp")
+    tmp.unlink(missing_ok=True)
+    if link:
+        try:
+            os.link(src, tmp)
+        except OSError:
+            shutil.copy2(src, tmp)  # cross-device or unsupported filesystem
+    else:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
 
 
-def main(argv: list[str]) -> int:
-    p = argparse.ArgumentParser()
-    p.add_argument("--slug", required=True, help="Book slug, e.g. butterfly-effect")
-    p.add_argument(
-        "--root",
-        default=".",
-        help="Repo root (default: current directory)",
-    )
-    args = p.parse_args(argv)
+def fingerprinted_name(rel: str, sha: str) -> str:
+    """assets/sigils/ch01-lensmaker.svg -> assets/sigils/ch01-lensmaker.<hash>.svg"""
+    head, dot, suffix = rel.rpartition(".")
+    return f"{head}.{sha[:FINGERPRINT_LEN]}{dot}{suffix}"
 
-    root = Path(args.root).resolve()
-    slug = args.slug.strip().strip("/").replace("\\", "/")
-    if not slug or "/" in slug:
-        raise SystemExit(f"Invalid --slug: {args.slug!r}")
 
+def is_fingerprinted(rel: str) -> bool:
+    return rel.startswith(FINGERPRINT_DIRS) and rel.lower().endswith(FINGERPRINT_SUFFIXES)
+
+
+def rewrite_refs(text: str, rel: str, renames: dict[str, str], slug: str) -> str:
+    """Point every reference in `text` (a file at `rel`) that resolves to a renamed file at its new name."""
+    base = posixpath.dirname(rel)
+    site_prefix = f"/books/{slug}/"
+
+    def sub(m: re.Match[str]) -> str:
+        ref = m.group(0)
+        if ref.startswith(site_prefix):
+            target = ref[len(site_prefix):]
+        elif ref.startswith("/"):
+            return ref
+        else:
+            target = posixpath.normpath(posixpath.join(base, ref))
+        new = renames.get(target)
+        if new is None:
+            return ref
+        return ref[: len(ref) - len(posixpath.basename(target))] + posixpath.basename(new)
+
+    return ASSET_REF_RE.sub(sub, text)
+
+
+def sync_files(
+    files: dict[str, Path],
+    dst_root: Path,
+    old: dict[str, dict],
+    *,
+    link: bool = False,
+    fingerprint: bool = True,
+    slug: str = "",
+) -> tuple[dict[str, dict], dict[str, list[str]]]:
+    """
+    Bring `dst_root` in line with `files`; returns (new manifest entries, change list).
+
+    With `fingerprint`, media under FINGERPRINT_DIRS are published as
+    `name.<hash>.ext` and references to them in REWRITE_SUFFIXES files are
+    rewritten, so year-long immutable caching stays correct.
+    """
+    manifest: dict[str, dict] = {}
+    changes: dict[str, list[str]] = {"added": [], "updated": [], "removed": []}
+
+    stats: dict[str, os.stat_result] = {}
+    shas: dict[str, str] = {}
+    for rel, src in files.items():
+        st = stats[rel] = src.stat()
+        prev = old.get(rel) or {}
+        if prev.get("size") == st.st_size and prev.get("src_mtime_ns") == st.st_mtime_ns:
+            shas[rel] = prev["sha256"]
+        else:
+            shas[rel] = file_sha256(src)
+
+    renames = {rel: fingerprinted_name(rel, shas[rel]) for rel in files if fingerprint and is_fingerprinted(rel)}
+    renames_key = hashlib.sha256(json.dumps(sorted(renames.items())).encode("utf-8")).hexdigest()
+
+    for rel, src in files.items():
+        st, sha = stats[rel], shas[rel]
+        prev = old.get(rel) or {}
+        out = renames.get(rel, rel)
+        rewrite = bool(renames) and rel.endswith(REWRITE_SUFFIXES)
+        # What the published bytes depend on: the source, plus every new name when refs are rewritten.
+        key = hashlib.sha256(f"{sha}:{renames_key}".encode("utf-8")).hexdigest() if rewrite else sha
+
+        dst = dst_root / out
+        try:
+            dst_st = dst.stat()
+        except FileNotFoundError:
+            dst_st = None
+
+        if (
+            dst_st is not None
+            and prev.get("key") == key
+            and prev.get("out") == out
+            and (prev.get("out_size"), prev.get("dst_mtime_ns")) == (dst_st.st_size, dst_st.st_mtime_ns)
+        ):
+            out_sha, out_size = prev["out_sha256"], prev["out_size"]
+        else:
+            data = None
+            if rewrite:
+                text = src.read_text(encoding="utf-8")
+                data = rewrite_refs(text, rel, renames, slug).encode("utf-8")
+                out_sha, out_size = hashlib.sha256(data).hexdigest(), len(data)
+            else:
+                out_sha, out_size = sha, st.st_size
+            # No (matching) record, e.g. a fresh checkout of site/: equal bytes are left alone.
+            if dst_st is None or dst_st.st_size != out_size or file_sha256(dst) != out_sha:
+                if data is not None and data != src.read_bytes():
+                    write_bytes(dst, data)
+                else:
+                    place_file(src, dst, link=link)
+                changes["added" if dst_st is None else "updated"].append(out)
+
+        manifest[rel] = {
+            "sha256": sha,
+            "size": st.st_size,
+            "src_mtime_ns": st.st_mtime_ns,
+            "out": out,
+            "key": key,
+            "out_sha256": out_sha,
+            "out_size": out_size,
+            "dst_mtime_ns": dst.stat().st_mtime_ns,
+        }
+
+    return manifest, changes
+
+
+def entry_outputs(rel: str, entry: dict) -> set[str]:
+    """Every site path one manifest entry owns: the published file and its precompressed siblings."""
+    out = entry.get("out", rel)
+    return {out} | {f"{out}.{fmt}" for fmt in (entry.get("compressed") or {}).get("sizes", {})}
+
+
+def prune_stale(dst_root: Path, manifest: dict[str, dict], old: dict[str, dict]) -> list[str]:
+    """Remove site files no manifest entry owns; returns the removed paths."""
+    keep = set().union(*(entry_outputs(rel, e) for rel, e in manifest.items()))
+    # Public dirs mirror the source; top-level files are only pruned if we published them.
+    stale = set().union(*(entry_outputs(rel, e) for rel, e in old.items()))
+    for d in PUBLIC_DIRS:
+        top = dst_root / d
+        if top.is_dir():
+            stale.update(p.relative_to(dst_root).as_posix() for p in top.rglob("*") if not p.is_dir())
+    removed = []
+    for rel in sorted(stale - keep):
+        path = dst_root / rel
+        if path.is_file() or path.is_symlink():
+            path.unlink()
+            removed.append(rel)
+    for d in PUBLIC_DIRS:
+        prune_empty_dirs(dst_root / d)
+    return removed
+
+
+def compress_formats() -> tuple[str, ...]:
+    return ("br", "gz") if brotli is not None else ("gz",)
+
+
+def compress_file(task: tuple[str, tuple[str, ...]]) -> tuple[str, dict[str, int], dict[str, str]]:
+    """
+    Write `path.br`/`path.gz` at maximum compression; returns the path,
+    {format: bytes} of the siblings kept and {format: "added"|"updated"} of those rewritten.
+    """
+    path_s, formats = task
+    path = Path(path_s)
+    data = path.read_bytes()
+    sizes: dict[str, int] = {}
+    written: dict[str, str] = {}
+    for fmt in formats:
+        if fmt == "br":
+            packed = brotli.compress(data, quality=BROTLI_QUALITY)
+        else:
+            packed = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)  # mtime=0: same bytes every run
+        sibling = path.with_name(f"{path.name}.{fmt}")
+        if len(packed) < len(data):
+            sizes[fmt] = len(packed)
+            try:
+                if sibling.read_bytes() == packed:
+                    continue
+                written[fmt] = "updated"
+            except FileNotFoundError:
+                written[fmt] = "added"
+            write_bytes(sibling, packed)
+        else:
+            sibling.unlink(missing_ok=True)
+    return path_s, sizes, written
+
+
+def precompress(dst_root: Path, manifest: dict[str, dict], old: dict[str, dict], *, jobs: int = 1) -> dict[str, list[str]]:
+    """
+    Give every compressible published file `.br`/`.gz` siblings, re-compressing
+    only files whose published bytes (or the available formats) changed.
+    Records sizes under each entry's "compressed"; returns the sibling changes.
+    """
+    formats = compress_formats()
+    changes: dict[str, list[str]] = {"added": [], "updated": []}
+    tasks = []
+    by_path = {}
+    for rel, entry in manifest.items():
+        out = entry["out"]
+        if not out.endswith(COMPRESS_SUFFIXES) or entry["out_size"] < COMPRESS_MIN_BYTES:
+            continue
+        prev = (old.get(rel) or {}).get("compressed") or {}
+        if prev.get("sha256") == entry["out_sha256"] and prev.get("formats") == list(formats):
+            siblings = {fmt: dst_root / f"{out}.{fmt}" for fmt in prev.get("sizes", {})}
+            if all(p.is_file() and p.stat().st_size == prev["sizes"][fmt] for fmt, p in siblings.items()):
+                entry["compressed"] = prev
+                continue
+        path = str(dst_root / out)
+        by_path[path] = rel
+        tasks.append((path, formats))
+
+    if jobs <= 1 or len(tasks) <= 1:
+        results = [compress_file(t) for t in tasks]
+    else:
+        workers = min(jobs, len(tasks))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(compress_file, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    for path, sizes, written in results:
+        entry = manifest[by_path[path]]
+        entry["compressed"] = {"sha256": entry["out_sha256"], "formats": list(formats), "sizes": sizes}
+        for fmt, kind in written.items():
+            changes[kind].append(f"{entry['out']}.{fmt}")
+    return changes
+
+
+def compression_report(manifest: dict[str, dict]) -> dict[str, dict[str, int]]:
+    """Per file type: files, raw bytes and compressed bytes of every precompressed file."""
+    report: dict[str, dict[str, int]] = {}
+    for entry in manifest.values():
+        sizes = (entry.get("compressed") or {}).get("sizes")
+        if not sizes:
+            continue
+        row = report.setdefault(posixpath.splitext(entry["out"])[1], {"files": 0, "raw": 0, "gz": 0, "br": 0})
+        row["files"] += 1
+        row["raw"] += entry["out_size"]
+        for fmt in ("gz", "br"):
+            # A format that did not help is served raw.
+            row[fmt] += sizes.get(fmt, entry["out_size"])
+    return dict(sorted(report.items()))
+
+
+def format_report(report: dict[str, dict[str, int]]) -> str:
+    lines = [f"  {'type':<8} {'files':>6} {'raw KB':>10} {'gzip KB':>10} {'brotli KB':>10}"]
+    totals = {"files": 0, "raw": 0, "gz": 0, "br": 0}
+    for ext, row in [*report.items(), ("total", totals)]:
+        if ext != "total":
+            for k in totals:
+                totals[k] += row[k]
+        br = f"{row['br'] / 1024:>10.1f}" if brotli is not None else f"{'-':>10}"
+        lines.append(f"  {ext:<8} {row['files']:>6} {row['raw'] / 1024:>10.1f} {row['gz'] / 1024:>10.1f} {br}")
+    if brotli is None:
+        lines.append("  (brotli not installed: pip install brotli for .br siblings)")
+    return "\n".join(lines)
+
+
+def prune_empty_dirs(top: Path) -> None:
+    if not top.is_dir():
+        return
+    for dirpath, _dirnames, _filenames in sorted(os.walk(top), key=lambda t: len(t[0]), reverse=True):
+        if not os.listdir(dirpath):
+            os.rmdir(dirpath)
+
+
+def publish(
+    root: Path,
+    slug: str,
+    *,
+    link: bool = False,
+    fingerprint: bool = True,
+    compress: bool = True,
+    jobs: int = 1,
+) -> dict:
+    """
+    Sync one book into the site; returns {"slug", "dst", "added", "updated",
+    "removed", "unchanged", "compression"} (compression: per-type size report).
+    """
     src_root = root / "books" / slug
     dst_root = root / "site" / "books" / slug
 
-    if not src_root.is_dir():
-        print(f"Source book not found: {src_root}", file=sys.stderr)
-        return 2
-
     # Ensure destination exists (so `site/books/` is created when missing).
     dst_root.mkdir(parents=True, exist_ok=True)
 
-    for d in PUBLIC_DIRS:
-        copy_tree(src_root / d, dst_root / d)
-
-    for f in PUBLIC_FILES:
-        copy_file(src_root / f, dst_root / f)
+    files = public_files(src_root)
+    manifest_path = src_root / MANIFEST_REL
+    old = load_manifest(manifest_path)
+    manifest, changes = sync_files(files, dst_root, old, link=link, fingerprint=fingerprint, slug=slug)
+    unchanged = len(files) - len(changes["added"]) - len(changes["updated"])
+    if compress:
+        for kind, rels in precompress(dst_root, manifest, old, jobs=jobs).items():
+            changes[kind] += rels
+    changes["removed"] = prune_stale(dst_root, manifest, old)
+    report = compression_report(manifest)
+    write_json(manifest_path, {"version": MANIFEST_VERSION, "files": manifest})
+    write_json(src_root / CHANGES_REL, changes)
+    write_json(src_root / COMPRESSION_REL, report)
 
     # Back-compat: older books only generated `build/index.html`.
     # If no root `index.html` exists, synthesize one by rewriting relative paths.
@@ -74,8 +445,66 @@ def main(argv: list[str]) -> int:
             fixed = fixed.replace('href="../manuscript/', 'href="manuscript/')
             fixed = fixed.replace('src="../assets/', 'src="assets/')
             dst_index.write_text(fixed, encoding="utf-8")
+            changes["added"].append("index.html")
+
+    return {
+        "slug": slug,
+        "dst": os.path.relpath(dst_root, root),
+        **changes,
+        "unchanged": unchanged,
+        "compression": report,
+    }
+
+
+def describe(result: dict) -> str:
+    return (
+        f"Published {result['slug']} -> {result['dst']} "
+        f"({len(result['added'])} added, {len(result['updated'])} updated, "
+        f"{len(result['removed'])} removed, {result['unchanged']} unchanged)"
+    )
+
 
-    print(f"Published {slug} -> {os.path.relpath(dst_root, root)}")
+def main(argv: list[str]) -> int:
+    p = argparse.ArgumentParser()
+    p.add_argument("--slug", required=True, help="Book slug, e.g. butterfly-effect")
+    p.add_argument(
+        "--root",
+        default=".",
+        help="Repo root (default: current directory)",
+    )
+    p.add_argument("--link", action="store_true", help="Hard-link changed files instead of copying (falls back to copy)")
+    p.add_argument("--no-fingerprint", action="store_true", help="Publish assets under their source names")
+    p.add_argument("--no-precompress", action="store_true", help="Do not write .br/.gz siblings")
+    p.add_argument("--jobs", type=int, default=0, help="Compression processes (0 = one per CPU; default: 0)")
+    p.add_argument("--report", action="store_true", help="Print raw vs compressed sizes per file type")
+    p.add_argument("--list", action="store_true", help="Print every added/updated/removed path")
+    args = p.parse_args(argv)
+
+    root = Path(args.root).resolve()
+    slug = args.slug.strip().strip("/").replace("\\", "/")
+    if not slug or "/" in slug:
+        raise SystemExit(f"Invalid --slug: {args.slug!r}")
+
+    if not (root / "books" / slug).is_dir():
+        print(f"Source book not found: {root / 'books' / slug}", file=sys.stderr)
+        return 2
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    result = publish(
+        root,
+        slug,
+        link=args.link,
+        fingerprint=not args.no_fingerprint,
+        compress=not args.no_precompress,
+        jobs=jobs,
+    )
+    if args.list:
+        for kind, mark in (("added", "+"), ("updated", "~"), ("removed", "-")):
+            for rel in result[kind]:
+                print(f"  {mark} {rel}")
+    print(describe(result))
+    if args.report and result["compression"]:
+        print(format_report(result["compression"]))
     return 0
 
 
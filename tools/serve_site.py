@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Local preview server for `site/` that serves precompressed siblings.
+
+Like `python3 -m http.server`, but when a request accepts br or gzip and
+`publish_book.py` wrote `<file>.br` / `<file>.gz`, the sibling is sent with
+`Content-Encoding` (and the original file's content type) instead.
+
+    python3 tools/serve_site.py            # http://localhost:8788/
+    python3 tools/serve_site.py --port 9000 --directory site
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import os
+import sys
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+
+# Preferred first: (Accept-Encoding token, sibling suffix).
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Tokens of an Accept-Encoding header, minus any refused with q=0."""
+    out = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if token and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            out.add(token.strip().lower())
+    return out
+
+
+class PrecompressedHandler(SimpleHTTPRequestHandler):
+    def send_head(self):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urlsplit(self.path).path.endswith("/"):
+                return super().send_head()  # let the base class redirect to the slash URL
+            path = os.path.join(path, "index.html")
+        if not os.path.isfile(path):
+            return super().send_head()
+
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted or not os.path.isfile(path + suffix):
+                continue
+            f = open(path + suffix, "rb")
+            fs = os.fstat(f.fileno())
+            self.send_response(200)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Content-Length", str(fs.st_size))
+            self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return f
+        return super().send_head()
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8788, help="Port (default: 8788)")
+    ap.add_argument("--bind", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    ap.add_argument("--directory", default="site", help="Directory to serve (default: site)")
+    args = ap.parse_args(argv)
+
+    handler = functools.partial(PrecompressedHandler, directory=args.directory)
+    with ThreadingHTTPServer((args.bind, args.port), handler) as httpd:
+        print(f"Serving {args.directory}/ at http://{args.bind}:{args.port}/ (precompressed .br/.gz when present)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -5,20 +5,34 @@ Sync `books/` -> `site/books/`.
 For each book:
 - optionally runs `books/<slug>/build/convert.py` (if present)
 - publishes public artifacts via `tools/publish_book.py`
+
+Both run in-process: each book's `convert.py` is imported as a module and
+`publish_book.publish()` is called directly, so interpreter startup and the
+`yaml` import are paid once. With several books, they are synced concurrently
+on a pool of `--book-jobs` worker processes; output lines are prefixed with
+the book slug as they stream in, and a combined summary is printed at the end.
 """
 
 from __future__ import annotations
 
 import argparse
-import subprocess
+import concurrent.futures
+import contextlib
+import importlib
+import io
+import os
 import sys
+import threading
+import time
+import traceback
 from pathlib import Path
 
+from publish_book import describe, publish
 
-def _run(cmd: list[str], *, cwd: Path) -> None:
-    p = subprocess.run(cmd, cwd=str(cwd))
-    if p.returncode != 0:
-        raise SystemExit(p.returncode)
+try:
+    import yaml  # noqa: F401  (imported once here; forked book workers inherit it)
+except ImportError:
+    pass
 
 
 def _discover_slugs(root: Path) -> list[str]:
@@ -35,11 +49,122 @@ def _discover_slugs(root: Path) -> list[str]:
     return slugs
 
 
+class PrefixedWriter(io.TextIOBase):
+    """Text stream that forwards complete lines to `out`, each prefixed with `prefix`."""
+
+    _lock = threading.Lock()
+
+    def __init__(self, out, prefix: str) -> None:
+        self.out = out
+        self.prefix = prefix
+        self.buf = ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        self.buf += s
+        *lines, self.buf = self.buf.split("\n")
+        if lines:
+            with self._lock:
+                self.out.write("".join(f"{self.prefix}{line}\n" for line in lines))
+                self.out.flush()
+        return len(s)
+
+    def flush(self) -> None:
+        if self.buf:
+            self.write("\n")
+
+
+@contextlib.contextmanager
+def book_imports(book_dir: Path):
+    """Import scope for one book's build code: sys.path and modules loaded from the book are undone on exit."""
+    saved_path = list(sys.path)
+    before = set(sys.modules)
+    try:
+        yield
+    finally:
+        sys.path[:] = saved_path
+        prefix = str(book_dir) + os.sep
+        for name in set(sys.modules) - before:
+            if (getattr(sys.modules[name], "__file__", None) or "").startswith(prefix):
+                del sys.modules[name]
+
+
+def load_convert(book_dir: Path):
+    """
+    Import the book's build/convert.py as `convert`, with build/ on sys.path.
+
+    Chapter workers unpickle render tasks by module name; a real import path
+    lets spawn/forkserver workers (which inherit sys.path) import it too.
+    Call inside book_imports() so the next book gets its own `convert`.
+    """
+    sys.path.insert(0, str(book_dir / "build"))
+    return importlib.import_module("convert")
+
+
+def sync_book(task: tuple[str, str, bool, int, bool]) -> dict:
+    """Build (unless told not to) and publish one book; never raises, errors are returned."""
+    root_s, slug, build, jobs, prefixed = task
+    root = Path(root_s)
+    book_dir = root / "books" / slug
+    result: dict = {"slug": slug, "ok": False, "error": None, "build_s": 0.0, "publish_s": 0.0}
+
+    out = PrefixedWriter(sys.stdout, f"[{slug}] ") if prefixed else sys.stdout
+    err = PrefixedWriter(sys.stderr, f"[{slug}] ") if prefixed else sys.stderr
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        try:
+            convert = book_dir / "build" / "convert.py"
+            if build and convert.is_file():
+                started = time.perf_counter()
+                with book_imports(book_dir):
+                    load_convert(book_dir).main(["--jobs", str(jobs)])
+                result["build_s"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            published = publish(root, slug, jobs=jobs if jobs > 0 else (os.cpu_count() or 1))
+            result["publish_s"] = time.perf_counter() - started
+            result["published"] = published
+            print(describe(published))
+            result["ok"] = True
+        except SystemExit as e:
+            result["error"] = f"exited with status {e.code}"
+        except Exception:
+            result["error"] = traceback.format_exc().rstrip()
+            print(result["error"], file=sys.stderr)
+        finally:
+            out.flush()
+            err.flush()
+    return result
+
+
+def sync_books(root: Path, slugs: list[str], *, build: bool = True, jobs: int = 1, book_jobs: int = 1) -> list[dict]:
+    """Sync `slugs`, up to `book_jobs` at a time; results come back in `slugs` order."""
+    prefixed = len(slugs) > 1
+    tasks = [(str(root), slug, build, jobs, prefixed) for slug in slugs]
+    if book_jobs <= 1 or len(tasks) <= 1:
+        return [sync_book(t) for t in tasks]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(book_jobs, len(tasks))) as ex:
+        return list(ex.map(sync_book, tasks))
+
+
 def main(argv: list[str]) -> int:
     ap = argparse.ArgumentParser()
     ap.add_argument("--root", default=".", help="Repo root (default: cwd)")
     ap.add_argument("--slug", help="Only sync a single book slug")
     ap.add_argument("--no-build", action="store_true", help="Skip running convert.py")
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for convert.py --jobs and precompression (0 = one per CPU)",
+    )
+    ap.add_argument(
+        "--book-jobs",
+        type=int,
+        default=0,
+        help="Books synced concurrently (0 = one per CPU; default: 0)",
+    )
     args = ap.parse_args(argv)
 
     root = Path(args.root).resolve()
@@ -55,25 +180,22 @@ def main(argv: list[str]) -> int:
             print(f"Missing book directory: {book_dir}", file=sys.stderr)
             return 2
 
-        convert = book_dir / "build" / "convert.py"
-        if not args.no_build and convert.is_file():
-            _run([sys.executable, str(convert)], cwd=root)
+    started = time.perf_counter()
+    book_jobs = args.book_jobs if args.book_jobs > 0 else (os.cpu_count() or 1)
+    results = sync_books(root, slugs, build=not args.no_build, jobs=args.jobs, book_jobs=book_jobs)
 
-        _run(
-            [
-                sys.executable,
-                str(root / "tools" / "publish_book.py"),
-                "--slug",
-                slug,
-                "--root",
-                str(root),
-            ],
-            cwd=root,
-        )
-
-    return 0
+    failed = [r for r in results if not r["ok"]]
+    if len(results) > 1 or failed:
+        print(f"\nSynced {len(results) - len(failed)}/{len(results)} books in {time.perf_counter() - started:.1f}s")
+        for r in results:
+            if r["ok"]:
+                p = r["published"]
+                changed = len(p["added"]) + len(p["updated"]) + len(p["removed"])
+                print(f"  {r['slug']}: build {r['build_s']:.1f}s, publish {r['publish_s']:.1f}s, {changed} files changed")
+            else:
+                print(f"  {r['slug']}: FAILED ({r['error'].splitlines()[-1]})")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main(sys.argv[1:]))
-